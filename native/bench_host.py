@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Protocol throughput benchmark for the native host (runs on Linux, macOS, Windows).
+
+Usage:
+    python native/bench_host.py [--jobs 100,1000,10000] [--mode thread|process]
+                                [--requests N] [--window N] [--accept-encoding]
+
+For each synthetic HAR fixture (see host_harness.make_har) a fresh host is
+started and every action is driven over real length-prefixed frames:
+
+    ping              protocol floor
+    collect_jobs      refresh: re-parses the HAR each time
+    collect_cached    collect_jobs answered from the HAR cache
+    next_page         pages of the cached result
+    sync              delta against the previous token (nothing new)
+
+and p50/p99 round-trip latency and messages per second are printed per
+action. `--window` requests are kept in flight, as the extension does over
+a connectNative port. `--mode process` runs `python native_host.py` instead
+of serving on a thread, which adds real process pipes and start-up.
+"""
+
+import os
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+
+from host_harness import latency_stats, make_har, start_host
+
+
+def _scenarios(har, requests, cursor, token):
+    """(action label, messages) in the order they are run."""
+    heavy = max(1, requests // 10)
+    return [
+        ('ping', [{'action': 'ping'}] * requests),
+        ('collect_jobs', [{'action': 'collect_jobs', 'har_path': har, 'refresh': True}] * heavy),
+        ('collect_cached', [{'action': 'collect_jobs', 'har_path': har}] * heavy),
+        ('next_page', [{'action': 'next_page', 'cursor': cursor}] * requests if cursor else []),
+        ('sync', [{'action': 'sync', 'har_path': har, 'token': token}] * heavy),
+    ]
+
+
+def bench_fixture(har, jobs, args):
+    rows = []
+    with tempfile.TemporaryDirectory(prefix='upai-bench-') as state, \
+            start_host(state, mode=args.mode, script=args.host, workers=args.workers,
+                       accept_encoding=['gzip'] if args.accept_encoding else None) as client:
+        # Warm up: first parse fills the HAR cache, first sync sets the watermark
+        first, _ = client.request({'action': 'collect_jobs', 'har_path': har, 'refresh': True})
+        if not (first and first.get('ok')):
+            raise SystemExit(f'collect_jobs failed on {har}: {first}')
+        synced, _ = client.request({'action': 'sync', 'har_path': har})
+        for label, messages in _scenarios(har, args.requests, first.get('next_cursor'), synced.get('token')):
+            if messages:
+                stats = latency_stats(client.run(messages, window=args.window))
+                rows.append((label, jobs, stats))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Native host round-trip latency and throughput per action')
+    parser.add_argument('--jobs', default='100,1000,10000', help='comma-separated fixture sizes (jobs)')
+    parser.add_argument('--mode', choices=('thread', 'process'), default='thread')
+    parser.add_argument('--host', default='native_host.py', help='host script for --mode process')
+    parser.add_argument('--requests', type=int, default=500, help='light requests per action (HAR parses get 1/10)')
+    parser.add_argument('--window', type=int, default=1, help='requests kept in flight')
+    parser.add_argument('--workers', type=int, default=None, help='host worker threads (UPAI_HOST_WORKERS)')
+    parser.add_argument('--accept-encoding', action='store_true', help='ask for gzip-compressed replies')
+    args = parser.parse_args()
+    # A thread-mode host logs through this process; keep its records off the table
+    logging.getLogger().addHandler(logging.NullHandler())
+
+    print(f"mode={args.mode} window={args.window} accept_encoding={'gzip' if args.accept_encoding else '-'}")
+    print(f"{'action':<16}{'jobs':>7}{'n':>6}{'p50 ms':>10}{'p99 ms':>10}{'msg/s':>10}{'failed':>8}")
+    with tempfile.TemporaryDirectory(prefix='upai-har-') as fixtures:
+        for jobs in (int(n) for n in args.jobs.split(',') if n.strip()):
+            har = make_har(Path(fixtures) / f'jobs_{jobs}.har', jobs)
+            for label, n_jobs, s in bench_fixture(har, jobs, args):
+                print(f"{label:<16}{n_jobs:>7}{s['n']:>6}{s['p50_ms']:>10.2f}{s['p99_ms']:>10.2f}"
+                      f"{s['msg_s']:>10.1f}{s['failed']:>8}")
+
+
+if __name__ == '__main__':
+    os.environ.setdefault('UPAI_LOG_LEVEL', 'WARNING')
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Measure the memory of job lists held as dicts versus JobRecords.
+
+Usage:
+    python native/bench_job_record.py [--jobs N] [--skills N]
+
+Decodes N synthetic jobs shaped like the routed extractor output (see
+job_operations), with skills drawn from a vocabulary of --skills names, and
+prints the memory retained per job by each representation (tracemalloc).
+"""
+
+import json
+import argparse
+import random
+import tracemalloc
+
+from job_record import compact_jobs
+
+
+def make_blob(n, n_skills, seed=0):
+    """JSON text of n jobs, so both layouts are built from fresh json.loads objects."""
+    rnd = random.Random(seed)
+    vocab = [f'Skill {i}' for i in range(n_skills)]
+    budgets = ['$500', '$1000', '$30-50/hr', '$15-25/hr', '']
+    jobs = [{
+        'id': str(1700000000000000000 + i),
+        'title': f'Job title number {i}',
+        'description': f'Description of job {i} ' * 8,
+        'skills': rnd.sample(vocab, 5),
+        'budget': rnd.choice(budgets),
+        'url': f'https://www.upwork.com/jobs/~01{i:016x}',
+        'client': {'country': 'United States', 'rating': 4.9, 'total_spent': '1200', 'payment_verified': True},
+        'applicants': rnd.randint(0, 50),
+        'posted': '2025-09-07T03:00:00Z',
+    } for i in range(n)]
+    return json.dumps(jobs)
+
+
+def measure(build):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    obj = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, after - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare dict and JobRecord memory per job')
+    parser.add_argument('--jobs', type=int, default=100_000)
+    parser.add_argument('--skills', type=int, default=500)
+    args = parser.parse_args()
+
+    blob = make_blob(args.jobs, args.skills)
+    dicts, dict_bytes = measure(lambda: json.loads(blob))
+    # The dicts are dropped once converted; only the records stay alive
+    records, rec_bytes = measure(lambda: compact_jobs(json.loads(blob)))
+    assert [r.to_dict() for r in records[:100]] == dicts[:100]
+
+    print(f"Jobs: {args.jobs}, skill vocabulary: {args.skills}")
+    print(f"{'layout':<10} {'total MB':>9} {'bytes/job':>10}")
+    for name, n in (('dict', dict_bytes), ('JobRecord', rec_bytes)):
+        print(f"{name:<10} {n / 2**20:>9.1f} {n / args.jobs:>10.0f}")
+    print(f"Saving: {100.0 * (1 - rec_bytes / dict_bytes):.0f}%")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark JSON backends on the response bodies of a HAR file.
+
+Usage:
+    python native/bench_json_backend.py [path/to/capture.har] [--repeat N]
+
+Defaults to the bundled www.upwork.com.har in the project root. Prints the
+decode throughput of every installed backend (see json_backend.py).
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from har_stream import iter_response_bodies
+from json_backend import BACKEND, available_backends
+
+DEFAULT_HAR = Path(__file__).resolve().parents[1] / 'www.upwork.com.har'
+
+
+def collect_bodies(har_path):
+    """JSON-looking response bodies, with XSSI prefixes stripped."""
+    bodies = []
+    for ent, text in iter_response_bodies(str(har_path), limit=None):
+        s = text.strip()
+        if s.startswith(")]}'"):
+            s = s[4:].lstrip(',').lstrip()
+        if s[:1] in ('{', '['):
+            bodies.append(s)
+    return bodies
+
+
+def bench(loads, bodies, repeat):
+    ok = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for b in bodies:
+            try:
+                loads(b)
+                ok += 1
+            except ValueError:
+                pass
+    return time.perf_counter() - start, ok // repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark JSON backends on HAR response bodies')
+    parser.add_argument('har', nargs='?', default=str(DEFAULT_HAR))
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    bodies = collect_bodies(args.har)
+    total_mb = sum(len(b.encode('utf-8')) for b in bodies) / (1024 * 1024)
+    print(f"HAR: {args.har}")
+    print(f"Bodies: {len(bodies)} ({total_mb:.2f} MB), repeat x{args.repeat}, selected backend: {BACKEND}")
+    print(f"{'backend':<10} {'parsed':>6} {'seconds':>9} {'MB/s':>9} {'docs/s':>10}")
+    for name, loads in available_backends().items():
+        elapsed, ok = bench(loads, bodies, args.repeat)
+        mbps = total_mb * args.repeat / elapsed if elapsed else 0.0
+        docs = len(bodies) * args.repeat / elapsed if elapsed else 0.0
+        print(f"{name:<10} {ok:>6} {elapsed:>9.3f} {mbps:>9.1f} {docs:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Measure native host cold start: spawn -> ping -> pong round trip.
+
+Usage:
+    python native/bench_startup.py [--host native_host.py] [--runs N] [--top N]
+
+Chrome starts a fresh host process for every sendNativeMessage call (and for
+each connectNative port), so the time from spawn to the first reply is paid
+on every request. Each run starts the host, sends one framed `ping` and
+times the reply; stdin is then closed. One extra run with `-X importtime`
+lists the modules that dominate import time.
+"""
+
+import os
+import sys
+import json
+import time
+import struct
+import argparse
+import tempfile
+import subprocess
+import statistics
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+
+
+def _frame(message):
+    body = json.dumps(message).encode('utf-8')
+    return struct.pack('I', len(body)) + body
+
+
+def ping_once(host, extra_args=()):
+    """Seconds from spawn to a complete pong frame, and the host's stderr."""
+    # stderr goes to a file so -X importtime output cannot fill a pipe and stall the host
+    with tempfile.TemporaryFile() as err:
+        start = time.perf_counter()
+        proc = subprocess.Popen([sys.executable, *extra_args, str(host)], cwd=str(HERE),
+                                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=err)
+        proc.stdin.write(_frame({'action': 'ping', 'id': 1}))
+        proc.stdin.flush()
+        (length,) = struct.unpack('I', proc.stdout.read(4))
+        reply = json.loads(proc.stdout.read(length))
+        elapsed = time.perf_counter() - start
+        proc.stdin.close()
+        proc.wait(timeout=30)
+        proc.stdout.close()
+        err.seek(0)
+        text = err.read().decode('utf-8', 'replace')
+    assert reply.get('action') == 'pong', reply
+    return elapsed, text
+
+
+def import_breakdown(stderr, top):
+    """Largest cumulative import times (ms) of top-level imports from -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Nested imports are indented; keep only those made directly by the host script
+        if not name[1:].startswith(' '):
+            rows.append((int(cumulative) / 1000.0, name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time native host spawn -> ping -> pong')
+    parser.add_argument('--host', default='native_host.py', help='host script in native/')
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--top', type=int, default=12, help='imports to list')
+    args = parser.parse_args()
+    host = HERE / args.host
+
+    ping_once(host)  # warm the OS file cache and __pycache__
+    times = sorted(ping_once(host)[0] * 1000 for _ in range(args.runs))
+    p90 = times[min(len(times) - 1, int(len(times) * 0.9))]
+    print(f"{args.host}: ping round trip from spawn over {args.runs} runs")
+    print(f"  median {statistics.median(times):.1f} ms   p90 {p90:.1f} ms   min {times[0]:.1f} ms")
+
+    # Interpreter start-up alone, for reference
+    base = []
+    for _ in range(5):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'], check=True)
+        base.append((time.perf_counter() - start) * 1000)
+    print(f"  bare interpreter {statistics.median(base):.1f} ms")
+
+    _, err = ping_once(host, ('-X', 'importtime'))
+    print("Slowest imports over the whole run, including those after the reply (cumulative ms):")
+    for ms, name in import_breakdown(err, args.top):
+        print(f"  {ms:8.1f}  {name}")
+
+
+if __name__ == '__main__':
+    os.environ.setdefault('UPAI_LOG_LEVEL', 'WARNING')
+    main()
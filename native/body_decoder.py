@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+Response body decoding for HAR entries.
+
+Base64 bodies may still be compressed. The codings are taken from the
+response Content-Encoding header, or sniffed from magic bytes when the
+header is absent, and undone with streaming decompressors before any text
+decoding:
+
+    gzip     1f 8b                      (zlib, stdlib)
+    deflate  zlib header (78 01/5e/9c/da) or raw deflate
+    br       header only (no magic)     (pip install brotli / brotlicffi)
+    zstd     28 b5 2f fd                (pip install zstandard)
+
+Binary payloads (images, fonts, archives, anything with NUL bytes) are
+rejected up front so they never reach the JSON parser.
+"""
+from __future__ import annotations
+import base64
+import binascii
+import zlib
+from typing import Any, Callable, Dict, List, Optional
+
+# Zip-bomb guard: never inflate a single body beyond this
+MAX_DECOMPRESSED = 64 * 1024 * 1024
+_STEP = 1 << 20
+
+_BINARY_MIME_PREFIXES = ('image/', 'font/', 'video/', 'audio/')
+_BINARY_MIME_PARTS = ('octet-stream', 'woff', 'zip', 'pdf', 'wasm', 'protobuf')
+_BINARY_MAGIC = (
+    b'\x89PNG', b'\xff\xd8\xff', b'GIF8', b'RIFF', b'wOFF', b'wOF2', b'%PDF', b'PK\x03\x04', b'\x00asm',
+)
+_GZIP_MAGIC = b'\x1f\x8b'
+_ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+
+class _TooLarge(Exception):
+    pass
+
+
+def _inflate(data: bytes, wbits: int) -> bytes:
+    d = zlib.decompressobj(wbits)
+    out: List[bytes] = []
+    total = 0
+    buf = data
+    while buf:
+        chunk = d.decompress(buf, _STEP)
+        total += len(chunk)
+        if total > MAX_DECOMPRESSED:
+            raise _TooLarge()
+        out.append(chunk)
+        buf = d.unconsumed_tail
+        if d.eof:
+            break
+    out.append(d.flush())
+    return b''.join(out)
+
+
+def _gunzip(data: bytes) -> bytes:
+    return _inflate(data, 16 + zlib.MAX_WBITS)
+
+
+def _deflate(data: bytes) -> bytes:
+    try:
+        return _inflate(data, zlib.MAX_WBITS)
+    except zlib.error:
+        # Some servers send raw deflate without the zlib wrapper
+        return _inflate(data, -zlib.MAX_WBITS)
+
+
+def _brotli(data: bytes) -> bytes:
+    try:
+        import brotli
+    except ImportError:
+        import brotlicffi as brotli
+    out = brotli.Decompressor().process(data)
+    if len(out) > MAX_DECOMPRESSED:
+        raise _TooLarge()
+    return out
+
+
+def _zstd(data: bytes) -> bytes:
+    import zstandard
+    d = zstandard.ZstdDecompressor().decompressobj()
+    out: List[bytes] = []
+    total = 0
+    for i in range(0, len(data), _STEP):
+        chunk = d.decompress(data[i:i + _STEP])
+        total += len(chunk)
+        if total > MAX_DECOMPRESSED:
+            raise _TooLarge()
+        out.append(chunk)
+    return b''.join(out)
+
+
+_DECODERS: Dict[str, Callable[[bytes], bytes]] = {
+    'gzip': _gunzip,
+    'x-gzip': _gunzip,
+    'deflate': _deflate,
+    'br': _brotli,
+    'zstd': _zstd,
+}
+
+
+def header_value(headers: Any, name: str) -> str:
+    """Case-insensitive lookup in a HAR headers list ([{name, value}, ...])."""
+    if not isinstance(headers, list):
+        return ''
+    name = name.lower()
+    for h in headers:
+        if isinstance(h, dict) and str(h.get('name', '')).lower() == name:
+            return str(h.get('value') or '')
+    return ''
+
+
+def sniff_encoding(raw: bytes) -> Optional[str]:
+    """Guess the compression of `raw` from its magic bytes."""
+    if raw.startswith(_GZIP_MAGIC):
+        return 'gzip'
+    if raw.startswith(_ZSTD_MAGIC):
+        return 'zstd'
+    if len(raw) >= 2 and raw[0] == 0x78 and ((raw[0] << 8) | raw[1]) % 31 == 0:
+        return 'deflate'
+    return None
+
+
+def looks_binary(raw: bytes) -> bool:
+    head = raw[:1024]
+    return head.startswith(_BINARY_MAGIC) or b'\x00' in head
+
+
+def decompress(raw: bytes, content_encoding: str = '') -> bytes:
+    """Undo Content-Encoding (or sniffed compression) on `raw`.
+
+    Chrome usually stores bodies already decoded but keeps the header, so a
+    coding that fails to decode is treated as already removed.
+    """
+    codings = [c.strip().lower() for c in content_encoding.split(',') if c.strip()]
+    codings = [c for c in codings if c != 'identity']
+    for coding in reversed(codings):
+        fn = _DECODERS.get(coding)
+        if fn is None:
+            break
+        try:
+            raw = fn(raw)
+        except _TooLarge:
+            return b''
+        except Exception:
+            break
+    # Header missing or already undone: trust the magic bytes
+    for _ in range(2):
+        coding = sniff_encoding(raw)
+        if coding is None:
+            break
+        try:
+            raw = _DECODERS[coding](raw)
+        except _TooLarge:
+            return b''
+        except Exception:
+            break
+    return raw
+
+
+def is_binary_mime(mime: str) -> bool:
+    mime = (mime or '').lower()
+    return mime.startswith(_BINARY_MIME_PREFIXES) or any(p in mime for p in _BINARY_MIME_PARTS)
+
+
+def decode_body(ent: Dict[str, Any]) -> str:
+    """Return the response body of a HAR entry as text ('' if missing or binary)."""
+    try:
+        resp = ent.get('response') or {}
+        cont = resp.get('content') or {}
+        text = cont.get('text') or ''
+    except AttributeError:
+        return ''
+    if not text or cont.get('encoding') != 'base64':
+        return text
+    if is_binary_mime(cont.get('mimeType') or ''):
+        return ''
+    try:
+        raw = base64.b64decode(text)
+    except (binascii.Error, ValueError):
+        return ''
+    raw = decompress(raw, header_value(resp.get('headers'), 'content-encoding'))
+    if not raw or looks_binary(raw):
+        return ''
+    return raw.decode('utf-8', 'ignore')
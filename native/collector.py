@@ -20,14 +20,15 @@ Output example:
 {"ok": true, "jobs": [...], "out_dir": ""}
 """
 from __future__ import annotations
-import io
 import os
 import sys
 import json
 import struct
-from typing import Any, Dict, List
-import base64
-import gzip
+from typing import Any, Dict, List, Optional
+
+# Chrome starts this host for every message, so only the framing helpers are
+# imported up front; the HAR parser and extractors load on first use
+from framing import compress_reply, negotiate_encoding, write_frames
 
 # ------------- Native messaging helpers -------------
 
@@ -43,136 +44,54 @@ def _read_message() -> Dict[str, Any]:
         return {}
 
 
+# Client-supplied id of the message being answered, echoed on chunk frames
+_request_id: Any = None
+# Reply encoding the client advertised (accept_encoding), if any
+_encoding: Optional[str] = None
+
+
 def _write_message(obj: Dict[str, Any]) -> None:
-    data = json.dumps(obj, ensure_ascii=False).encode('utf-8')
-    sys.stdout.buffer.write(struct.pack('<I', len(data)))
-    sys.stdout.buffer.write(data)
-    sys.stdout.buffer.flush()
+    # Large replies are compressed when negotiated and split into chunk
+    # frames to stay under Chrome's 1 MB limit
+    write_frames(sys.stdout.buffer, compress_reply(obj, _encoding), _request_id, ensure_ascii=False)
 
 
 # ------------- HAR processing -------------
 
-def _iter_entries(har: Dict[str, Any]):
-    try:
-        entries = (har.get('log') or {}).get('entries') or []
-    except AttributeError:
-        entries = []
-    for e in entries[:2000]:
-        yield e
-
-
-def _extract_jobs_from_json(obj: Any) -> List[Dict[str, Any]]:
-    """Recursively extract job-like dicts with (title, description/snippet).
-    Matches what the content script does, but runs locally.
-    """
-    out: List[Dict[str, Any]] = []
-
-    def visit(v: Any):
-        if isinstance(v, dict):
-            title = v.get('title') or v.get('jobTitle')
-            desc = v.get('description') or v.get('snippet') or v.get('jobDescription')
-            if title and desc:
-                out.append({
-                    'title': str(title),
-                    'description': str(desc),
-                    'skills': v.get('skills') or v.get('requiredSkills') or [],
-                    'budget': v.get('budget') or v.get('pay') or v.get('price') or '',
-                    'url': v.get('url') or v.get('jobUrl') or v.get('link') or ''
-                })
-            for vv in v.values():
-                visit(vv)
-        elif isinstance(v, list):
-            for item in v:
-                visit(item)
-
-    visit(obj)
-    # de-dup
-    seen = set()
-    uniq: List[Dict[str, Any]] = []
-    for j in out:
-        key = (j.get('url') or '') + '|' + (j.get('title') or '')
-        if key in seen:
-            continue
-        seen.add(key)
-        uniq.append(j)
-    return uniq[:200]
+def _extract_jobs_from_json(obj: Any, endpoint: str = '', ops: Optional[List[str]] = None,
+                            url: str = '') -> List[Dict[str, Any]]:
+    """Extract jobs via the extractor registered for the request's operation; see job_operations."""
+    from job_operations import route_jobs
 
+    return route_jobs(obj, ops, endpoint, url)[:200]
 
-essential_mime = ('json', 'javascript', 'text/json', 'application/json')
-
-def _try_parse_json(text: str) -> Any:
-    s = text.strip()
-    # Trim common XSSI prefixes
-    for prefix in (")]}\',\n", ")]}\',", ")]}\n", ")]}\n\n"):
-        if s.startswith(prefix):
-            s = s[len(prefix):]
-    # Try direct parse
-    try:
-        return json.loads(s)
-    except Exception:
-        pass
-    # Heuristic: slice to first { or [ and last } or ]
-    first = min([i for i in [s.find('{'), s.find('[')] if i >= 0] or [-1])
-    last_brace = s.rfind('}')
-    last_bracket = s.rfind(']')
-    last = max(last_brace, last_bracket)
-    if first >= 0 and last > first:
-        candidate = s[first:last+1]
-        try:
-            return json.loads(candidate)
-        except Exception:
-            return None
-    return None
 
+essential_mime = ('json', 'javascript', 'text/json', 'application/json')
 
 def _load_jobs_from_har(har_path: str) -> List[Dict[str, Any]]:
     if not os.path.isfile(har_path):
         return []
-    try:
-        with io.open(har_path, 'r', encoding='utf-8') as f:
-            har = json.load(f)
-    except Exception:
-        # Sometimes HAR is huge; if failed, try reading and json.loads
-        data = io.open(har_path, 'rb').read()
-        try:
-            har = json.loads(data.decode('utf-8', 'ignore'))
-        except Exception:
-            return []
+    from har_stream import iter_response_bodies
+    from job_extractor import endpoint_key, request_operations
+    from json_locator import iter_json_values, may_contain_json
 
     jobs: List[Dict[str, Any]] = []
-    for ent in _iter_entries(har):
+    # Entries are streamed one at a time so huge HAR exports do not blow up memory
+    for ent, text in iter_response_bodies(har_path):
         try:
-            resp = (ent.get('response') or {})
-            cont = (resp.get('content') or {})
+            cont = ((ent.get('response') or {}).get('content') or {})
             mime = (cont.get('mimeType') or '').lower()
-            text = cont.get('text') or ''
-            if not text:
-                continue
-            # If base64 encoded, decode (and gunzip if needed)
-            if cont.get('encoding') == 'base64':
-                try:
-                    raw = base64.b64decode(text)
-                    try:
-                        text = raw.decode('utf-8', 'ignore')
-                    except Exception:
-                        # try gzip
-                        try:
-                            text = gzip.decompress(raw).decode('utf-8', 'ignore')
-                        except Exception:
-                            text = ''
-                except Exception:
-                    text = ''
-            # Skip if still empty
-            if not text:
-                continue
             # Accept even if mimeType not json as long as content looks like JSON
-            if ('json' not in mime) and not (text.strip().startswith('{') or text.strip().startswith('[')):
+            if not may_contain_json(mime, text):
                 # not JSON-like
                 continue
-            payload = _try_parse_json(text)
-            if payload is None:
-                continue
-            jobs.extend(_extract_jobs_from_json(payload))
+            # A body may hold several documents (NDJSON, GraphQL batches, HTML state blobs)
+            req = ent.get('request') or {}
+            url = req.get('url') or ''
+            ops = request_operations(url, req.get('postData'))
+            endpoint = endpoint_key(url, ops=ops)
+            for payload in iter_json_values(text):
+                jobs.extend(_extract_jobs_from_json(payload, endpoint, ops, url))
         except Exception:
             continue
     return jobs[:200]
@@ -181,9 +100,12 @@ def _load_jobs_from_har(har_path: str) -> List[Dict[str, Any]]:
 # ------------- Main -------------
 
 def main():
+    global _request_id, _encoding
     try:
         msg = _read_message() or {}
         options = msg if isinstance(msg, dict) else {}
+        _request_id = options.get('id')
+        _encoding = negotiate_encoding(options)
         # Preferred HAR path order: options.har_path > env > default
         har_path = (
             options.get('har_path')
@@ -235,6 +157,10 @@ def main():
             _write_message({'ok': True, 'jobs': jobs, 'out_dir': '', 'note': 'Using mock data for testing'})
             return
 
+        from seen_jobs import filter_new_jobs, new_only_from
+        if new_only_from(options):
+            # Only jobs not sent in an earlier run (see seen_jobs)
+            jobs = filter_new_jobs(jobs)
         _write_message({'ok': True, 'jobs': jobs, 'out_dir': ''})
     except Exception as exc:
         _write_message({'ok': False, 'error': str(exc)})
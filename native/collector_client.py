@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+Client for the long-lived collector daemon (scripts/collector_daemon.py).
+
+Starting collect_upwork_data.py for every request pays for a new
+interpreter, a new Chromium and a fresh login each time. The daemon keeps
+one browser and a logged-in context warm, and takes collect jobs over a
+localhost socket; the native hosts submit to it with `submit_collect` and
+only spawn the script themselves when no daemon can be reached.
+
+The daemon listens on 127.0.0.1 and advertises itself in a small JSON
+file, {"pid", "host", "port", "token"}. Every request carries the token
+and uses the native messaging framing (4-byte length + UTF-8 JSON):
+
+    -> {"action": "collect", "token": "...", "argv": ["--list-scroll", "3", ...]}
+    <- {"ok": true, "jobs": [...], "out_dir": "...", "summary": {...}}
+
+`argv` are collect_upwork_data.py arguments (see `collector_argv`).
+
+Settings (env):
+    UPAI_DAEMON=0                  always spawn collect_upwork_data.py
+    UPAI_DAEMON_FILE=<file>        default native/logs/collector_daemon.json
+    UPAI_DAEMON_AUTOSTART=1        start a daemon when none is running (off by default)
+    UPAI_DAEMON_START_TIMEOUT=30   seconds to wait for a started daemon
+"""
+from __future__ import annotations
+import os
+import sys
+import json
+import time
+import socket
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from framing import ChunkAssembler, read_frame, write_frames
+
+ROOT = Path(__file__).resolve().parents[1]
+DAEMON_SCRIPT = ROOT / 'scripts' / 'collector_daemon.py'
+DEFAULT_DAEMON_FILE = Path(__file__).parent / 'logs' / 'collector_daemon.json'
+DEFAULT_START_TIMEOUT = 30.0
+# A collect run scrolls and opens detail pages; same budget as a spawned collector
+DEFAULT_COLLECT_TIMEOUT = 120.0
+
+_FALSY = ('0', 'false', 'no', 'off')
+
+
+def daemon_file() -> Path:
+    return Path(os.environ.get('UPAI_DAEMON_FILE') or DEFAULT_DAEMON_FILE)
+
+
+def collector_argv(options: Dict[str, Any], out_dir: Any) -> List[str]:
+    """collect_upwork_data.py arguments for a run_collector request's options."""
+    from seen_jobs import new_only_from
+
+    # Attach mode needs a CDP endpoint; without one the collector launches its own browser
+    mode = options.get('mode', 'fresh')
+    if mode == 'attach' and not options.get('cdp'):
+        mode = 'fresh'
+    argv = [
+        '--mode', mode,
+        '--list-scroll', str(options.get('list_scroll', 3)),
+        '--details', str(options.get('details', 5)),
+        '--detail-concurrency', str(options.get('detail_concurrency', 4)),
+        '--target-jobs', str(options.get('target_jobs', 0)),
+        '--out', str(out_dir),
+        # The daemon relaunches its browser to match (see collector_daemon)
+        '--headless', 'true' if options.get('headless') else 'false',
+        '--no-pause'
+    ]
+    if mode == 'attach':
+        argv.extend(['--cdp', options['cdp']])
+    # The script filters against the seen-jobs store itself
+    if new_only_from(options):
+        argv.append('--new-only')
+    if options.get('save_responses'):
+        argv.append('--save-responses')
+    if options.get('block') is False:
+        argv.append('--no-block')
+    return argv
+
+
+def daemon_info() -> Optional[Dict[str, Any]]:
+    """The running daemon's address and token, or None if none is advertised."""
+    try:
+        info = json.loads(daemon_file().read_text(encoding='utf-8'))
+        return info if info.get('port') and info.get('token') else None
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def request(message: Dict[str, Any], info: Dict[str, Any],
+            timeout: float = DEFAULT_COLLECT_TIMEOUT) -> Optional[Dict[str, Any]]:
+    """Send one message to the daemon and return its reply; None if it cannot be reached.
+
+    A daemon that took the request but did not answer within `timeout` is
+    still working on it, so that is an error reply rather than None:
+    starting a second collector on the same out_dir would race with it.
+    """
+    try:
+        sock = socket.create_connection((info.get('host') or '127.0.0.1', int(info['port'])), timeout=timeout)
+    except (OSError, ValueError):
+        return None
+    try:
+        with sock, sock.makefile('rwb') as stream:
+            write_frames(stream, dict(message, token=info['token']), ensure_ascii=False)
+            assembler = ChunkAssembler()
+            while True:
+                body = read_frame(stream)
+                if body is None:
+                    return None
+                reply = assembler.feed(json.loads(body.decode('utf-8')))
+                if reply is not None:
+                    return reply
+    except socket.timeout:
+        return {'ok': False, 'error': 'daemon timed out'}
+    except (OSError, ValueError):
+        return None
+
+
+def ping(info: Optional[Dict[str, Any]], timeout: float = 2.0) -> bool:
+    if not info:
+        return False
+    reply = request({'action': 'ping'}, info, timeout)
+    return bool(reply and reply.get('ok'))
+
+
+def start_daemon(timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """Start scripts/collector_daemon.py in the background and wait until it answers."""
+    import subprocess
+
+    if timeout is None:
+        try:
+            timeout = float(os.environ.get('UPAI_DAEMON_START_TIMEOUT', '') or DEFAULT_START_TIMEOUT)
+        except ValueError:
+            timeout = DEFAULT_START_TIMEOUT
+    if not DAEMON_SCRIPT.exists():
+        return None
+    log_path = daemon_file().with_suffix('.log')
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    kwargs: Dict[str, Any] = {}
+    if os.name == 'nt':
+        # Outlive the native host, which Chrome kills when the port closes
+        kwargs['creationflags'] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs['start_new_session'] = True
+    with open(log_path, 'ab') as log:
+        proc = subprocess.Popen([sys.executable, str(DAEMON_SCRIPT)], cwd=str(ROOT), stdin=subprocess.DEVNULL,
+                                stdout=log, stderr=log, env=dict(os.environ, UPAI_DAEMON_FILE=str(daemon_file())),
+                                **kwargs)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and proc.poll() is None:
+        info = daemon_info()
+        if ping(info):
+            return info
+        time.sleep(0.2)
+    return None
+
+
+def submit_collect(options: Dict[str, Any], out_dir: Any,
+                   timeout: float = DEFAULT_COLLECT_TIMEOUT) -> Optional[Dict[str, Any]]:
+    """Run a collect job on the daemon: {'ok', 'jobs', 'out_dir', ...}.
+
+    Returns None when the daemon is disabled or unreachable, or the request
+    attaches to the user's own Chrome over CDP; the caller then spawns
+    collect_upwork_data.py as before. A daemon that does not answer within
+    `timeout` gives {'ok': False, 'error': 'daemon timed out'}.
+    """
+    if os.environ.get('UPAI_DAEMON', '1').lower() in _FALSY:
+        return None
+    if options.get('mode') == 'attach' and options.get('cdp'):
+        return None
+    info = daemon_info()
+    if not ping(info):
+        # Opt-in: a started daemon outlives the host and keeps a browser for --idle seconds
+        if os.environ.get('UPAI_DAEMON_AUTOSTART', '').lower() in ('',) + _FALSY:
+            return None
+        info = start_daemon()
+        if info is None:
+            return None
+    return request({'action': 'collect', 'argv': collector_argv(options, out_dir)}, info, timeout)
@@ -18,19 +18,18 @@ Output example:
 {"ok": true, "jobs": [...], "out_dir": ""}
 """
 from __future__ import annotations
-import io
 import os
 import sys
 import json
 import struct
-import subprocess
-from typing import Any, Dict, List
-from pathlib import Path
-import base64
-import gzip
+from typing import Any, Dict, List, Optional
 import time
 from datetime import datetime
 
+# Chrome starts this host for every message, so only the framing helpers are
+# imported up front; the HAR parser and extractors load on first use
+from framing import compress_reply, negotiate_encoding, write_frames
+
 # ------------- Native messaging helpers -------------
 
 def _read_message() -> Dict[str, Any]:
@@ -45,125 +44,52 @@ def _read_message() -> Dict[str, Any]:
         return {}
 
 
+# Client-supplied id of the message being answered, echoed on chunk frames
+_request_id: Any = None
+# Reply encoding the client advertised (accept_encoding), if any
+_encoding: Optional[str] = None
+
+
 def _write_message(obj: Dict[str, Any]) -> None:
-    data = json.dumps(obj, ensure_ascii=False).encode('utf-8')
-    sys.stdout.buffer.write(struct.pack('<I', len(data)))
-    sys.stdout.buffer.write(data)
-    sys.stdout.buffer.flush()
+    # Large replies are compressed when negotiated and split into chunk
+    # frames to stay under Chrome's 1 MB limit
+    write_frames(sys.stdout.buffer, compress_reply(obj, _encoding), _request_id, ensure_ascii=False)
 
 
 # ------------- HAR processing -------------
 
-def _extract_jobs_from_json(obj: Any) -> List[Dict[str, Any]]:
-    """Recursively extract job-like dicts with (title, description/snippet)."""
-    out: List[Dict[str, Any]] = []
-
-    def visit(v: Any):
-        if isinstance(v, dict):
-            title = v.get('title') or v.get('jobTitle')
-            desc = v.get('description') or v.get('snippet') or v.get('jobDescription')
-            if title and desc:
-                out.append({
-                    'title': str(title),
-                    'description': str(desc),
-                    'skills': v.get('skills') or v.get('requiredSkills') or [],
-                    'budget': v.get('budget') or v.get('pay') or v.get('price') or '',
-                    'url': v.get('url') or v.get('jobUrl') or v.get('link') or ''
-                })
-            for vv in v.values():
-                visit(vv)
-        elif isinstance(v, list):
-            for item in v:
-                visit(item)
-
-    visit(obj)
-    # de-dup
-    seen = set()
-    uniq: List[Dict[str, Any]] = []
-    for j in out:
-        key = (j.get('url') or '') + '|' + (j.get('title') or '')
-        if key in seen:
-            continue
-        seen.add(key)
-        uniq.append(j)
-    return uniq[:200]
-
-
-def _try_parse_json(text: str) -> Any:
-    s = text.strip()
-    # Trim common XSSI prefixes
-    for prefix in (")]}',\n", ")]}',", ")]}'\n", ")]}'\n\n"):
-        if s.startswith(prefix):
-            s = s[len(prefix):]
-    # Try direct parse
-    try:
-        return json.loads(s)
-    except Exception:
-        pass
-    # Heuristic: slice to first { or [ and last } or ]
-    first = min([i for i in [s.find('{'), s.find('[')] if i >= 0] or [-1])
-    last_brace = s.rfind('}')
-    last_bracket = s.rfind(']')
-    last = max(last_brace, last_bracket)
-    if first >= 0 and last > first:
-        candidate = s[first:last+1]
-        try:
-            return json.loads(candidate)
-        except Exception:
-            return None
-    return None
+def _extract_jobs_from_json(obj: Any, endpoint: str = '', ops: Optional[List[str]] = None,
+                            url: str = '') -> List[Dict[str, Any]]:
+    """Extract jobs via the extractor registered for the request's operation; see job_operations."""
+    from job_operations import route_jobs
+
+    return route_jobs(obj, ops, endpoint, url)[:200]
 
 
 def _load_jobs_from_har(har_path: str) -> List[Dict[str, Any]]:
     if not os.path.isfile(har_path):
         return []
-    try:
-        with io.open(har_path, 'r', encoding='utf-8') as f:
-            har = json.load(f)
-    except Exception:
-        # Sometimes HAR is huge; if failed, try reading and json.loads
-        data = io.open(har_path, 'rb').read()
-        try:
-            har = json.loads(data.decode('utf-8', 'ignore'))
-        except Exception:
-            return []
+    from har_stream import iter_response_bodies
+    from job_extractor import endpoint_key, request_operations
+    from json_locator import iter_json_values, may_contain_json
 
     jobs: List[Dict[str, Any]] = []
-    entries = (har.get('log') or {}).get('entries') or []
-    
-    for ent in entries[:2000]:
+    # Entries are streamed one at a time so huge HAR exports do not blow up memory
+    for ent, text in iter_response_bodies(har_path):
         try:
-            resp = (ent.get('response') or {})
-            cont = (resp.get('content') or {})
+            cont = ((ent.get('response') or {}).get('content') or {})
             mime = (cont.get('mimeType') or '').lower()
-            text = cont.get('text') or ''
-            if not text:
-                continue
-            # If base64 encoded, decode (and gunzip if needed)
-            if cont.get('encoding') == 'base64':
-                try:
-                    raw = base64.b64decode(text)
-                    try:
-                        text = raw.decode('utf-8', 'ignore')
-                    except Exception:
-                        # try gzip
-                        try:
-                            text = gzip.decompress(raw).decode('utf-8', 'ignore')
-                        except Exception:
-                            text = ''
-                except Exception:
-                    text = ''
-            # Skip if still empty
-            if not text:
-                continue
             # Accept even if mimeType not json as long as content looks like JSON
-            if ('json' not in mime) and not (text.strip().startswith('{') or text.strip().startswith('[')):
+            if not may_contain_json(mime, text):
                 # not JSON-like
                 continue
-            payload = _try_parse_json(text)
-            if payload is None:
-                continue
-            jobs.extend(_extract_jobs_from_json(payload))
+            # A body may hold several documents (NDJSON, GraphQL batches, HTML state blobs)
+            req = ent.get('request') or {}
+            url = req.get('url') or ''
+            ops = request_operations(url, req.get('postData'))
+            endpoint = endpoint_key(url, ops=ops)
+            for payload in iter_json_values(text):
+                jobs.extend(_extract_jobs_from_json(payload, endpoint, ops, url))
         except Exception:
             continue
     return jobs[:200]
@@ -173,6 +99,12 @@ def _load_jobs_from_har(har_path: str) -> List[Dict[str, Any]]:
 
 def run_playwright_collector(options: Dict[str, Any]) -> Dict[str, Any]:
     """Run the actual Playwright collector script."""
+    import subprocess
+    from pathlib import Path
+
+    import json_backend
+    from collector_client import collector_argv, submit_collect
+
     try:
         # Find the collect_upwork_data.py script
         root = Path(__file__).resolve().parents[1]  # upwork2 directory
@@ -189,27 +121,13 @@ def run_playwright_collector(options: Dict[str, Any]) -> Dict[str, Any]:
         out_dir = root / 'scripts' / 'data' / f'session-{ts}'
         out_dir.mkdir(parents=True, exist_ok=True)
         
-        # Build command
-        python = sys.executable
-        
-        # If attach mode without CDP, switch to fresh mode
-        mode = options.get('mode', 'fresh')
-        if mode == 'attach' and not options.get('cdp'):
-            mode = 'fresh'  # Fallback to fresh mode if no CDP endpoint
-        
-        cmd = [
-            python, str(collect_script),
-            '--mode', mode,
-            '--list-scroll', str(options.get('list_scroll', 3)),
-            '--details', str(options.get('details', 5)),
-            '--out', str(out_dir),
-            '--headless', 'false',
-            '--no-pause'
-        ]
-        
-        # Add CDP endpoint if in attach mode with valid CDP
-        if mode == 'attach' and options.get('cdp'):
-            cmd.extend(['--cdp', options['cdp']])
+        # A running collector daemon keeps the browser warm between runs
+        # (see collector_client); spawn the script only when there is none
+        daemon_reply = submit_collect(options, out_dir)
+        if daemon_reply is not None:
+            return daemon_reply
+
+        cmd = [sys.executable, str(collect_script), *collector_argv(options, out_dir)]
         
         # Run the collector
         result = subprocess.run(
@@ -230,7 +148,7 @@ def run_playwright_collector(options: Dict[str, Any]) -> Dict[str, Any]:
         if jobs_file.exists():
             try:
                 with open(jobs_file, 'r', encoding='utf-8') as f:
-                    jobs = json.load(f)
+                    jobs = json_backend.loads(f.read())
                     return {
                         'ok': True,
                         'jobs': jobs,
@@ -287,100 +205,111 @@ def get_mock_jobs() -> List[Dict[str, Any]]:
 
 # ------------- Main -------------
 
-def main():
-    try:
-        msg = _read_message() or {}
-        
-        # Handle different actions
-        action = msg.get('action')
-        
-        # If no action specified, check if it looks like collector options
-        if not action:
-            if any(k in msg for k in ['mode', 'list_scroll', 'details', 'cdp']):
-                action = 'run_collector'
-            else:
-                action = 'read_har'
-        
-        if action == 'run_collector':
-            # Try to run Playwright collector
-            result = run_playwright_collector(msg)
-            if not result['ok']:
-                # If collector fails, try HAR as fallback
-                har_path = (
-                    msg.get('har_path')
-                    or os.environ.get('UPAI_HAR_PATH')
-                    or r"C:\\Users\\TT\\upwork2\\www.upwork.com.har"
-                )
-                jobs = _load_jobs_from_har(har_path)
-                if jobs:
-                    _write_message({
-                        'ok': True, 
-                        'jobs': jobs, 
-                        'out_dir': '',
-                        'note': 'Collector failed, using HAR file instead'
-                    })
-                elif msg.get('use_mock', False):
-                    # Use mock data if requested
-                    _write_message({
-                        'ok': True,
-                        'jobs': get_mock_jobs(),
-                        'out_dir': '',
-                        'note': 'Using mock data for testing'
-                    })
-                else:
-                    _write_message(result)  # Return the original error
-            else:
-                _write_message(result)
-                
-        elif action == 'read_har':
-            # Read from HAR file
-            har_path = (
-                msg.get('har_path')
-                or os.environ.get('UPAI_HAR_PATH')
-                or r"C:\\Users\\TT\\upwork2\\www.upwork.com.har"
-            )
-            jobs = _load_jobs_from_har(har_path)
-            if not jobs and msg.get('use_mock', False):
-                jobs = get_mock_jobs()
-                _write_message({
-                    'ok': True, 
-                    'jobs': jobs, 
-                    'out_dir': '',
-                    'note': 'No jobs in HAR, using mock data'
-                })
-            else:
-                _write_message({
-                    'ok': True, 
-                    'jobs': jobs, 
-                    'out_dir': ''
-                })
-                
-        elif action == 'test':
-            # Test mode - return mock data
-            _write_message({
+def handle_request(msg: Dict[str, Any]) -> Dict[str, Any]:
+    """Reply to one collector request (run_collector, read_har, test, ping).
+
+    native_host also calls this for collector requests on a long-lived port
+    (see host_launcher.is_collector_request).
+    """
+    # Handle different actions
+    action = msg.get('action')
+
+    # If no action specified, check if it looks like collector options
+    if not action:
+        if any(k in msg for k in ['mode', 'list_scroll', 'details', 'cdp']):
+            action = 'run_collector'
+        else:
+            action = 'read_har'
+
+    if action == 'run_collector':
+        # Try to run Playwright collector
+        result = run_playwright_collector(msg)
+        if result['ok']:
+            return result
+        # If collector fails, try HAR as fallback
+        har_path = (
+            msg.get('har_path')
+            or os.environ.get('UPAI_HAR_PATH')
+            or r"C:\\Users\\TT\\upwork2\\www.upwork.com.har"
+        )
+        jobs = _load_jobs_from_har(har_path)
+        if jobs:
+            from seen_jobs import filter_new_jobs, new_only_from
+            if new_only_from(msg):
+                jobs = filter_new_jobs(jobs)
+            return {
+                'ok': True,
+                'jobs': jobs,
+                'out_dir': '',
+                'note': 'Collector failed, using HAR file instead'
+            }
+        if msg.get('use_mock', False):
+            # Use mock data if requested
+            return {
                 'ok': True,
                 'jobs': get_mock_jobs(),
                 'out_dir': '',
-                'note': 'Test mode - returning mock data'
-            })
-            
-        elif action == 'ping':
-            # Ping/pong for connectivity testing
-            _write_message({
-                'action': 'pong',
+                'note': 'Using mock data for testing'
+            }
+        return result  # Return the original error
+
+    elif action == 'read_har':
+        # Read from HAR file
+        har_path = (
+            msg.get('har_path')
+            or os.environ.get('UPAI_HAR_PATH')
+            or r"C:\\Users\\TT\\upwork2\\www.upwork.com.har"
+        )
+        jobs = _load_jobs_from_har(har_path)
+        if not jobs and msg.get('use_mock', False):
+            return {
                 'ok': True,
-                'message': 'Native host is running'
-            })
-            
-        else:
-            _write_message({
-                'ok': False,
-                'error': f'Unknown action: {action}'
-            })
-            
+                'jobs': get_mock_jobs(),
+                'out_dir': '',
+                'note': 'No jobs in HAR, using mock data'
+            }
+        from seen_jobs import filter_new_jobs, new_only_from
+        if new_only_from(msg):
+            jobs = filter_new_jobs(jobs)
+        return {
+            'ok': True,
+            'jobs': jobs,
+            'out_dir': ''
+        }
+
+    elif action == 'test':
+        # Test mode - return mock data
+        return {
+            'ok': True,
+            'jobs': get_mock_jobs(),
+            'out_dir': '',
+            'note': 'Test mode - returning mock data'
+        }
+
+    elif action == 'ping':
+        # Ping/pong for connectivity testing
+        return {
+            'action': 'pong',
+            'ok': True,
+            'message': 'Native host is running'
+        }
+
+    return {
+        'ok': False,
+        'error': f'Unknown action: {action}'
+    }
+
+
+def main(first: Optional[Dict[str, Any]] = None):
+    """Answer one request; host_launcher passes the `first` message it already read."""
+    global _request_id, _encoding
+    try:
+        msg = (first if first is not None else _read_message()) or {}
+        _request_id = msg.get('id')
+        _encoding = negotiate_encoding(msg)
+        _write_message(handle_request(msg))
     except Exception as exc:
         _write_message({'ok': False, 'error': str(exc)})
 
-
 if __name__ == '__main__':
     main()
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+Native messaging framing with chunked replies.
+
+Chrome drops any host -> browser message larger than 1 MB, so a reply whose
+JSON exceeds the frame budget is sent as a sequence of chunk frames:
+
+    {"type": "chunk", "id": <request id>, "stream": "9f2c...", "chunk": 0,
+     "total": 3, "data": "<slice of the reply's JSON text>"}
+
+Joining the `data` of chunks 0..total-1 of a stream and parsing the result
+gives the original reply. Replies that fit in one frame are sent unchanged,
+so small replies look exactly as before. The extension reassembles chunks in
+src/services/native-messaging.js; `ChunkAssembler` is the Python equivalent
+(used by tests and in-process readers).
+
+Every frame is a 4-byte native-order length followed by UTF-8 JSON.
+
+Compressed replies are opt-in. A request that carries
+`"accept_encoding": ["gzip", "deflate"]` may be answered with an envelope
+instead of the plain reply once the reply's JSON reaches the threshold
+(UPAI_COMPRESS_MIN_KB, default 64):
+
+    {"type": "encoded", "encoding": "gzip", "id": 7, "action": "...",
+     "original_size": 5123456, "compressed_size": 912345,
+     "data": "<base64 of the compressed reply JSON>"}
+
+An envelope is framed (and chunked) like any other message. `deflate` is
+the zlib format, matching DecompressionStream('deflate') in the extension.
+"""
+from __future__ import annotations
+import os
+import json
+import struct
+from typing import Any, BinaryIO, Dict, List, Optional
+
+# gzip/zlib/base64/secrets and json_backend are imported where they are used:
+# a host that only answers a ping never needs them (see bench_startup.py)
+
+# Chrome's limit for messages from the host
+CHROME_MAX_MESSAGE = 1024 * 1024
+# Budget per frame, leaving headroom below Chrome's limit
+MAX_FRAME_BYTES = CHROME_MAX_MESSAGE - 64 * 1024
+_LEN = struct.Struct('I')
+
+# Supported reply encodings, in the order the host prefers them
+ENCODINGS = ('gzip', 'deflate')
+DEFAULT_COMPRESS_MIN_BYTES = 64 * 1024
+# Fields copied from the reply onto its envelope so it can be routed and logged unopened
+_ENVELOPE_FIELDS = ('id', 'action', 'ok', 'success')
+
+
+def encode_message(message: Dict[str, Any], ensure_ascii: bool = True) -> bytes:
+    return json.dumps(message, ensure_ascii=ensure_ascii).encode('utf-8')
+
+
+def _chunk_frame(request_id: Any, stream: str, index: int, total: int, data: str, ensure_ascii: bool) -> bytes:
+    return encode_message({'type': 'chunk', 'id': request_id, 'stream': stream,
+                           'chunk': index, 'total': total, 'data': data}, ensure_ascii)
+
+
+def frame_payloads(message: Dict[str, Any], request_id: Any = None, max_bytes: int = MAX_FRAME_BYTES,
+                   ensure_ascii: bool = True) -> List[bytes]:
+    """JSON bodies of the frames that carry `message` (one unless it exceeds `max_bytes`)."""
+    body = encode_message(message, ensure_ascii)
+    if len(body) <= max_bytes:
+        return [body]
+    import secrets
+
+    text = body.decode('utf-8')
+    stream = secrets.token_hex(8)
+    # Escaping inside the "data" string grows a slice, so shrink any slice
+    # whose frame comes out too large. `total` is filled in afterwards; a
+    # 9-digit placeholder keeps the size check honest.
+    slices: List[str] = []
+    pos = 0
+    step = max(1, max_bytes - 256)
+    while pos < len(text):
+        size = step
+        while True:
+            piece = text[pos:pos + size]
+            n = len(_chunk_frame(request_id, stream, len(slices), 999999999, piece, ensure_ascii))
+            if n <= max_bytes or size == 1:
+                break
+            size = max(1, min(size - 1, size * max_bytes // n - 16))
+        slices.append(piece)
+        pos += len(piece)
+    total = len(slices)
+    return [_chunk_frame(request_id, stream, i, total, piece, ensure_ascii) for i, piece in enumerate(slices)]
+
+
+def write_frames(out: BinaryIO, message: Dict[str, Any], request_id: Any = None,
+                 max_bytes: int = MAX_FRAME_BYTES, ensure_ascii: bool = True,
+                 sizes: Optional[List[int]] = None) -> int:
+    """Write `message` as one or more length-prefixed frames; returns the frame count.
+
+    When given, `sizes` receives the byte length of each frame body.
+    """
+    frames = frame_payloads(message, request_id, max_bytes, ensure_ascii)
+    for body in frames:
+        if sizes is not None:
+            sizes.append(len(body))
+        out.write(_LEN.pack(len(body)))
+        out.write(body)
+    out.flush()
+    return len(frames)
+
+
+def negotiate_encoding(message: Any) -> Optional[str]:
+    """Encoding to use for the reply to `message`; None unless it sent accept_encoding."""
+    accept = message.get('accept_encoding') if isinstance(message, dict) else None
+    if isinstance(accept, str):
+        accept = [a.strip() for a in accept.split(',')]
+    if not isinstance(accept, list):
+        return None
+    for encoding in ENCODINGS:
+        if encoding in accept:
+            return encoding
+    return None
+
+
+def _compress_min_bytes() -> int:
+    try:
+        return int(float(os.environ.get('UPAI_COMPRESS_MIN_KB', '') or DEFAULT_COMPRESS_MIN_BYTES / 1024) * 1024)
+    except ValueError:
+        return DEFAULT_COMPRESS_MIN_BYTES
+
+
+def compress_reply(message: Dict[str, Any], encoding: Optional[str], min_bytes: Optional[int] = None,
+                   ensure_ascii: bool = False) -> Dict[str, Any]:
+    """Envelope carrying `message` compressed with `encoding`, or `message` itself.
+
+    The reply is sent as-is when no encoding was negotiated, when its JSON is
+    under `min_bytes`, or when compression would not make it smaller.
+    """
+    if encoding not in ENCODINGS:
+        return message
+    body = encode_message(message, ensure_ascii)
+    if len(body) < (_compress_min_bytes() if min_bytes is None else min_bytes):
+        return message
+    import base64, gzip, zlib
+
+    packed = gzip.compress(body, mtime=0) if encoding == 'gzip' else zlib.compress(body)
+    data = base64.b64encode(packed).decode('ascii')
+    if len(data) >= len(body):
+        return message
+    envelope = {'type': 'encoded', 'encoding': encoding}
+    envelope.update((k, message[k]) for k in _ENVELOPE_FIELDS if k in message)
+    envelope.update(original_size=len(body), compressed_size=len(packed), data=data)
+    return envelope
+
+
+def decode_reply(message: Dict[str, Any]) -> Dict[str, Any]:
+    """Original reply from an envelope (see compress_reply); other messages pass through."""
+    if message.get('type') != 'encoded':
+        return message
+    import base64, gzip, zlib
+    import json_backend
+
+    packed = base64.b64decode(message['data'])
+    body = gzip.decompress(packed) if message.get('encoding') == 'gzip' else zlib.decompress(packed)
+    return json_backend.loads(body.decode('utf-8'))
+
+
+def read_frame(inp: BinaryIO) -> Optional[bytes]:
+    """Body of the next length-prefixed frame, or None at EOF / on a short read."""
+    raw = inp.read(_LEN.size)
+    if not raw or len(raw) != _LEN.size:
+        return None
+    (length,) = _LEN.unpack(raw)
+    body = inp.read(length)
+    return body if len(body) == length else None
+
+
+class ChunkAssembler:
+    """Rebuilds replies from frames; plain (unchunked) frames pass straight through."""
+
+    def __init__(self):
+        self._streams: Dict[str, Dict[int, str]] = {}
+
+    def feed(self, frame: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Add one decoded frame; returns the complete reply once all its chunks are in."""
+        if frame.get('type') != 'chunk' or 'stream' not in frame:
+            return frame
+        parts = self._streams.setdefault(str(frame['stream']), {})
+        parts[int(frame['chunk'])] = frame.get('data') or ''
+        total = int(frame['total'])
+        if len(parts) < total:
+            return None
+        del self._streams[str(frame['stream'])]
+        import json_backend
+        return json_backend.loads(''.join(parts[i] for i in range(total)))
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+On-disk cache of parsed HAR results.
+
+`find_latest_har` usually resolves to the same file on every click, so the
+extracted jobs are stored under native/logs/har_cache and reused while the
+HAR is unchanged. Entries are keyed on (path, size, mtime_ns, extractor
+version); any change to the file or to the extractor makes a new key.
+
+Other per-HAR records, such as the byte-offset entry index, are stored the
+same way with put_record(..., kind=...). Records that must survive the file
+changing (tail-ingestion state) use stable=True, which keys on path alone.
+
+Eviction is LRU by file mtime: a hit touches the cache file, and when the
+directory grows past the size cap the least recently used files go first.
+"""
+from __future__ import annotations
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import json_backend
+
+DEFAULT_CACHE_DIR = Path(__file__).parent / 'logs' / 'har_cache'
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def entry_fingerprint(ent: Dict[str, Any], text: str) -> str:
+    """Short content hash of one HAR entry (request URL + response body)."""
+    url = ((ent.get('request') or {}).get('url') or '')
+    h = hashlib.blake2b(digest_size=8)
+    h.update(url.encode('utf-8', 'ignore'))
+    h.update(b'\0')
+    h.update(text.encode('utf-8', 'ignore'))
+    return h.hexdigest()
+
+
+class HarCache:
+    """Sidecar cache of {jobs, entry fingerprints} per HAR file version."""
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir or DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def from_env(cls) -> Optional['HarCache']:
+        """Build the cache from UPAI_HAR_CACHE* env vars; None when disabled."""
+        if os.environ.get('UPAI_HAR_CACHE', '1').lower() in ('0', 'false', 'no', 'off'):
+            return None
+        cache_dir = os.environ.get('UPAI_HAR_CACHE_DIR') or None
+        try:
+            max_mb = float(os.environ.get('UPAI_HAR_CACHE_MAX_MB', '') or DEFAULT_MAX_BYTES / (1024 * 1024))
+        except ValueError:
+            max_mb = DEFAULT_MAX_BYTES / (1024 * 1024)
+        return cls(Path(cache_dir) if cache_dir else None, int(max_mb * 1024 * 1024))
+
+    @staticmethod
+    def key(har_path: str, version: str, stable: bool = False) -> Optional[str]:
+        """Cache key for the HAR's current size/mtime, or for its path alone if `stable`."""
+        try:
+            st = os.stat(har_path)
+        except OSError:
+            return None
+        if stable:
+            raw = f'{os.path.abspath(har_path)}|{version}'
+        else:
+            raw = f'{os.path.abspath(har_path)}|{st.st_size}|{st.st_mtime_ns}|{version}'
+        return hashlib.sha1(raw.encode('utf-8', 'ignore')).hexdigest()
+
+    def _file(self, key: str, kind: str = '') -> Path:
+        return self.cache_dir / (f'{key}.{kind}.json' if kind else f'{key}.json')
+
+    @staticmethod
+    def _touch(path: Path) -> None:
+        """Mark a cache file as recently used (filesystem clocks can be coarse)."""
+        now = time.time_ns()
+        try:
+            os.utime(path, ns=(now, now))
+        except OSError:
+            pass
+
+    def get(self, har_path: str, version: str, kind: str = '', stable: bool = False) -> Optional[Dict[str, Any]]:
+        key = self.key(har_path, version, stable)
+        if not key:
+            return None
+        path = self._file(key, kind)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                record = json_backend.loads(f.read())
+        except (OSError, ValueError):
+            return None
+        self._touch(path)
+        return record
+
+    def put(self, har_path: str, version: str, jobs: List[Dict[str, Any]],
+            fingerprints: Optional[List[str]] = None) -> None:
+        self.put_record(har_path, version, {'jobs': jobs, 'entries': fingerprints or []})
+
+    def put_record(self, har_path: str, version: str, fields: Dict[str, Any], kind: str = '',
+                   stable: bool = False) -> None:
+        """Store an arbitrary record (e.g. kind='index') under the HAR's cache key."""
+        key = self.key(har_path, version, stable)
+        if not key:
+            return
+        try:
+            st = os.stat(har_path)
+            record = {
+                'path': os.path.abspath(har_path),
+                'size': st.st_size,
+                'mtime_ns': st.st_mtime_ns,
+                'version': version,
+            }
+            record.update(fields)
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self._file(key, kind)
+            # Unique per writer: several host threads may store the same record
+            tmp = path.with_name(f'{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(record, f, ensure_ascii=False)
+            os.replace(tmp, path)
+            self._touch(path)
+        except (OSError, TypeError, ValueError) as e:
+            logging.warning(f"HAR cache write failed for {har_path}: {e}")
+            return
+        self.evict()
+
+    def evict(self) -> None:
+        """Drop least recently used cache files until under the size cap."""
+        try:
+            files = [(p, p.stat()) for p in self.cache_dir.glob('*.json')]
+        except OSError:
+            return
+        total = sum(st.st_size for _, st in files)
+        for p, st in sorted(files, key=lambda x: x[1].st_mtime_ns):
+            if total <= self.max_bytes:
+                break
+            try:
+                p.unlink()
+                total -= st.st_size
+            except OSError:
+                pass
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+Byte-offset entry index for HAR files.
+
+Most of an Upwork HAR is JS bundles, images, fonts and telemetry. The index
+records, per entry, its byte range plus request/response metadata, so later
+parses can seek straight to the entries worth decoding:
+
+    {"start": 1234, "end": 5678, "url": "...", "method": "POST",
+     "mime": "application/json", "status": 200, "size": 4096}
+
+The index is built during the first full pass and persisted through
+HarCache (kind='index'), so it follows the same (path, size, mtime) key and
+LRU eviction as the parsed-job cache.
+"""
+from __future__ import annotations
+import io
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from har_cache import HarCache
+from har_stream import MAX_ENTRIES, iter_entry_spans, read_entry_at
+
+INDEX_VERSION = 'index-1'
+
+# Responses that can never carry job JSON
+_SKIP_MIME_PREFIXES = ('image/', 'font/', 'video/', 'audio/')
+_SKIP_MIME_PARTS = ('css', 'javascript', 'ecmascript', 'wasm', 'woff', 'html', 'xml')
+# Telemetry / analytics endpoints
+_SKIP_URL_PARTS = (
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net', 'facebook.com/tr',
+    'hotjar', 'sentry.io', 'bugsnag', 'nr-data.net', 'newrelic', 'datadoghq', 'segment.io',
+    'clarity.ms', '/telemetry', '/beacon', '/collect?', '/event-logger', '/px/',
+)
+# API endpoints that carry job data even when served with an odd mimeType
+_API_URL_PARTS = ('graphql', '/api/', 'search', '/jobs/', 'find-work')
+
+
+def entry_record(start: int, end: int, ent: Dict[str, Any]) -> Dict[str, Any]:
+    """Index row for one entry."""
+    req = ent.get('request') or {}
+    resp = ent.get('response') or {}
+    cont = resp.get('content') or {}
+    text = cont.get('text') or ''
+    size = cont.get('size')
+    if not isinstance(size, int) or size < 0:
+        size = len(text)
+    return {
+        'start': start,
+        'end': end,
+        'url': str(req.get('url') or ''),
+        'method': str(req.get('method') or ''),
+        'mime': str(cont.get('mimeType') or '').lower(),
+        'status': resp.get('status') or 0,
+        'size': size,
+        'has_body': bool(text),
+    }
+
+
+def is_job_candidate(rec: Dict[str, Any]) -> bool:
+    """Default predicate: keep API/JSON responses, drop static assets and telemetry."""
+    if not rec.get('has_body'):
+        return False
+    url = rec.get('url', '').lower()
+    mime = rec.get('mime', '')
+    if any(p in url for p in _SKIP_URL_PARTS):
+        return False
+    if 'json' in mime or any(p in url for p in _API_URL_PARTS):
+        return True
+    if mime.startswith(_SKIP_MIME_PREFIXES) or any(p in mime for p in _SKIP_MIME_PARTS):
+        return False
+    # text/plain, x-unknown, ... may still be JSON
+    return True
+
+
+def build_index(har_path: str) -> List[Dict[str, Any]]:
+    """Scan the whole HAR once and return its index rows."""
+    try:
+        return [entry_record(s, e, ent) for s, e, ent in iter_entry_spans(har_path)]
+    except (ValueError, OSError):
+        return []
+
+
+def load_index(har_path: str, cache: Optional[HarCache]) -> Optional[List[Dict[str, Any]]]:
+    if cache is None:
+        return None
+    record = cache.get(har_path, INDEX_VERSION, kind='index')
+    if record is None:
+        return None
+    return record.get('entries')
+
+
+def iter_indexed_entries(har_path: str,
+                         predicate: Callable[[Dict[str, Any]], bool] = is_job_candidate,
+                         cache: Optional[HarCache] = None,
+                         limit: Optional[int] = MAX_ENTRIES) -> Iterator[Dict[str, Any]]:
+    """Yield the entries among the first `limit` that satisfy `predicate`, in file order.
+
+    With a cached index only the matching byte ranges are read and decoded.
+    Otherwise the file is streamed once, matching entries are yielded as they
+    are found, and the finished index is stored in `cache`.
+    """
+    index = load_index(har_path, cache)
+    if index is not None:
+        with io.open(har_path, 'rb') as f:
+            for rec in index[:limit] if limit is not None else index:
+                if not predicate(rec):
+                    continue
+                ent = read_entry_at(har_path, rec['start'], rec['end'], f)
+                if ent is not None:
+                    yield ent
+        return
+
+    rows: List[Dict[str, Any]] = []
+    complete = False
+    try:
+        for s, e, ent in iter_entry_spans(har_path):
+            rec = entry_record(s, e, ent)
+            rows.append(rec)
+            if (limit is None or len(rows) <= limit) and predicate(rec):
+                yield ent
+        complete = True
+    except (ValueError, OSError):
+        pass
+    if complete and cache is not None:
+        cache.put_record(har_path, INDEX_VERSION, {'entries': rows}, kind='index')
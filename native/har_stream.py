@@ -0,0 +1,371 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming HAR reader shared by the native hosts.
+
+DevTools exports can run into hundreds of megabytes, so instead of
+json.load()-ing the whole file this module walks `log.entries` one entry at a
+time. Only the current entry (plus a small read buffer) is held in memory.
+
+Usage:
+    for ent, text in iter_response_bodies(har_path):
+        ...
+
+For CPU-heavy per-entry work, `map_entries` fans batches of entries out to a
+process pool while keeping results in file order.
+"""
+from __future__ import annotations
+import io
+import os
+import json
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import json_backend
+from body_decoder import decode_body
+
+CHUNK_SIZE = 1 << 16
+MAX_ENTRIES = 2000
+# Below this size a HAR is parsed in-process; pool start-up would cost more than it saves
+PARALLEL_MIN_BYTES = 32 * 1024 * 1024
+PARALLEL_BATCH_SIZE = 32
+
+_WS = ' \t\r\n'
+
+
+class HarFormatError(ValueError):
+    """Raised when the file does not look like a HAR document."""
+
+
+class _StreamBuffer:
+    """Text buffer over a file that grows on demand and drops consumed data.
+
+    With `track_bytes`, the file must be decoded with errors='surrogateescape'
+    so that tell_bytes() can map the cursor back to an exact byte offset.
+    """
+
+    def __init__(self, f: io.TextIOBase, chunk_size: int = CHUNK_SIZE,
+                 track_bytes: bool = False, start_byte: int = 0):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self._decoder = json.JSONDecoder()
+        self.track_bytes = track_bytes
+        self._mark = 0
+        self._mark_bytes = start_byte
+        # Set when consumed text contained undecodable bytes
+        self.saw_invalid = False
+        self.entry_start = 0
+
+    def tell_bytes(self) -> int:
+        """Absolute byte offset of the cursor (only valid with track_bytes)."""
+        if self._mark < self.pos:
+            chunk = self.buf[self._mark:self.pos]
+            try:
+                n = len(chunk.encode('utf-8'))
+            except UnicodeEncodeError:
+                self.saw_invalid = True
+                n = len(chunk.encode('utf-8', 'surrogateescape'))
+            self._mark_bytes += n
+            self._mark = self.pos
+        return self._mark_bytes
+
+    def _fill(self, want: int) -> bool:
+        """Read at least `want` more characters. Returns False at EOF."""
+        if self.eof:
+            return False
+        if self.pos:
+            # Compact: forget everything already consumed
+            if self.track_bytes:
+                self.tell_bytes()
+                self._mark = 0
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        data = self.f.read(max(want, self.chunk_size))
+        if not data:
+            self.eof = True
+            return False
+        self.buf += data
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it."""
+        while True:
+            n = len(self.buf)
+            while self.pos < n and self.buf[self.pos] in _WS:
+                self.pos += 1
+            if self.pos < n:
+                return self.buf[self.pos]
+            if not self._fill(self.chunk_size):
+                return ''
+
+    def expect(self, chars: str) -> str:
+        ch = self.peek()
+        if not ch or ch not in chars:
+            raise HarFormatError(f'expected one of {chars!r}, got {ch!r}')
+        self.pos += 1
+        return ch
+
+    def value(self) -> Any:
+        """Decode the next JSON value, reading more input until it is complete."""
+        self.peek()
+        want = self.chunk_size
+        while True:
+            try:
+                obj, end = self._decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # Incomplete value: grow geometrically so huge entries stay linear
+                if not self._fill(want):
+                    raise
+                want *= 2
+                continue
+            if end == len(self.buf) and not self.eof:
+                # A trailing number may continue in the next chunk
+                if self._fill(want):
+                    continue
+            self.pos = end
+            return obj
+
+    def skip_value(self) -> None:
+        self.value()
+
+
+def _iter_object_keys(sb: _StreamBuffer) -> Iterator[str]:
+    """Yield keys of the object at the cursor; caller must consume each value."""
+    sb.expect('{')
+    if sb.peek() == '}':
+        sb.pos += 1
+        return
+    while True:
+        key = sb.value()
+        sb.expect(':')
+        yield str(key)
+        if sb.expect(',}') == '}':
+            return
+
+
+def _walk_array(sb: _StreamBuffer, resume: bool = False) -> Iterator[Dict[str, Any]]:
+    """Yield the remaining dict elements of the array the cursor is in.
+
+    The cursor is either just past '[' or, with `resume`, just past an element.
+    """
+    if resume:
+        if sb.expect(',]') == ']':
+            return
+    elif sb.peek() == ']':
+        sb.pos += 1
+        return
+    while True:
+        if sb.track_bytes:
+            sb.peek()
+            sb.entry_start = sb.tell_bytes()
+        ent = sb.value()
+        if isinstance(ent, dict):
+            yield ent
+        if sb.expect(',]') == ']':
+            return
+
+
+def _walk_entries(sb: _StreamBuffer) -> Iterator[Dict[str, Any]]:
+    """Position `sb` on each element of log.entries in turn and yield it."""
+    for key in _iter_object_keys(sb):
+        if key != 'log':
+            sb.skip_value()
+            continue
+        for log_key in _iter_object_keys(sb):
+            if log_key != 'entries':
+                sb.skip_value()
+                continue
+            sb.expect('[')
+            yield from _walk_array(sb)
+        return
+
+
+def iter_har_entries(har_path: str, limit: Optional[int] = MAX_ENTRIES) -> Iterator[Dict[str, Any]]:
+    """Yield `log.entries[*]` one at a time without loading the whole file."""
+    with io.open(har_path, 'r', encoding='utf-8-sig', errors='ignore') as f:
+        for count, ent in enumerate(_walk_entries(_StreamBuffer(f)), start=1):
+            yield ent
+            if limit is not None and count >= limit:
+                return
+
+
+def iter_entry_spans(har_path: str, resume_at: Optional[int] = None) -> Iterator[Tuple[int, int, Dict[str, Any]]]:
+    """Yield (start_byte, end_byte, entry) for every entry, for building seek indexes.
+
+    With `resume_at` (the end_byte of a previously seen entry) scanning starts
+    right after that entry, so only entries appended since are read.
+    """
+    with io.open(har_path, 'rb') as raw:
+        if resume_at is None:
+            start_byte = 3 if raw.read(3) == b'\xef\xbb\xbf' else 0
+        else:
+            start_byte = resume_at
+        raw.seek(start_byte)
+        f = io.TextIOWrapper(raw, encoding='utf-8', errors='surrogateescape')
+        sb = _StreamBuffer(f, track_bytes=True, start_byte=start_byte)
+        walker = _walk_entries(sb) if resume_at is None else _walk_array(sb, resume=True)
+        for ent in walker:
+            start, end = sb.entry_start, sb.tell_bytes()
+            if sb.saw_invalid:
+                # Rare: invalid UTF-8 inside the entry; re-read it the lenient way
+                ent = read_entry_at(har_path, start, end) or {}
+                sb.saw_invalid = False
+            yield start, end, ent
+
+
+def read_entry_at(har_path: str, start: int, end: int, f: Optional[io.BufferedReader] = None) -> Optional[Dict[str, Any]]:
+    """Load a single entry from its byte range (as recorded by iter_entry_spans)."""
+    try:
+        if f is None:
+            with io.open(har_path, 'rb') as fh:
+                fh.seek(start)
+                data = fh.read(end - start)
+        else:
+            f.seek(start)
+            data = f.read(end - start)
+        ent = json_backend.loads(data.decode('utf-8', 'ignore'))
+    except (OSError, ValueError):
+        return None
+    return ent if isinstance(ent, dict) else None
+
+
+def decode_entry_body(ent: Dict[str, Any]) -> str:
+    """Return the response body of a HAR entry as text ('' if unavailable).
+
+    See body_decoder: base64 bodies are decompressed per Content-Encoding or
+    magic bytes, and binary payloads are rejected before text decoding.
+    """
+    return decode_body(ent)
+
+
+def iter_response_bodies(har_path: str, limit: Optional[int] = MAX_ENTRIES) -> Iterator[Tuple[Dict[str, Any], str]]:
+    """Yield (entry, decoded_body) for every entry that has a response body.
+
+    A truncated or malformed file simply ends the iteration; everything read
+    up to that point has already been yielded.
+    """
+    try:
+        for ent in iter_har_entries(har_path, limit=limit):
+            text = decode_entry_body(ent)
+            if text:
+                yield ent, text
+    except (ValueError, OSError):
+        return
+
+
+# ------------- Parallel entry processing -------------
+
+def _apply_batch(fn: Callable[[Dict[str, Any]], Any], batch: List[Dict[str, Any]]) -> List[Any]:
+    return [fn(ent) for ent in batch]
+
+
+def _slim_entry(ent: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep only the parts of an entry the extractors read, to cut pickling cost."""
+    req = ent.get('request') or {}
+    resp = ent.get('response') or {}
+    return {
+        'request': {k: req[k] for k in ('method', 'url', 'postData') if k in req},
+        'response': {k: resp[k] for k in ('status', 'headers', 'content') if k in resp},
+    }
+
+
+def resolve_workers(workers: Optional[int] = None) -> int:
+    """Worker count from the argument, UPAI_HAR_WORKERS, or the CPU count."""
+    if workers is None:
+        try:
+            workers = int(os.environ.get('UPAI_HAR_WORKERS', '') or 0)
+        except ValueError:
+            workers = 0
+        if workers <= 0:
+            workers = min(os.cpu_count() or 1, 8)
+    return max(1, int(workers))
+
+
+def map_entries(har_path: str, fn: Callable[[Dict[str, Any]], Any],
+                workers: Optional[int] = None,
+                min_parallel_bytes: int = PARALLEL_MIN_BYTES,
+                batch_size: int = PARALLEL_BATCH_SIZE,
+                limit: Optional[int] = MAX_ENTRIES,
+                entries: Optional[Iterator[Dict[str, Any]]] = None) -> Iterator[Any]:
+    """Yield fn(entry) for every HAR entry (or for `entries`, if given), in file order.
+
+    Files smaller than `min_parallel_bytes`, or workers == 1, run in-process.
+    Otherwise batches go to a ProcessPoolExecutor (fn must be picklable) with
+    at most 2 * workers batches in flight, so memory stays bounded. If the
+    pool breaks, the remaining batches are processed in-process. Workers are
+    spawned, not forked: the native host calls this from a worker thread
+    while its reader/writer threads hold locks a forked child would inherit.
+    """
+    workers = resolve_workers(workers)
+    try:
+        size = os.path.getsize(har_path)
+    except OSError:
+        return
+    if entries is None:
+        entries = iter_har_entries(har_path, limit=limit)
+
+    def _safe(it: Iterator[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        try:
+            yield from it
+        except (ValueError, OSError):
+            return
+
+    if workers <= 1 or size < min_parallel_bytes:
+        for ent in _safe(entries):
+            yield fn(ent)
+        return
+
+    def _batches() -> Iterator[List[Dict[str, Any]]]:
+        batch: List[Dict[str, Any]] = []
+        for ent in _safe(entries):
+            batch.append(_slim_entry(ent))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    pending: deque = deque()
+    pool: Optional[ProcessPoolExecutor] = None
+    try:
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        for batch in _batches():
+            if pool is not None:
+                try:
+                    pending.append((batch, pool.submit(_apply_batch, fn, batch)))
+                except Exception:
+                    pool.shutdown(cancel_futures=True)
+                    pool = None
+                    pending.append((batch, None))
+            else:
+                pending.append((batch, None))
+            while pending and (pool is None or len(pending) >= 2 * workers):
+                pool = yield from _drain_one(pending, fn, pool)
+        while pending:
+            pool = yield from _drain_one(pending, fn, pool)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+
+def _drain_one(pending: deque, fn: Callable[[Dict[str, Any]], Any],
+               pool: Optional[ProcessPoolExecutor]):
+    """Yield results of the oldest pending batch; returns the (possibly dropped) pool."""
+    batch, fut = pending.popleft()
+    results = None
+    if fut is not None:
+        try:
+            results = fut.result()
+        except Exception:
+            # Broken pool or unpicklable payload: fall back to in-process work
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+            pool = None
+    if results is None:
+        results = _apply_batch(fn, batch)
+    yield from results
+    return pool
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+Incremental tail-ingestion of growing HAR files.
+
+A HAR that is re-exported during a browsing session keeps its old entries
+and gains new ones at the end of `log.entries`. For each file we remember
+how far we got (entry count and the byte range of the last entry) plus a
+hash of that last entry's bytes. On the next run, if the anchor bytes are
+still in place, only the entries after it are parsed.
+
+State is stored through HarCache with stable=True (keyed on path only):
+
+    {"count": 412, "last_start": 901234, "end": 905678, "anchor": "9f...",
+     "jobs": [...], "fingerprints": [...]}
+"""
+from __future__ import annotations
+import io
+import os
+import hashlib
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from har_index import entry_record, is_job_candidate
+from har_stream import MAX_ENTRIES, iter_entry_spans
+
+TAIL_VERSION = 'tail-1'
+
+
+def anchor_hash(har_path: str, start: int, end: int) -> str:
+    """Hash of the raw bytes of one entry, used to check the prefix is unchanged."""
+    try:
+        with io.open(har_path, 'rb') as f:
+            f.seek(start)
+            data = f.read(end - start)
+    except OSError:
+        return ''
+    if len(data) != end - start:
+        return ''
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def state_from_index(har_path: str, rows: Optional[List[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+    """Initial tail state from a freshly built entry index (None if nothing to anchor on)."""
+    if not rows:
+        return None
+    last = rows[-1]
+    anchor = anchor_hash(har_path, last['start'], last['end'])
+    if not anchor:
+        return None
+    return {'count': len(rows), 'last_start': last['start'], 'end': last['end'], 'anchor': anchor}
+
+
+def can_resume(har_path: str, state: Optional[Dict[str, Any]]) -> bool:
+    """True when the file still contains the previously processed entries unchanged."""
+    if not state or not state.get('anchor'):
+        return False
+    try:
+        if os.path.getsize(har_path) < state['end']:
+            return False
+    except OSError:
+        return False
+    return anchor_hash(har_path, state['last_start'], state['end']) == state['anchor']
+
+
+def iter_appended_entries(har_path: str, state: Dict[str, Any],
+                          predicate: Callable[[Dict[str, Any]], bool] = is_job_candidate,
+                          limit: Optional[int] = MAX_ENTRIES) -> Iterator[Dict[str, Any]]:
+    """Yield entries appended after `state['end']` that pass `predicate`.
+
+    `state` is advanced in place as entries are consumed, so after the
+    iterator is exhausted it points at the new last entry. Entries past
+    `limit` are not read, matching a full parse.
+    """
+    last = None
+    try:
+        for s, e, ent in iter_entry_spans(har_path, resume_at=state['end']):
+            if limit is not None and state['count'] >= limit:
+                break
+            state['count'] += 1
+            last = (s, e)
+            if predicate(entry_record(s, e, ent)):
+                yield ent
+    except (ValueError, OSError):
+        # Export still being written: keep what was complete
+        pass
+    finally:
+        if last is not None:
+            state['last_start'], state['end'] = last
+            state['anchor'] = anchor_hash(har_path, last[0], last[1])
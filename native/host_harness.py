@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+"""
+Protocol harness for the native host, runnable on any OS.
+
+Drives the host over real length-prefixed frames, without Chrome or
+collector_runner.bat:
+
+    thread   native_host.serve on a background thread, wired to OS pipes
+             through read_message/send_message/process_message
+    process  `python native_host.py` (or host_launcher.py) as a child process
+
+`HostClient` keeps up to `window` requests in flight, matches replies by
+`id` (reassembling chunked and compressed replies, see framing) and records
+the round-trip latency of each. `make_har` writes synthetic HAR fixtures of
+any size made of userJobSearch GraphQL responses.
+
+Each host keeps its HAR cache, result pages, sync ledger and seen-jobs
+filter in its own state directory, so runs do not disturb the real ones.
+
+    with start_host(tmp, mode='thread') as client:
+        reply, seconds = client.request({'action': 'collect_jobs', 'har_path': har})
+        stats = latency_stats(client.run([{'action': 'ping'}] * 1000, window=8))
+"""
+from __future__ import annotations
+import os
+import sys
+import json
+import time
+import queue
+import struct
+import threading
+import subprocess
+from contextlib import contextmanager
+from functools import partial
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+
+from framing import ChunkAssembler, decode_reply, encode_message, read_frame
+
+HERE = Path(__file__).resolve().parent
+JOBS_PER_ENTRY = 50
+GRAPHQL_URL = 'https://www.upwork.com/api/graphql/v1?alias=userJobSearch'
+
+
+def _fixture_job(i: int) -> Dict[str, Any]:
+    return {
+        'id': f'{i}',
+        'title': f'Python scraper job {i}',
+        'description': f'Collect and clean listing data, batch {i}. ' * 4,
+        'ontologySkills': [{'prefLabel': 'Python'}, {'prefLabel': 'Scrapy'}],
+        'upworkHistoryData': {'client': {'country': 'Germany', 'totalFeedback': 4.9,
+                                         'totalSpent': {'amount': '1200.0'},
+                                         'paymentVerificationStatus': 'VERIFIED'}},
+        'jobTile': {'job': {'ciphertext': f'~01ab{i:08d}', 'totalApplicants': i % 50,
+                            'fixedPriceAmount': {'amount': '0.0'},
+                            'hourlyBudgetMin': 30, 'hourlyBudgetMax': 50,
+                            'publishTime': '2025-09-07T03:00:00Z'}},
+    }
+
+
+def make_har(path: Union[str, 'os.PathLike[str]'], jobs: int, per_entry: int = JOBS_PER_ENTRY) -> str:
+    """Write a HAR with `jobs` distinct jobs, `per_entry` per userJobSearch response."""
+    entries = []
+    for start in range(0, jobs, per_entry):
+        results = [_fixture_job(i) for i in range(start, min(start + per_entry, jobs))]
+        body = {'data': {'search': {'universalSearchNuxt': {'userJobSearchV1': {'results': results}}}}}
+        entries.append({
+            'request': {'method': 'POST', 'url': GRAPHQL_URL,
+                        'postData': {'mimeType': 'application/json',
+                                     'text': json.dumps({'operationName': 'userJobSearch'})}},
+            'response': {'status': 200,
+                         'content': {'mimeType': 'application/json', 'text': json.dumps(body)}},
+        })
+    path = os.fspath(path)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'log': {'version': '1.2', 'entries': entries}}, f)
+    return path
+
+
+def state_env(state_dir: Union[str, 'os.PathLike[str]']) -> Dict[str, str]:
+    """Env settings that keep a host's caches and ledgers under `state_dir`."""
+    state_dir = Path(state_dir)
+    return {
+        'UPAI_HAR_CACHE_DIR': str(state_dir / 'har_cache'),
+        'UPAI_RESULTS_DIR': str(state_dir / 'results'),
+        'UPAI_SYNC_LEDGER': str(state_dir / 'sync_ledger.json'),
+        'UPAI_SEEN_JOBS_PATH': str(state_dir / 'seen_jobs.bloom'),
+        'UPAI_PATH_TEMPLATES': str(state_dir / 'extractor_paths.json'),
+        'UPAI_LOG_DIR': str(state_dir / 'logs'),
+        'UPAI_LOG_LEVEL': os.environ.get('UPAI_LOG_LEVEL', 'WARNING'),
+    }
+
+
+class HostClient:
+    """Sends framed requests to a host and matches its replies by id."""
+
+    def __init__(self, out: BinaryIO, inp: BinaryIO, accept_encoding: Optional[List[str]] = None):
+        self._out = out
+        self._inp = inp
+        self.accept_encoding = accept_encoding
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._waiting: Dict[Any, 'queue.Queue'] = {}
+        self._reader = threading.Thread(target=self._read_replies, name='harness-read', daemon=True)
+        self._reader.start()
+
+    def _read_replies(self) -> None:
+        assembler = ChunkAssembler()
+        while True:
+            body = read_frame(self._inp)
+            if body is None:
+                break
+            reply = assembler.feed(json.loads(body))
+            if reply is None:
+                continue
+            received = time.perf_counter()
+            if reply.get('type') == 'encoded':
+                reply = decode_reply(reply)
+            with self._lock:
+                box = self._waiting.pop(reply.get('id'), None)
+            if box is not None:
+                box.put((reply, received))
+        # Host went away: wake everyone still waiting
+        with self._lock:
+            boxes, self._waiting = list(self._waiting.values()), {}
+        for box in boxes:
+            box.put((None, time.perf_counter()))
+
+    def send(self, message: Dict[str, Any]) -> Tuple['queue.Queue', float]:
+        """Send one request; returns the queue its reply will arrive on and the send time."""
+        message = dict(message)
+        box: queue.Queue = queue.Queue(maxsize=1)
+        with self._lock:
+            self._next_id += 1
+            message['id'] = self._next_id
+            self._waiting[message['id']] = box
+        if self.accept_encoding:
+            message['accept_encoding'] = self.accept_encoding
+        body = encode_message(message)
+        sent = time.perf_counter()
+        self._out.write(struct.pack('I', len(body)) + body)
+        self._out.flush()
+        return box, sent
+
+    def request(self, message: Dict[str, Any], timeout: float = 60.0) -> Tuple[Optional[Dict[str, Any]], float]:
+        """Round trip of one request: (reply, seconds). The reply is None if the host exited."""
+        box, sent = self.send(message)
+        reply, received = box.get(timeout=timeout)
+        return reply, received - sent
+
+    def run(self, messages: List[Dict[str, Any]], window: int = 1,
+            timeout: float = 60.0) -> Tuple[List[float], List[Optional[Dict[str, Any]]], float]:
+        """Send `messages` with at most `window` in flight.
+
+        Returns per-message round-trip seconds, the replies (in send order)
+        and the wall time of the whole run.
+        """
+        slots = threading.BoundedSemaphore(max(1, window))
+        latencies: List[float] = [0.0] * len(messages)
+        replies: List[Optional[Dict[str, Any]]] = [None] * len(messages)
+        collectors = []
+
+        def collect(i: int, box: 'queue.Queue', sent: float) -> None:
+            try:
+                replies[i], received = box.get(timeout=timeout)
+                latencies[i] = received - sent
+            finally:
+                slots.release()
+
+        start = time.perf_counter()
+        for i, message in enumerate(messages):
+            slots.acquire()
+            box, sent = self.send(message)
+            t = threading.Thread(target=collect, args=(i, box, sent), daemon=True)
+            t.start()
+            collectors.append(t)
+        for t in collectors:
+            t.join(timeout)
+        return latencies, replies, time.perf_counter() - start
+
+    def close(self) -> None:
+        """Close the request pipe (the host sees EOF and exits) and wait for its last replies."""
+        try:
+            self._out.close()
+        except OSError:
+            pass
+        self._reader.join(30)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of `values` (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def latency_stats(run: Tuple[List[float], List[Optional[Dict[str, Any]]], float]) -> Dict[str, Any]:
+    """n, failures, p50/p99 ms and messages per second for a HostClient.run result."""
+    latencies, replies, wall = run
+    return {
+        'n': len(latencies),
+        'failed': sum(1 for r in replies if not (r and r.get('ok'))),
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'msg_s': len(latencies) / wall if wall > 0 else 0.0,
+    }
+
+
+@contextmanager
+def _patched_env(env: Dict[str, str]) -> Iterator[None]:
+    saved = {k: os.environ.get(k) for k in env}
+    os.environ.update(env)
+    try:
+        yield
+    finally:
+        for k, v in saved.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+
+
+@contextmanager
+def _thread_host(env: Dict[str, str], workers: Optional[int],
+                 accept_encoding: Optional[List[str]]) -> Iterator[HostClient]:
+    import asyncio
+    import native_host
+
+    # The host's stores are created on first use from the env; start from none
+    # and put the previous ones back afterwards
+    import job_extractor
+    stores = ('_results', '_seen', '_ledger')
+    saved = {name: getattr(native_host, name) for name in stores}
+    saved_templates = job_extractor._default_templates
+    req_r, req_w = os.pipe()
+    rep_r, rep_w = os.pipe()
+    host_in, host_out = os.fdopen(req_r, 'rb'), os.fdopen(rep_w, 'wb')
+
+    def run_host() -> None:
+        try:
+            asyncio.run(native_host.serve(read=partial(native_host.read_message, host_in),
+                                          write=partial(native_host.send_message, out=host_out),
+                                          workers=workers))
+        finally:
+            host_in.close()
+            host_out.close()
+
+    with _patched_env(env):
+        for name in stores:
+            setattr(native_host, name, None)
+        job_extractor._default_templates = None
+        host = threading.Thread(target=run_host, name='harness-host', daemon=True)
+        host.start()
+        client = HostClient(os.fdopen(req_w, 'wb'), os.fdopen(rep_r, 'rb'), accept_encoding)
+        try:
+            yield client
+        finally:
+            client.close()
+            host.join(30)
+            client._inp.close()
+            if native_host._results is not None:
+                native_host._results.flush()
+            for name, store in saved.items():
+                setattr(native_host, name, store)
+            job_extractor._default_templates = saved_templates
+
+
+@contextmanager
+def _process_host(env: Dict[str, str], script: str, workers: Optional[int],
+                  accept_encoding: Optional[List[str]]) -> Iterator[HostClient]:
+    env = dict(os.environ, **env)
+    if workers:
+        env['UPAI_HOST_WORKERS'] = str(workers)
+    proc = subprocess.Popen([sys.executable, str(HERE / script)], cwd=str(HERE), env=env,
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    client = HostClient(proc.stdin, proc.stdout, accept_encoding)
+    try:
+        yield client
+    finally:
+        client.close()
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+        proc.stdout.close()
+
+
+@contextmanager
+def start_host(state_dir: Union[str, 'os.PathLike[str]'], mode: str = 'thread', script: str = 'native_host.py',
+               workers: Optional[int] = None,
+               accept_encoding: Optional[List[str]] = None) -> Iterator[HostClient]:
+    """Run a host with its state under `state_dir` and yield a connected HostClient.
+
+    `mode` is 'thread' (in this process) or 'process' (`script` in native/).
+    The host is shut down by closing its input, as Chrome does.
+    """
+    env = state_env(state_dir)
+    if mode == 'thread':
+        with _thread_host(env, workers, accept_encoding) as client:
+            yield client
+    elif mode == 'process':
+        with _process_host(env, script, workers, accept_encoding) as client:
+            yield client
+    else:
+        raise ValueError(f'Unknown host mode: {mode!r}')
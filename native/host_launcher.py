@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Start-up optimized entry point for the native messaging host.
+
+Chrome starts a fresh host process for every sendNativeMessage call, and a
+connectNative client opens with a `ping`, so the first reply is always on
+the clock. This launcher reads the first message with only sys, struct and
+json loaded and answers a ping straight away, before logging, typing, the
+asyncio loop or the HAR stack are imported.
+
+Collector requests (run_collector, read_har, test, or bare collector
+options as sent by the service worker's "Run Collector") go to the
+one-shot collector_enhanced.main; everything else is handled by
+native_host.main, which sends later collector requests on the same port to
+collector_enhanced too, so an action means the same thing wherever it comes
+in a session. collector_runner.bat starts this file:
+
+    "%PY%" "%~dp0host_launcher.py"
+
+`python native/bench_startup.py --host host_launcher.py` times it.
+"""
+
+import sys
+import json
+import time
+import struct
+
+# Answered by collector_enhanced (Playwright collector with HAR fallback)
+COLLECTOR_ACTIONS = frozenset({'run_collector', 'read_har', 'test'})
+COLLECTOR_OPTIONS = ('mode', 'list_scroll', 'details', 'cdp')
+
+
+def _timestamp() -> str:
+    # Same format as datetime.now().isoformat(), without importing datetime
+    now = time.time()
+    return time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(now)) + '.%06d' % int(now % 1 * 1_000_000)
+
+
+def _read_first():
+    raw = sys.stdin.buffer.read(4)
+    if len(raw) != 4:
+        return None
+    (length,) = struct.unpack('I', raw)
+    try:
+        return json.loads(sys.stdin.buffer.read(length).decode('utf-8'))
+    except ValueError:
+        return None
+
+
+def is_collector_request(message) -> bool:
+    """Should collector_enhanced answer this message? (native_host asks too, per message)"""
+    if not isinstance(message, dict):
+        return False
+    action = message.get('action')
+    if action:
+        return action in COLLECTOR_ACTIONS
+    return any(k in message for k in COLLECTOR_OPTIONS)
+
+
+def main():
+    first = _read_first()
+    if first is None:
+        return
+    replied = False
+    if isinstance(first, dict) and first.get('action') == 'ping':
+        # Mirrors native_host.process_message's pong
+        pong = {'ok': True, 'success': True, 'action': 'pong', 'timestamp': _timestamp()}
+        if first.get('id') is not None:
+            pong['id'] = first['id']
+        body = json.dumps(pong).encode('utf-8')
+        sys.stdout.buffer.write(struct.pack('I', len(body)) + body)
+        sys.stdout.buffer.flush()
+        replied = True
+    elif is_collector_request(first):
+        import collector_enhanced
+        collector_enhanced.main(first=first)
+        return
+
+    import native_host
+    native_host.main(first=first, replied=replied)
+
+
+if __name__ == '__main__':
+    main()
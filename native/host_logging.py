@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+Non-blocking, bounded logging for the native host.
+
+Callers only put records on a bounded in-memory queue (QueueHandler); a
+QueueListener thread formats them and writes to a size-rotated file. When
+the queue is full, new records are dropped rather than blocking the thread
+that is answering Chrome, and the number of dropped records is written to
+the log the next time a record gets through.
+
+Payloads are never dumped in full by default. `summarize` reduces a message
+to its action, id, top-level list/dict sizes and byte size, e.g.
+
+    recv action='collect_jobs' id=3 keys=[action,har_path,id] bytes=112
+    sent action='jobs_collected' id=3 jobs[250] frames=1 bytes=418211
+
+For debugging, a sampled fraction of payloads can also be captured in full
+(truncated) at DEBUG level.
+
+Settings (env):
+    UPAI_LOG_DIR=<dir>           where native_host writes native_host.log (default native/logs)
+    UPAI_LOG_LEVEL=INFO          DEBUG|INFO|WARNING|ERROR
+    UPAI_LOG_MAX_MB=5            rotate the log file at this size
+    UPAI_LOG_BACKUPS=3           rotated files to keep
+    UPAI_LOG_QUEUE=10000         records buffered before new ones are dropped
+    UPAI_LOG_SAMPLE=0            fraction of payloads captured in full (needs DEBUG)
+    UPAI_LOG_SAMPLE_MAX_KB=64    truncate each capture to this size
+"""
+from __future__ import annotations
+import os
+import json
+import queue
+import atexit
+import logging
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Optional, Union
+
+DEFAULT_LEVEL = 'INFO'
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_BACKUPS = 3
+DEFAULT_QUEUE_SIZE = 10_000
+DEFAULT_SAMPLE_MAX_BYTES = 64 * 1024
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Scalar fields worth showing verbatim in a summary
+_SUMMARY_FIELDS = ('action', 'id', 'type', 'ok', 'error', 'encoding', 'original_size', 'compressed_size')
+_MAX_VALUE_CHARS = 80
+
+_listener: Optional[QueueListener] = None
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, '') or default)
+    except ValueError:
+        return default
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full."""
+
+    def __init__(self, q: 'queue.Queue'):
+        super().__init__(q)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.dropped:
+            # Report the gap in the first record that gets through
+            record.msg = f"[{self.dropped} log records dropped] {record.msg}"
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+        else:
+            self.dropped = 0
+
+
+class _LazyRotatingFileHandler(RotatingFileHandler):
+    """Creates the log directory together with the file, on the first record."""
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+
+def setup_logging(log_dir: Union[str, 'os.PathLike[str]'], name: str = 'native_host', level: Optional[str] = None,
+                  max_bytes: Optional[int] = None, backups: Optional[int] = None,
+                  queue_size: Optional[int] = None,
+                  logger: Optional[logging.Logger] = None) -> QueueListener:
+    """Route `logger` (default: root) through a bounded queue to `<log_dir>/<name>.log`.
+
+    Arguments left as None come from the UPAI_LOG_* env vars. Calling it again
+    for the root logger returns the running listener.
+    """
+    global _listener
+    if logger is None and _listener is not None:
+        return _listener
+    level = (level or os.environ.get('UPAI_LOG_LEVEL') or DEFAULT_LEVEL).upper()
+    if max_bytes is None:
+        max_bytes = int(_env_float('UPAI_LOG_MAX_MB', DEFAULT_MAX_BYTES / (1024 * 1024)) * 1024 * 1024)
+    if backups is None:
+        backups = int(_env_float('UPAI_LOG_BACKUPS', DEFAULT_BACKUPS))
+    if queue_size is None:
+        queue_size = int(_env_float('UPAI_LOG_QUEUE', DEFAULT_QUEUE_SIZE))
+
+    # Nothing touches the disk until the first record is written
+    file_handler = _LazyRotatingFileHandler(os.path.join(os.fspath(log_dir), f'{name}.log'),
+                                            maxBytes=max(0, max_bytes), backupCount=max(0, backups),
+                                            encoding='utf-8', delay=True)
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    q: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+    listener = QueueListener(q, file_handler)
+
+    target = logger if logger is not None else logging.getLogger()
+    target.addHandler(DroppingQueueHandler(q))
+    target.setLevel(getattr(logging, level, logging.INFO))
+    listener.start()
+    atexit.register(_stop, listener)
+    if logger is None:
+        _listener = listener
+    return listener
+
+
+def _stop(listener: QueueListener) -> None:
+    """Flush queued records at exit (no-op if the listener was already stopped)."""
+    if getattr(listener, '_thread', None) is not None:
+        listener.stop()
+
+
+def summarize(payload: Any, size: Optional[int] = None, **extra: Any) -> str:
+    """One-line description of a message without its contents."""
+    if not isinstance(payload, dict):
+        parts = [type(payload).__name__]
+    else:
+        parts = []
+        for key in _SUMMARY_FIELDS:
+            if key in payload and not isinstance(payload[key], (dict, list)):
+                parts.append(f'{key}={repr(payload[key])[:_MAX_VALUE_CHARS]}')
+        sized = [f'{k}[{len(v)}]' for k, v in payload.items() if isinstance(v, (dict, list))]
+        parts.extend(sized)
+        rest = [str(k) for k in payload if k not in _SUMMARY_FIELDS and not isinstance(payload[k], (dict, list))]
+        if rest:
+            parts.append(f"keys=[{','.join(sorted(rest))}]")
+    parts.extend(f'{k}={v}' for k, v in extra.items())
+    if size is not None:
+        parts.append(f'bytes={size}')
+    return ' '.join(parts)
+
+
+def sample_rate() -> float:
+    return min(1.0, max(0.0, _env_float('UPAI_LOG_SAMPLE', 0.0)))
+
+
+def log_payload(direction: str, payload: Any, size: Optional[int] = None,
+                logger: Optional[logging.Logger] = None, **extra: Any) -> None:
+    """Log a summary of `payload`; capture it in full for a sampled fraction at DEBUG."""
+    log = logger or logging.getLogger()
+    if log.isEnabledFor(logging.INFO):
+        log.info('%s %s', direction, summarize(payload, size, **extra))
+    if log.isEnabledFor(logging.DEBUG):
+        rate = sample_rate()
+        # random is imported here; nothing else at start-up needs it
+        import random
+        if rate > 0 and random.random() < rate:
+            limit = int(_env_float('UPAI_LOG_SAMPLE_MAX_KB', DEFAULT_SAMPLE_MAX_BYTES / 1024) * 1024)
+            text = json.dumps(payload, ensure_ascii=False, default=str)
+            if len(text) > limit:
+                text = f'{text[:limit]}... [{len(text) - limit} chars truncated]'
+            log.debug('%s capture: %s', direction, text)
@@ -53,7 +53,7 @@ if (-not (Test-Path -LiteralPath $RunnerBat)) {
 setlocal
 set PY=C:\\Python311\\python.exe
 if not exist "%PY%" set PY=python
-"%PY%" "%~dp0collector.py"
+"%PY%" "%~dp0host_launcher.py"
 "@ | Set-Content -LiteralPath $RunnerBat -Encoding ASCII
 }
 
@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+"""
+Iterative, schema-guided job extractor.
+
+The generic extractor looks for job-like dicts (a title plus a description
+or snippet) anywhere in a payload. Walking every node of every payload is
+wasteful when, for a given endpoint, jobs always live at the same place,
+e.g. `data.search.edges[*].node`.
+
+`extract_jobs(obj, endpoint)` therefore:
+  1. follows the path templates learned for `endpoint`, if any;
+  2. falls back to a full walk (explicit stack, no recursion limit) when
+     there are no templates or they find nothing, and learns the key paths
+     ('*' for list indexes) where jobs were found.
+
+Templates only cover the paths seen so far, so a job list added to a
+response later would be missed. The full walk therefore also runs on an
+endpoint's first template hit in each process and then every
+UPAI_PATH_VERIFY_EVERY hits, learning any new paths. `PathTemplates.version`
+names the file's state for cache keys (see native_host).
+
+Templates are persisted to native/logs/extractor_paths.json
+(UPAI_PATH_TEMPLATES=<file> to relocate, =0 to disable learning).
+
+Settings (env):
+    UPAI_PATH_TEMPLATES=<file>|0
+    UPAI_PATH_VERIFY_EVERY=20     template hits between full-walk checks
+"""
+from __future__ import annotations
+import os
+import json
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import json_backend
+
+DEFAULT_TEMPLATES_PATH = Path(__file__).parent / 'logs' / 'extractor_paths.json'
+MAX_TEMPLATES_PER_ENDPOINT = 8
+DEFAULT_VERIFY_EVERY = 20
+
+Path_ = Tuple[str, ...]
+
+
+def job_from_dict(v: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Map a job-like dict to the wire format, or None if it is not job-like."""
+    title = v.get('title') or v.get('jobTitle')
+    desc = v.get('description') or v.get('snippet') or v.get('jobDescription')
+    if not (title and desc):
+        return None
+    return {
+        'title': str(title),
+        'description': str(desc),
+        'skills': v.get('skills') or v.get('requiredSkills') or [],
+        'budget': v.get('budget') or v.get('pay') or v.get('price') or '',
+        'url': v.get('url') or v.get('jobUrl') or v.get('link') or ''
+    }
+
+
+def walk_jobs(obj: Any) -> Tuple[List[Dict[str, Any]], List[Path_]]:
+    """Full pre-order walk with an explicit stack.
+
+    Returns jobs in the same order as the old recursive visitor, plus the key
+    path of every job-like dict found.
+    """
+    jobs: List[Dict[str, Any]] = []
+    paths: List[Path_] = []
+    stack: List[Tuple[Any, Path_]] = [(obj, ())]
+    while stack:
+        v, path = stack.pop()
+        if isinstance(v, dict):
+            job = job_from_dict(v)
+            if job is not None:
+                jobs.append(job)
+                paths.append(path)
+            children = [(vv, path + (str(k),)) for k, vv in v.items() if isinstance(vv, (dict, list))]
+            stack.extend(reversed(children))
+        elif isinstance(v, list):
+            stack.extend((item, path + ('*',)) for item in reversed(v) if isinstance(item, (dict, list)))
+    return jobs, paths
+
+
+def follow_path(obj: Any, path: Path_) -> Iterator[Any]:
+    """Yield every node reachable by `path` ('*' expands list items)."""
+    nodes = [obj]
+    for key in path:
+        nxt: List[Any] = []
+        for n in nodes:
+            if key == '*':
+                if isinstance(n, list):
+                    nxt.extend(n)
+            elif isinstance(n, dict) and key in n:
+                nxt.append(n[key])
+        if not nxt:
+            return
+        nodes = nxt
+    yield from nodes
+
+
+def request_operations(url: str, post_data: Any = None) -> List[str]:
+    """GraphQL operation names of a request, one per batched operation.
+
+    Taken from `operationName` in the POST body (a list for batched requests),
+    else from the `alias` query parameter. Empty for non-GraphQL requests.
+    """
+    ops: List[str] = []
+    text = post_data.get('text') if isinstance(post_data, dict) else post_data
+    if isinstance(text, str) and 'operationName' in text:
+        try:
+            body = json_backend.loads(text)
+        except ValueError:
+            body = None
+        for op in (body if isinstance(body, list) else [body]):
+            if isinstance(op, dict) and op.get('operationName'):
+                ops.append(str(op['operationName']))
+    if ops:
+        return ops
+    try:
+        alias = (parse_qs(urlparse(url or '').query).get('alias') or [''])[0]
+    except ValueError:
+        return []
+    return [alias] if alias else []
+
+
+def endpoint_key(url: str, post_data: Any = None, ops: Optional[List[str]] = None) -> str:
+    """Stable key for 'the same kind of response': GraphQL operation or alias, else URL path.
+
+    Pass `ops` (from request_operations) to avoid parsing the POST body twice.
+    """
+    if ops is None:
+        ops = request_operations(url, post_data)
+    if ops:
+        return f'gql:{ops[0]}'
+    try:
+        parsed = urlparse(url or '')
+    except ValueError:
+        return ''
+    return f'{parsed.netloc}{parsed.path}'
+
+
+class PathTemplates:
+    """Learned job locations per endpoint, persisted as JSON."""
+
+    def __init__(self, path: Optional[Path] = None, verify_every: int = DEFAULT_VERIFY_EVERY):
+        self.path = Path(path) if path else None
+        self.verify_every = max(1, int(verify_every))
+        self._templates: Optional[Dict[str, List[List[str]]]] = None
+        self._hits: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> 'PathTemplates':
+        try:
+            verify_every = int(os.environ.get('UPAI_PATH_VERIFY_EVERY', '') or DEFAULT_VERIFY_EVERY)
+        except ValueError:
+            verify_every = DEFAULT_VERIFY_EVERY
+        setting = os.environ.get('UPAI_PATH_TEMPLATES', '')
+        if setting.lower() in ('0', 'false', 'no', 'off'):
+            return cls(None, verify_every)
+        return cls(Path(setting) if setting else DEFAULT_TEMPLATES_PATH, verify_every)
+
+    def version(self) -> str:
+        """Short name of the templates file's current state ('none' if there is none)."""
+        if self.path is None:
+            return 'none'
+        try:
+            st = self.path.stat()
+        except OSError:
+            return 'none'
+        return f'{st.st_size:x}.{st.st_mtime_ns:x}'
+
+    def verify_due(self, endpoint: str) -> bool:
+        """Count a template hit; True on the first and every `verify_every`-th after."""
+        with self._lock:
+            n = self._hits.get(endpoint, 0)
+            self._hits[endpoint] = n + 1
+        return n % self.verify_every == 0
+
+    def _load(self) -> Dict[str, List[List[str]]]:
+        if self._templates is None:
+            data: Dict[str, List[List[str]]] = {}
+            if self.path is not None:
+                try:
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        loaded = json_backend.loads(f.read())
+                    if isinstance(loaded, dict):
+                        data = loaded
+                except (OSError, ValueError):
+                    pass
+            self._templates = data
+        return self._templates
+
+    def get(self, endpoint: str) -> List[Path_]:
+        return [tuple(p) for p in self._load().get(endpoint, [])]
+
+    def learn(self, endpoint: str, paths: List[Path_]) -> None:
+        if not endpoint or not paths:
+            return
+        with self._lock:
+            templates = self._load()
+            known = templates.setdefault(endpoint, [])
+            changed = False
+            for p in dict.fromkeys(paths):
+                if list(p) not in known and len(known) < MAX_TEMPLATES_PER_ENDPOINT:
+                    known.append(list(p))
+                    changed = True
+            if changed:
+                self._save()
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(f'{self.path.name}.{os.getpid()}.tmp')
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self._templates, f, indent=1)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+
+_default_templates: Optional[PathTemplates] = None
+
+
+def default_templates() -> PathTemplates:
+    global _default_templates
+    if _default_templates is None:
+        _default_templates = PathTemplates.from_env()
+    return _default_templates
+
+
+def _dedup(jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    seen = set()
+    uniq: List[Dict[str, Any]] = []
+    for j in jobs:
+        key = (j.get('url') or '') + '|' + (j.get('title') or '')
+        if key in seen:
+            continue
+        seen.add(key)
+        uniq.append(j)
+    return uniq
+
+
+def extract_jobs(obj: Any, endpoint: str = '', templates: Optional[PathTemplates] = None,
+                 dedup: bool = True) -> List[Dict[str, Any]]:
+    """Extract job-like dicts from a payload, using learned paths for `endpoint` when possible."""
+    if endpoint:
+        templates = templates or default_templates()
+        jobs: List[Dict[str, Any]] = []
+        for path in templates.get(endpoint):
+            for node in follow_path(obj, path):
+                if isinstance(node, dict):
+                    job = job_from_dict(node)
+                    if job is not None:
+                        jobs.append(job)
+        # Templates found jobs: trust them unless a periodic check is due
+        if jobs and not templates.verify_due(endpoint):
+            return _dedup(jobs) if dedup else jobs
+    jobs, paths = walk_jobs(obj)
+    if endpoint and paths:
+        templates.learn(endpoint, paths)
+    return _dedup(jobs) if dedup else jobs
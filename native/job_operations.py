@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+"""
+Operation-routed job extraction.
+
+Upwork's front end fetches jobs through a handful of known GraphQL
+operations (and a few REST feeds). For those the location and shape of each
+job is fixed, so instead of walking the whole payload we read the job nodes
+at known paths and map their fields directly into full records:
+
+    {"id", "title", "description", "skills", "budget", "url",
+     "client": {"country", "rating", "total_spent", "payment_verified"},
+     "applicants", "posted"}
+
+The operation comes from the HAR request: `operationName` in the POST body
+(one per operation for batched requests) or the `alias` query parameter,
+else the URL path. Unknown operations, and known ones whose payload does not
+match, fall back to the generic walker in job_extractor.
+
+Register more operations with:
+
+    @register_operation('myOperation', paths=('/api/my/feed',))
+    def _my_operation(doc): ...
+"""
+from __future__ import annotations
+import re
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from job_extractor import Path_, extract_jobs, follow_path
+from job_record import intern_skills
+
+JOB_URL = 'https://www.upwork.com/jobs/~{}'
+
+Extractor = Callable[[Any], List[Dict[str, Any]]]
+
+_OPERATIONS: Dict[str, Extractor] = {}
+_PATHS: List[Tuple[str, Extractor]] = []
+
+
+def _norm(name: str) -> str:
+    """'gql-query-jobdetails', 'JobDetails' and 'jobDetails' all compare equal."""
+    return re.sub(r'[^a-z0-9]', '', (name or '').lower())
+
+
+def register_operation(*names: str, paths: Tuple[str, ...] = ()) -> Callable[[Extractor], Extractor]:
+    """Register an extractor for GraphQL operation `names` and/or URL path prefixes."""
+    def _wrap(fn: Extractor) -> Extractor:
+        for name in names:
+            _OPERATIONS[_norm(name)] = fn
+        for prefix in paths:
+            _PATHS.append((prefix, fn))
+        return fn
+    return _wrap
+
+
+def find_extractor(op: str = '', url: str = '') -> Optional[Extractor]:
+    """Registered extractor for a GraphQL operation name, else for the URL path."""
+    fn = _OPERATIONS.get(_norm(op)) if op else None
+    if fn is None and url:
+        try:
+            path = urlparse(url).path
+        except ValueError:
+            return None
+        for prefix, candidate in _PATHS:
+            if path.startswith(prefix):
+                return candidate
+    return fn
+
+
+# ------------- Field mapping -------------
+
+def _get(node: Any, *path: str) -> Any:
+    for key in path:
+        if not isinstance(node, dict):
+            return None
+        node = node.get(key)
+    return node
+
+
+def _first(*values: Any) -> Any:
+    for v in values:
+        if v not in (None, '', [], {}):
+            return v
+    return None
+
+
+def _amount(v: Any) -> Any:
+    """Money may be a number, a string or {"amount"/"rawValue": ...}."""
+    if isinstance(v, dict):
+        return _first(v.get('amount'), v.get('rawValue'), v.get('displayValue'))
+    return v
+
+
+def _num(v: Any) -> str:
+    v = _amount(v)
+    if v in (None, ''):
+        return ''
+    try:
+        f = float(v)
+    except (TypeError, ValueError):
+        return str(v)
+    return str(int(f)) if f == int(f) else f'{f:g}'
+
+
+def _budget(job: Dict[str, Any]) -> str:
+    fixed = _num(_first(job.get('fixedPriceAmount'), job.get('amount'), _get(job, 'budget', 'amount'),
+                        job.get('budget') if not isinstance(job.get('budget'), dict) else None))
+    if fixed and fixed != '0':
+        return f'${fixed}'
+    lo = _num(_first(job.get('hourlyBudgetMin'), _get(job, 'hourlyBudget', 'min'),
+                     _get(job, 'extendedBudgetInfo', 'hourlyBudgetMin')))
+    hi = _num(_first(job.get('hourlyBudgetMax'), _get(job, 'hourlyBudget', 'max'),
+                     _get(job, 'extendedBudgetInfo', 'hourlyBudgetMax')))
+    if lo and hi and lo != hi:
+        return f'${lo}-{hi}/hr'
+    if lo or hi:
+        return f'${lo or hi}/hr'
+    return ''
+
+
+def _skills(*lists: Any) -> List[str]:
+    out: List[str] = []
+    for items in lists:
+        if not isinstance(items, list):
+            continue
+        for s in items:
+            name = _first(s.get('prefLabel'), s.get('prettyName'), s.get('name')) if isinstance(s, dict) else s
+            if name and str(name) not in out:
+                out.append(str(name))
+    return intern_skills(out)
+
+
+def _client(c: Any) -> Dict[str, Any]:
+    if not isinstance(c, dict):
+        return {}
+    return {
+        'country': _first(c.get('country'), _get(c, 'location', 'country')) or '',
+        'rating': _first(c.get('totalFeedback'), c.get('rating'), _get(c, 'stats', 'score')) or '',
+        'total_spent': _num(_first(c.get('totalSpent'), _get(c, 'stats', 'totalCharges'))),
+        'payment_verified': c.get('paymentVerificationStatus') in ('VERIFIED', 1, True),
+    }
+
+
+def _url(job: Dict[str, Any], cipher: Any = None) -> str:
+    cipher = str(_first(cipher, job.get('ciphertext')) or '').lstrip('~')
+    if cipher:
+        return JOB_URL.format(cipher)
+    return str(_first(job.get('url'), job.get('jobUrl'), job.get('jobPostingUrl')) or '')
+
+
+def job_record(job: Dict[str, Any], client: Any = None, **extra: Any) -> Optional[Dict[str, Any]]:
+    """Map a known Upwork job node to a full record, or None without a title."""
+    title = _first(extra.pop('title', None), job.get('title'))
+    if not title:
+        return None
+    rec = {
+        'id': str(_first(extra.pop('id', None), job.get('uid'), job.get('id'), job.get('ciphertext')) or ''),
+        'title': str(title),
+        'description': str(_first(extra.pop('description', None), job.get('description'),
+                                  job.get('publicDescription'), job.get('snippet')) or ''),
+        'skills': _skills(job.get('ontologySkills'), job.get('skills'), job.get('attrs')),
+        'budget': _budget(job),
+        'url': _url(job, extra.pop('ciphertext', None)),
+        'client': _client(_first(client, job.get('client'), job.get('buyer'))),
+        'applicants': _first(job.get('totalApplicants'), job.get('applicants'), job.get('proposalsTier')) or '',
+        'posted': str(_first(job.get('publishedOn'), job.get('publishTime'), job.get('createdDateTime'),
+                             job.get('createTime'), job.get('postedOn')) or ''),
+    }
+    rec.update(extra)
+    return rec
+
+
+def _collect(doc: Any, paths: Tuple[Path_, ...], mapper: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    jobs: List[Dict[str, Any]] = []
+    for path in paths:
+        for node in follow_path(doc, path):
+            if isinstance(node, dict):
+                rec = mapper(node)
+                if rec is not None:
+                    jobs.append(rec)
+        if jobs:
+            break
+    return jobs
+
+
+# ------------- Known operations -------------
+
+_SEARCH_PATHS: Tuple[Path_, ...] = (
+    ('data', 'search', 'universalSearchNuxt', 'userJobSearchV1', 'results', '*'),
+    ('data', 'search', 'universalSearchNuxt', 'visitorJobSearchV1', 'results', '*'),
+    ('data', 'marketplaceJobPostingsSearch', 'edges', '*', 'node'),
+    ('data', 'marketplaceJobPostingsSearch', 'results', '*'),
+    ('data', 'search', 'edges', '*', 'node'),
+)
+
+
+def _search_result(r: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    # userJobSearch splits a hit into text fields and a jobTile with budget/applicants
+    job = {**(_get(r, 'jobTile', 'job') or {}), **r}
+    return job_record(job, client=_get(r, 'upworkHistoryData', 'client'))
+
+
+@register_operation('userJobSearch', 'visitorJobSearch', 'marketplaceJobPostingsSearch', 'searchJobs', 'jobSearch')
+def _job_search(doc: Any) -> List[Dict[str, Any]]:
+    return _collect(doc, _SEARCH_PATHS, _search_result)
+
+
+_FEED_PATHS: Tuple[Path_, ...] = (
+    ('data', 'mostRecentJobsFeed', 'results', '*'),
+    ('data', 'bestMatchJobsFeed', 'results', '*'),
+    ('data', 'findWorkHomeNuxt', 'edges', '*', 'node'),
+    ('data', 'bestMatches', 'edges', '*', 'node'),
+    ('results', '*'),
+)
+
+
+@register_operation('findWorkHome', 'bestMatches', 'bestMatchJobsFeed', 'mostRecentJobsFeed',
+                    paths=('/ab/find-work/api/feeds/',))
+def _best_matches(doc: Any) -> List[Dict[str, Any]]:
+    return _collect(doc, _FEED_PATHS, job_record)
+
+
+_DETAIL_PATHS: Tuple[Path_, ...] = (
+    ('data', 'jobAuthDetails', 'opening'),
+    ('data', 'jobPubDetails', 'opening'),
+    ('data', 'jobDetails', 'opening'),
+    ('data', 'jobDetails'),
+)
+
+
+def _opening(o: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    job = o.get('job') if isinstance(o.get('job'), dict) else o
+    info = job.get('info') or {}
+    sands = job.get('sandsData') or {}
+    job = dict(job, totalApplicants=_first(job.get('totalApplicants'), _get(job, 'clientActivity', 'totalApplicants')),
+               ontologySkills=(sands.get('ontologySkills') or []) + (sands.get('additionalSkills') or []))
+    return job_record(job, client=_first(_get(o, 'buyer', 'info'), o.get('buyer')),
+                      id=info.get('id'), title=info.get('title'), ciphertext=info.get('ciphertext'))
+
+
+@register_operation('gql-query-jobdetails', 'jobDetails', 'getJobDetails', 'jobAuthDetails', 'jobPubDetails')
+def _job_details(doc: Any) -> List[Dict[str, Any]]:
+    return _collect(doc, _DETAIL_PATHS, _opening)
+
+
+# ------------- Routing -------------
+
+def _route(payload: Any, ops: List[str]) -> Iterator[Tuple[str, Any]]:
+    """Pair each document with its operation; batched responses answer ops in order."""
+    if len(ops) > 1 and isinstance(payload, list) and len(payload) == len(ops):
+        yield from zip(ops, payload)
+    else:
+        yield (ops[0] if ops else ''), payload
+
+
+def route_jobs(payload: Any, ops: Optional[List[str]] = None, endpoint: str = '', url: str = '',
+               dedup: bool = True) -> List[Dict[str, Any]]:
+    """Extract jobs with the registered extractor for the request, else the generic walker."""
+    jobs: List[Dict[str, Any]] = []
+    for op, doc in _route(payload, ops or []):
+        fn = find_extractor(op, url)
+        found = fn(doc) if fn is not None else []
+        if not found:
+            found = extract_jobs(doc, f'gql:{op}' if op and len(ops or []) > 1 else endpoint, dedup=dedup)
+        jobs.extend(found)
+    return jobs
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+Compact in-memory job representation.
+
+A job dict costs a hash table plus one pointer per key, and every job's
+`skills` list repeats the same few hundred skill names. When tens of
+thousands of jobs are held for paging or ranking that overhead dominates,
+so long-lived job lists are kept as `JobRecord`s instead:
+
+  * fixed `__slots__` instead of a per-job dict,
+  * skills stored as a tuple of small integer IDs from the global `SKILLS`
+    vocabulary (each name is stored once per process),
+  * uncommon keys kept in an `extra` dict that is None for most jobs.
+
+`JobRecord.from_dict(job).to_dict()` returns an equal dict, so the wire
+format is unchanged: a None field means the key was absent, unless its bit
+is set in `nulls` (the key was there with the value None). See bench_job_record.py for the measured saving.
+"""
+from __future__ import annotations
+import sys
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+
+class SkillVocab:
+    """Process-wide mapping of skill name <-> small integer ID."""
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def id(self, name: str) -> int:
+        i = self._ids.get(name)
+        if i is None:
+            with self._lock:
+                i = self._ids.get(name)
+                if i is None:
+                    i = len(self._names)
+                    self._names.append(sys.intern(name))
+                    self._ids[self._names[i]] = i
+        return i
+
+    def ids(self, names: Iterable[str]) -> Tuple[int, ...]:
+        return tuple(self.id(n) for n in names)
+
+    def name(self, i: int) -> str:
+        return self._names[i]
+
+    def names(self, ids: Iterable[int]) -> List[str]:
+        names = self._names
+        return [names[i] for i in ids]
+
+
+SKILLS = SkillVocab()
+
+
+def intern_skills(names: Iterable[Any]) -> List[Any]:
+    """Replace skill strings with the vocabulary's shared copies (non-strings pass through)."""
+    return [SKILLS.name(SKILLS.id(n)) if isinstance(n, str) else n for n in names]
+
+
+_FIELDS = ('id', 'title', 'description', 'skills', 'budget', 'url', 'client', 'applicants', 'posted', 'source',
+           'hash')
+_KNOWN = frozenset(_FIELDS)
+_NULL_BIT = {k: 1 << i for i, k in enumerate(_FIELDS)}
+
+
+class JobRecord:
+    """One job with slotted fields and interned skills; see module docstring."""
+
+    __slots__ = _FIELDS + ('extra', 'nulls')
+
+    def __init__(self, title: Optional[str] = None, description: Optional[str] = None,
+                 skills: Union[Tuple[int, ...], Any] = None, budget: Any = None, url: Optional[str] = None,
+                 id: Optional[str] = None, client: Any = None, applicants: Any = None,
+                 posted: Optional[str] = None, source: Optional[str] = None,
+                 extra: Optional[Dict[str, Any]] = None, hash: Optional[str] = None, nulls: int = 0):
+        self.id = id
+        self.title = title
+        self.description = description
+        # Tuple of SKILLS ids, or the original value when it is not a list of names
+        self.skills = skills
+        self.budget = budget
+        self.url = url
+        self.client = client
+        self.applicants = applicants
+        self.posted = posted
+        self.source = source
+        # Content hash used by delta sync (see job_sync)
+        self.hash = hash
+        self.extra = extra
+        # Bit per _FIELDS key that was present with the value None
+        self.nulls = nulls
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> 'JobRecord':
+        skills = d.get('skills')
+        if isinstance(skills, list) and all(isinstance(s, str) for s in skills):
+            skills = SKILLS.ids(skills)
+        budget = d.get('budget')
+        if isinstance(budget, str) and len(budget) <= 32:
+            # Budgets repeat a lot ('$500', '$30-50/hr')
+            budget = sys.intern(budget)
+        extra = {k: v for k, v in d.items() if k not in _KNOWN} or None
+        nulls = 0
+        for k, bit in _NULL_BIT.items():
+            if k in d and d[k] is None:
+                nulls |= bit
+        return cls(d.get('title'), d.get('description'), skills, budget, d.get('url'),
+                   d.get('id'), d.get('client'), d.get('applicants'), d.get('posted'), d.get('source'), extra,
+                   d.get('hash'), nulls)
+
+    def skill_names(self) -> Any:
+        return SKILLS.names(self.skills) if type(self.skills) is tuple else self.skills
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Wire-format dict with the keys the source dict had, explicit None values included."""
+        d: Dict[str, Any] = {}
+        nulls = self.nulls
+        for k in _FIELDS:
+            v = getattr(self, k)
+            if v is not None or nulls & _NULL_BIT[k]:
+                d[k] = v
+        if self.skills is not None:
+            d['skills'] = self.skill_names()
+        if self.extra:
+            d.update(self.extra)
+        return d
+
+    def __repr__(self) -> str:
+        return f'JobRecord({self.title!r}, url={self.url!r})'
+
+
+def compact_jobs(jobs: Iterable[Dict[str, Any]]) -> List[JobRecord]:
+    return [JobRecord.from_dict(j) for j in jobs]
+
+
+def as_dict(job: Union[JobRecord, Dict[str, Any]]) -> Dict[str, Any]:
+    return job.to_dict() if isinstance(job, JobRecord) else job
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+Delta sync: send the extension only the jobs it does not already have.
+
+Every extracted job carries a `hash` of its content (`content_hash`,
+computed once when the job is extracted and cached with it). A `sync`
+request names what the extension already holds in one of two ways:
+
+    {"action": "sync", "token": "3f9a0c1d.412"}       last token it was given
+    {"action": "sync", "known": ["9c1e...", ...]}     hashes of the jobs it holds
+
+and the reply carries only added and changed jobs plus a new token:
+
+    {"jobs": [...], "added": 3, "changed": 1, "unchanged": 240,
+     "token": "3f9a0c1d.416", "full": false}
+
+A token is `<epoch>.<seq>`. The ledger maps each job's canonical ID (see
+seen_jobs.canonical_job_id) to its last hash and the sequence number at
+which that hash was first seen; a sync returns the jobs whose sequence
+number is above the token's. If the ledger was reset (unknown epoch), or no
+watermark was sent, every job is returned with `full: true`.
+
+The host pages the delta like any result (see result_pages); `token` is
+null on every page but the last, so the client must read all pages
+(next_page) before it stores the new token.
+
+sendNativeMessage starts a host process per request, so several may sync
+at once. Each sync holds a lock file next to the ledger and first re-reads
+the ledger if another process wrote it since, so seq never goes backwards
+and no process's changes are overwritten.
+
+Settings (env):
+    UPAI_SYNC_LEDGER=<file>      default native/logs/sync_ledger.json
+    UPAI_SYNC_MAX_JOBS=100000    oldest entries are dropped beyond this
+"""
+from __future__ import annotations
+import os
+import json
+import hashlib
+import secrets
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import json_backend
+from seen_jobs import canonical_job_id
+
+DEFAULT_LEDGER_PATH = Path(__file__).parent / 'logs' / 'sync_ledger.json'
+DEFAULT_MAX_JOBS = 100_000
+HASH_KEY = 'hash'
+
+
+def content_hash(job: Dict[str, Any]) -> str:
+    """64-bit hex digest of a job's fields (key order and the hash itself excluded)."""
+    body = {k: v for k, v in job.items() if k != HASH_KEY}
+    text = json.dumps(body, sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=str)
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def add_content_hashes(jobs: Iterable[Dict[str, Any]]) -> None:
+    """Set `hash` on jobs that do not have one yet."""
+    for job in jobs:
+        if HASH_KEY not in job:
+            job[HASH_KEY] = content_hash(job)
+
+
+def parse_token(token: Any) -> Optional[Tuple[str, int]]:
+    """(epoch, seq) from a sync token; None if it is missing or malformed."""
+    if not isinstance(token, str) or '.' not in token:
+        return None
+    epoch, _, seq = token.partition('.')
+    if not epoch.isalnum() or not seq.isdigit():
+        return None
+    return epoch, int(seq)
+
+
+@contextmanager
+def _file_lock(path: Path) -> Iterator[None]:
+    """Exclusive lock on `path` across processes; best effort if locking is unsupported."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        f = open(path, 'a+b')
+    except OSError:
+        yield
+        return
+    try:
+        try:
+            if os.name == 'nt':
+                import msvcrt
+                f.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue  # LK_LOCK gives up after ~10 s; keep waiting
+            else:
+                import fcntl
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        except (ImportError, OSError):
+            pass
+        yield
+    finally:
+        # Closing the file releases the lock
+        f.close()
+
+
+class SyncLedger:
+    """Per-job hashes and change sequence numbers, persisted between host runs."""
+
+    def __init__(self, path: Optional[Path] = None, max_jobs: Optional[int] = None):
+        self.path = Path(path or os.environ.get('UPAI_SYNC_LEDGER') or DEFAULT_LEDGER_PATH)
+        if max_jobs is None:
+            try:
+                max_jobs = int(os.environ.get('UPAI_SYNC_MAX_JOBS', '') or DEFAULT_MAX_JOBS)
+            except ValueError:
+                max_jobs = DEFAULT_MAX_JOBS
+        self.max_jobs = max(1, max_jobs)
+        self._lock = threading.Lock()
+        self.epoch = ''
+        self.seq = 0
+        # canonical id -> [hash, seq of that hash, seq when first seen]
+        self.jobs: Dict[str, List[Any]] = {}
+        # (inode, mtime, size) of the file as last read or written by this
+        # process; every save replaces the file, so the inode changes too
+        self._stamp: Optional[Tuple[int, int, int]] = None
+        self._load()
+
+    def _file_stamp(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = self.path.stat()
+        except OSError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _load(self) -> None:
+        stamp = self._file_stamp()
+        try:
+            data = json_backend.loads(self.path.read_text(encoding='utf-8'))
+            self.epoch, self.seq, self.jobs = str(data['epoch']), int(data['seq']), dict(data['jobs'])
+        except Exception:
+            # Missing or unreadable: keep what we have, or start a new epoch
+            if not self.epoch:
+                self.epoch, self.seq, self.jobs = secrets.token_hex(4), 0, {}
+        self._stamp = stamp
+
+    def _save(self) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(f'{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+            tmp.write_text(json.dumps({'epoch': self.epoch, 'seq': self.seq, 'jobs': self.jobs},
+                                      separators=(',', ':')), encoding='utf-8')
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+        self._stamp = self._file_stamp()
+
+    @property
+    def token(self) -> str:
+        return f'{self.epoch}.{self.seq}'
+
+    def sync(self, jobs: List[Dict[str, Any]], token: Any = None,
+             known: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Record `jobs` and return the ones the client is missing (see module docstring).
+
+        `known` (hashes the client holds) takes precedence over `token`.
+        """
+        have = set(known) if known is not None else None
+        with self._lock, _file_lock(self.path.with_name(self.path.name + '.lock')):
+            # Another host process may have synced since we last read the ledger
+            if self._file_stamp() != self._stamp:
+                self._load()
+            parsed = parse_token(token)
+            full = have is None and (parsed is None or parsed[0] != self.epoch)
+            since = -1 if full or have is not None else parsed[1]
+            out: List[Dict[str, Any]] = []
+            added = changed = 0
+            for job in jobs:
+                h = job.get(HASH_KEY) or content_hash(job)
+                cid = canonical_job_id(job)
+                entry = self.jobs.get(cid)
+                previous = entry[0] if entry else None
+                if entry is None:
+                    self.seq += 1
+                    entry = self.jobs[cid] = [h, self.seq, self.seq]
+                elif entry[0] != h:
+                    self.seq += 1
+                    entry[0], entry[1] = h, self.seq
+                if have is not None:
+                    if h in have:
+                        continue
+                    is_change = previous is not None and previous in have
+                else:
+                    if entry[1] <= since:
+                        continue
+                    # Present at the watermark but with a different hash
+                    is_change = entry[2] <= since
+                out.append(job)
+                if is_change:
+                    changed += 1
+                else:
+                    added += 1
+            self._trim()
+            self._save()
+            new_token = self.token
+        return {'jobs': out, 'added': added, 'changed': changed, 'unchanged': len(jobs) - len(out),
+                'token': new_token, 'full': full}
+
+    def _trim(self) -> None:
+        excess = len(self.jobs) - self.max_jobs
+        if excess > 0:
+            for cid, _ in sorted(self.jobs.items(), key=lambda kv: kv[1][1])[:excess]:
+                del self.jobs[cid]
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Pluggable JSON decoding backend.
+
+JSON decoding dominates HAR parsing profiles, so hot paths call
+`json_backend.loads` instead of `json.loads` (and `dumps`, which returns
+compact UTF-8 bytes, for large writes). The fastest installed backend is
+used:
+
+    orjson    -> pip install orjson
+    simdjson  -> pip install pysimdjson
+    json      -> stdlib fallback (always available)
+
+Set UPAI_JSON_BACKEND=json|orjson|simdjson to force one. All backends raise
+ValueError on malformed input, so callers keep their `except` clauses.
+"""
+from __future__ import annotations
+import os
+import json
+from typing import Any, Callable, Dict, Union
+
+
+def _stdlib_loads(s: Union[str, bytes]) -> Any:
+    return json.loads(s)
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _load_orjson() -> Callable[[Union[str, bytes]], Any]:
+    import orjson
+    return orjson.loads
+
+
+def _load_simdjson() -> Callable[[Union[str, bytes]], Any]:
+    import simdjson
+
+    def _loads(s: Union[str, bytes]) -> Any:
+        try:
+            return simdjson.loads(s)
+        except (ValueError, RuntimeError) as e:
+            # Normalise binding-specific errors to ValueError like the others
+            raise ValueError(str(e)) from None
+    return _loads
+
+
+_FACTORIES: Dict[str, Callable[[], Callable[[Union[str, bytes]], Any]]] = {
+    'orjson': _load_orjson,
+    'simdjson': _load_simdjson,
+    'json': lambda: _stdlib_loads,
+}
+_PREFERENCE = ('orjson', 'simdjson', 'json')
+
+
+def available_backends() -> Dict[str, Callable[[Union[str, bytes]], Any]]:
+    """Map of backend name -> loads function for every importable backend."""
+    out: Dict[str, Callable[[Union[str, bytes]], Any]] = {}
+    for name in _PREFERENCE:
+        try:
+            out[name] = _FACTORIES[name]()
+        except ImportError:
+            continue
+    return out
+
+
+def _select() -> tuple:
+    forced = os.environ.get('UPAI_JSON_BACKEND', '').strip().lower()
+    order = ((forced,) if forced in _FACTORIES else ()) + _PREFERENCE
+    for name in order:
+        try:
+            return name, _FACTORIES[name]()
+        except ImportError:
+            continue
+    return 'json', _stdlib_loads
+
+
+BACKEND, _loads = _select()
+
+
+def loads(s: Union[str, bytes]) -> Any:
+    """Decode a JSON document with the selected backend."""
+    return _loads(s)
+
+
+def _select_dumps() -> Callable[[Any], bytes]:
+    # simdjson only parses; it encodes with the stdlib
+    if BACKEND == 'orjson':
+        import orjson
+        return orjson.dumps
+    return _stdlib_dumps
+
+
+_dumps = _select_dumps()
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode `obj` as compact UTF-8 JSON; raises TypeError for unsupported values."""
+    return _dumps(obj)
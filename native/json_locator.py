@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Locate every JSON document inside a response body.
+
+Bodies seen in Upwork HARs are not always a single JSON document:
+
+    )]}',\n{...}                       XSSI-prefixed JSON
+    {...}\n{...}\n                     NDJSON / concatenated GraphQL batches
+    [{...}, {...}]                      batched GraphQL (a single array)
+    --graphql\r\n...\r\n\r\n{...}      multipart incremental delivery
+    <script id="__NEXT_DATA__" type="application/json">{...}</script>
+    <script>window.__INITIAL_STATE__ = {...};</script>
+
+`iter_json_values` walks the text once: it jumps to the next '{' or '['
+with a compiled regex and lets the C scanner (`raw_decode`) consume a
+whole value from there, so no part of the body is searched twice.
+"""
+from __future__ import annotations
+import re
+import json
+from typing import Any, Iterator, Optional
+
+import json_backend
+
+_DECODER = json.JSONDecoder()
+_VALUE_START = re.compile(r'[\[{]')
+_SCRIPT = re.compile(r'<script\b([^>]*)>(.*?)</script\s*>', re.IGNORECASE | re.DOTALL)
+_STATE_ASSIGN = re.compile(r'(?:\b__[A-Z0-9_]+__|\bwindow\.[A-Za-z_$][\w$]*)\s*=\s*(?=[\[{])')
+# Prefixes that announce JSON even when the mimeType does not
+_JSON_LEADS = ('{', '[', ")]}'", 'while(1);', 'for(;;);')
+
+
+def may_contain_json(mime: str, text: str) -> bool:
+    """Cheap pre-filter: is this body worth handing to the locator?"""
+    mime = (mime or '').lower()
+    if 'json' in mime or 'html' in mime:
+        return True
+    return text.lstrip()[:10].startswith(_JSON_LEADS)
+
+
+def _scan(text: str, pos: int = 0, end: Optional[int] = None) -> Iterator[Any]:
+    """Yield each complete top-level object/array in text[pos:end], left to right."""
+    if end is None:
+        end = len(text)
+    while pos < end:
+        m = _VALUE_START.search(text, pos, end)
+        if not m:
+            return
+        start = m.start()
+        try:
+            obj, stop = _DECODER.raw_decode(text, start)
+        except ValueError:
+            # Not a JSON value here (prefix noise, JS code); resync after it
+            pos = start + 1
+            continue
+        if stop > end:
+            return
+        yield obj
+        pos = stop
+
+
+def _iter_html(text: str) -> Iterator[Any]:
+    for m in _SCRIPT.finditer(text):
+        attrs, start, end = m.group(1), m.start(2), m.end(2)
+        if 'json' in attrs.lower():
+            # __NEXT_DATA__, ld+json and other JSON script blocks
+            yield from _scan(text, start, end)
+            continue
+        for a in _STATE_ASSIGN.finditer(text, start, end):
+            try:
+                obj, _ = _DECODER.raw_decode(text, a.end())
+            except ValueError:
+                continue
+            yield obj
+
+
+def iter_json_values(text: str) -> Iterator[Any]:
+    """Yield every top-level JSON object/array found in `text`, in order."""
+    s = text.strip()
+    if not s:
+        return
+    if s[0] == '<':
+        yield from _iter_html(s)
+        return
+    if s[0] in '{[' and json_backend.BACKEND != 'json':
+        # Fast path for the common single-document body with a faster backend
+        try:
+            doc = json_backend.loads(s)
+        except ValueError:
+            doc = None
+        if doc is not None:
+            yield doc
+            return
+    yield from _scan(s)
@@ -4,152 +4,305 @@ Native messaging host for Upwork AI Assistant Chrome Extension
 Handles job collection and analysis through native messaging protocol
 """
 
+from __future__ import annotations
 import sys
 import json
 import struct
 import logging
+import threading
 import traceback
-from pathlib import Path
 from datetime import datetime
-import time
 import os
-import io
-import base64
-import gzip
-from typing import Any, Dict, List
-
-# Setup logging to a file since we can't use stdout
-log_dir = Path(__file__).parent / "logs"
-log_dir.mkdir(exist_ok=True)
-log_file = log_dir / f"native_host_{datetime.now().strftime('%Y%m%d')}.log"
-
-logging.basicConfig(
-    filename=str(log_file),
-    level=logging.DEBUG,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+# Chrome spawns a fresh host for every sendNativeMessage call, so start-up is
+# paid per request. Only what a `ping` needs is imported here; the HAR parser,
+# result store and asyncio loop are imported on first use (see bench_startup.py).
+from framing import write_frames
+from host_logging import log_payload, setup_logging
+
+if TYPE_CHECKING:
+    from har_cache import HarCache
+    from job_sync import SyncLedger
+    from result_pages import ResultStore
+    from seen_jobs import SeenJobs
+
+# Log to a size-rotated file since we can't use stdout; writes happen on a
+# background thread (see host_logging for the UPAI_LOG_* settings). Logging is
+# set up in main() and the file is only created once something is logged.
+# UPAI_LOG_DIR moves it elsewhere (tests and the protocol harness use a temp dir).
+log_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs')
 
 # ------------------ HAR utilities (inline, no external script needed) ------------------
 
-def _iter_entries(har: Dict[str, Any]):
+# Bump whenever extraction output changes so cached HAR results are invalidated
+EXTRACTOR_VERSION = '6'
+
+
+def _extractor_version() -> str:
+    """EXTRACTOR_VERSION plus the learned path templates' state, for HAR cache keys.
+
+    Templates decide which paths are read, so a result parsed with fewer of
+    them must not be served once more have been learned (see job_extractor).
+    """
+    from job_extractor import default_templates
+
+    return f'{EXTRACTOR_VERSION}-{default_templates().version()}'
+
+
+def _extract_jobs_from_json(obj: Any, endpoint: str = '', ops: Optional[List[str]] = None,
+                            url: str = '') -> List[Dict[str, Any]]:
+    """Extract jobs via the extractor registered for the request's operation; see job_operations."""
+    from job_operations import route_jobs
+
+    return route_jobs(obj, ops, endpoint, url)
+
+
+def _jobs_from_entry(ent: Dict[str, Any], with_fingerprint: bool = False) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
+    """Decode, parse and extract one HAR entry. Top-level so process-pool workers can run it."""
+    from har_cache import entry_fingerprint
+    from har_stream import decode_entry_body
+    from job_extractor import endpoint_key, request_operations
+    from json_locator import iter_json_values, may_contain_json
+
+    text = decode_entry_body(ent)
+    if not text:
+        return None
+    fp = entry_fingerprint(ent, text) if with_fingerprint else ''
     try:
-        entries = (har.get('log') or {}).get('entries') or []
-    except AttributeError:
-        entries = []
-    for e in entries[:2000]:
-        yield e
-
-
-def _extract_jobs_from_json(obj: Any) -> List[Dict[str, Any]]:
-    """Recursively extract job-like dicts: require title and description/snippet."""
-    out: List[Dict[str, Any]] = []
-
-    def visit(v: Any):
-        if isinstance(v, dict):
-            title = v.get('title') or v.get('jobTitle')
-            desc = v.get('description') or v.get('snippet') or v.get('jobDescription')
-            if title and desc:
-                out.append({
-                    'title': str(title),
-                    'description': str(desc),
-                    'skills': v.get('skills') or v.get('requiredSkills') or [],
-                    'budget': v.get('budget') or v.get('pay') or v.get('price') or '',
-                    'url': v.get('url') or v.get('jobUrl') or v.get('link') or ''
-                })
-            for vv in v.values():
-                visit(vv)
-        elif isinstance(v, list):
-            for item in v:
-                visit(item)
-
-    visit(obj)
-    # de-dup
-    seen = set()
-    uniq: List[Dict[str, Any]] = []
-    for j in out:
+        cont = ((ent.get('response') or {}).get('content') or {})
+        mime = (cont.get('mimeType') or '').lower()
+        # Accept JSON-like content (XSSI-prefixed, NDJSON, batched, or state blobs in HTML)
+        if not may_contain_json(mime, text):
+            return fp, []
+        req = ent.get('request') or {}
+        url = req.get('url') or ''
+        ops = request_operations(url, req.get('postData'))
+        endpoint = endpoint_key(url, ops=ops)
+        jobs: List[Dict[str, Any]] = []
+        for payload in iter_json_values(text):
+            jobs.extend(_extract_jobs_from_json(payload, endpoint, ops, url))
+        return fp, jobs
+    except Exception:
+        return fp, []
+
+
+def _merge_jobs(jobs: List[Dict[str, Any]], new_jobs: List[Dict[str, Any]],
+                seen: Optional[set] = None) -> List[Dict[str, Any]]:
+    """Append new_jobs to jobs, skipping url|title duplicates. Mutates and returns jobs.
+
+    Kept jobs get their content `hash` here, so it is cached with them (see job_sync).
+    """
+    from job_sync import add_content_hashes
+
+    if seen is None:
+        seen = {(j.get('url') or '') + '|' + (j.get('title') or '') for j in jobs}
+    start = len(jobs)
+    for j in new_jobs:
         key = (j.get('url') or '') + '|' + (j.get('title') or '')
         if key in seen:
             continue
         seen.add(key)
-        uniq.append(j)
-    return uniq[:200]
+        jobs.append(j)
+    add_content_hashes(jobs[start:])
+    return jobs
+
 
+def _parse_har_jobs(har_path: str, fingerprints: Optional[List[str]] = None,
+                    workers: Optional[int] = None, entries=None) -> List[Dict[str, Any]]:
+    """Uncapped, de-duplicated jobs from `entries` (default: the HAR's relevant entries)."""
+    from functools import partial
+    from har_cache import HarCache
+    from har_index import iter_indexed_entries
+    from har_stream import PARALLEL_MIN_BYTES, map_entries
 
-def _try_parse_json(text: str) -> Any:
-    s = text.strip()
-    # Trim common XSSI prefixes
-    for prefix in ("')]}\n", ")]}'\n", ")]}'", ")]}\n\n"):
-        if s.startswith(prefix):
-            s = s[len(prefix):]
-    # Direct parse
     try:
-        return json.loads(s)
-    except Exception:
-        pass
-    # Heuristic slice
-    first_candidates = [s.find('{'), s.find('[')]
-    first = min([i for i in first_candidates if i >= 0] or [-1])
-    last = max(s.rfind('}'), s.rfind(']'))
-    if first >= 0 and last > first:
-        candidate = s[first:last+1]
-        try:
-            return json.loads(candidate)
-        except Exception:
-            return None
-    return None
+        min_mb = float(os.environ.get('UPAI_HAR_PARALLEL_MIN_MB', '') or PARALLEL_MIN_BYTES / (1024 * 1024))
+    except ValueError:
+        min_mb = PARALLEL_MIN_BYTES / (1024 * 1024)
 
+    # Only API/JSON entries are decoded; a persisted byte-offset index lets
+    # repeat parses seek straight to them (UPAI_HAR_INDEX=0 scans everything)
+    if entries is None and os.environ.get('UPAI_HAR_INDEX', '1').lower() not in ('0', 'false', 'no', 'off'):
+        entries = iter_indexed_entries(har_path, cache=HarCache.from_env(), limit=None)
 
-def load_jobs_from_har(har_path: str) -> List[Dict[str, Any]]:
+    jobs: List[Dict[str, Any]] = []
+    seen: set = set()
+    fn = partial(_jobs_from_entry, with_fingerprint=fingerprints is not None)
+    # Stream entries one at a time; peak memory is bounded by the largest entry
+    for result in map_entries(har_path, fn, workers=workers, min_parallel_bytes=int(min_mb * 1024 * 1024),
+                              limit=None, entries=entries):
+        if result is None:
+            continue
+        fp, found = result
+        if fingerprints is not None:
+            fingerprints.append(fp)
+        _merge_jobs(jobs, found, seen)
+    return jobs
+
+
+def load_jobs_from_har(har_path: str, fingerprints: Optional[List[str]] = None,
+                       workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Parse all jobs from a HAR file. If `fingerprints` is given, per-entry hashes are appended to it.
+
+    There is no entry or job cap; callers page through large results (see result_pages).
+    Large files are processed on a process pool (`workers`, default UPAI_HAR_WORKERS
+    or CPU count); results are merged in entry order so output matches a serial run.
+    """
     if not har_path or not os.path.isfile(har_path):
         return []
-    try:
-        with io.open(har_path, 'r', encoding='utf-8') as f:
-            har = json.load(f)
-    except Exception:
-        try:
-            data = io.open(har_path, 'rb').read()
-            har = json.loads(data.decode('utf-8', 'ignore'))
-        except Exception:
-            return []
+    return _parse_har_jobs(har_path, fingerprints, workers)
+
+
+def _ingest_har_tail(har_path: str, cache: HarCache, workers: Optional[int] = None) -> Optional[List[Dict[str, Any]]]:
+    """Parse only entries appended since the last run; None if a full parse is needed."""
+    from har_tail import TAIL_VERSION, can_resume, iter_appended_entries
+
+    state = cache.get(har_path, f'{TAIL_VERSION}-{_extractor_version()}', kind='tail', stable=True)
+    if not can_resume(har_path, state):
+        return None
+    before = state['count']
+    fingerprints: List[str] = list(state.get('fingerprints') or [])
+    new_jobs = _parse_har_jobs(har_path, fingerprints, workers, entries=iter_appended_entries(har_path, state, limit=None))
+    state['jobs'] = _merge_jobs(list(state.get('jobs') or []), new_jobs)
+    state['fingerprints'] = fingerprints
+    # Keyed by the templates as they are after this parse, which the next run will see
+    version = _extractor_version()
+    cache.put_record(har_path, f'{TAIL_VERSION}-{version}', state, kind='tail', stable=True)
+    jobs = state['jobs']
+    cache.put(har_path, version, jobs, fingerprints)
+    logging.info(f"Ingested {state['count'] - before} appended entries ({len(new_jobs)} jobs) from HAR: {har_path}")
+    return jobs
+
+
+def _save_har_tail(har_path: str, cache: HarCache, all_jobs: List[Dict[str, Any]], fingerprints: List[str]) -> None:
+    """Record where a full parse ended so the next run can pick up appended entries."""
+    from har_index import load_index
+    from har_tail import TAIL_VERSION, state_from_index
+
+    state = state_from_index(har_path, load_index(har_path, cache))
+    if state is None:
+        return
+    state['jobs'] = all_jobs
+    state['fingerprints'] = fingerprints
+    cache.put_record(har_path, f'{TAIL_VERSION}-{_extractor_version()}', state, kind='tail', stable=True)
+
+
+# Full results are held here so the extension can page through them (see result_pages)
+_results: Optional[ResultStore] = None
+_seen: Optional[SeenJobs] = None
+_seen_lock = threading.Lock()
+_ledger: Optional[SyncLedger] = None
+# Write paged results to disk for a later host process to read; main() turns
+# this off for a connectNative session, which keeps them in memory
+_persist_results = True
+
+
+def _result_store() -> ResultStore:
+    global _results
+    if _results is None:
+        from result_pages import ResultStore
+        with _seen_lock:
+            if _results is None:
+                _results = ResultStore(persist=_persist_results)
+    return _results
+
+
+def _seen_jobs() -> Optional[SeenJobs]:
+    """The shared seen-jobs filter, or None when disabled (see seen_jobs)."""
+    global _seen
+    from seen_jobs import SeenJobs
+
+    with _seen_lock:
+        if _seen is None:
+            _seen = SeenJobs.from_env()
+    return _seen
+
+
+def _page_response(jobs: List[Dict[str, Any]], message: Dict[str, Any]) -> Dict[str, Any]:
+    """First page of `jobs`; with new_only, jobs sent in earlier runs are dropped (see seen_jobs).
+
+    Only the jobs on the page are marked as seen; later pages are marked
+    when a new_only next_page request delivers them.
+    """
+    from result_pages import page_size_from
+    from seen_jobs import new_only_from
+
+    seen = _seen_jobs() if new_only_from(message) else None
+    skipped = None
+    if seen is not None:
+        fresh = seen.filter_new(jobs, mark=False)
+        skipped = len(jobs) - len(fresh)
+        jobs = fresh
+    page = _result_store().first_page(jobs, page_size_from(message))
+    if seen is not None:
+        seen.mark(page['jobs'])
+        page['skipped_seen'] = skipped
+    return page
+
+
+def _collect_jobs(message: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """Jobs for a collect/sync request and the HAR paths tried."""
+    # Prefer explicit HAR path; if missing, try env or best-effort discovery.
+    har_path = message.get('har_path') or os.environ.get('UPAI_HAR_PATH') or r"C:\\Users\\TT\\upwork2\\www.upwork.com.har"
+    url = message.get('url', '')
+    # 'refresh' forces a re-parse even when the HAR is cached
+    use_cache = not message.get('refresh', False)
+    workers = message.get('workers')
 
     jobs: List[Dict[str, Any]] = []
-    for ent in _iter_entries(har):
-        try:
-            resp = (ent.get('response') or {})
-            cont = (resp.get('content') or {})
-            mime = (cont.get('mimeType') or '').lower()
-            text = cont.get('text') or ''
-            if not text:
-                continue
-            if cont.get('encoding') == 'base64':
-                try:
-                    raw = base64.b64decode(text)
-                    try:
-                        text = raw.decode('utf-8', 'ignore')
-                    except Exception:
-                        try:
-                            text = gzip.decompress(raw).decode('utf-8', 'ignore')
-                        except Exception:
-                            text = ''
-                except Exception:
-                    text = ''
-            if not text:
-                continue
-            # Accept JSON-like content
-            if ('json' not in mime) and not (text.strip().startswith('{') or text.strip().startswith('[')):
-                continue
-            payload = _try_parse_json(text)
-            if payload is None:
-                continue
-            jobs.extend(_extract_jobs_from_json(payload))
-        except Exception:
-            continue
+    tried_paths: List[str] = []
+
+    if har_path:
+        tried_paths.append(har_path)
+        logging.info(f"Importing jobs from HAR: {har_path}")
+        jobs = import_jobs_from_har(har_path, use_cache, workers)
+
+    if not jobs:
+        # Try to discover newest HAR automatically
+        auto_har = find_latest_har()
+        if auto_har:
+            tried_paths.append(auto_har)
+            logging.info(f"Trying latest discovered HAR: {auto_har}")
+            jobs = import_jobs_from_har(auto_har, use_cache, workers)
+
+    if not jobs and url:
+        logging.info(f"Falling back to page collector for URL: {url}")
+        jobs = collect_jobs_from_page(url)
+
+    return jobs, tried_paths
+
+
+def _sync_response(jobs: List[Dict[str, Any]], message: Dict[str, Any]) -> Dict[str, Any]:
+    """Added/changed jobs since the message's token or known hashes, first page of them.
 
-    return jobs[:200]
+    `token` is null until the last page; next_page returns it with that page.
+    """
+    global _ledger
+    from job_sync import SyncLedger
+    from result_pages import page_size_from
+
+    with _seen_lock:
+        if _ledger is None:
+            _ledger = SyncLedger()
+    known = message.get('known')
+    if isinstance(known, dict):
+        known = list(known.values())
+    delta = _ledger.sync(jobs, message.get('token') or message.get('since'),
+                         known if isinstance(known, list) else None)
+    # The new token comes with the last page (see ResultStore.first_page): a
+    # client that stopped after page 1 must not skip the jobs it never read
+    token = delta.pop('token')
+    page = _result_store().first_page(delta.pop('jobs'), page_size_from(message), {'token': token})
+    page.update(delta)
+    page.setdefault('token', None)
+    return page
 
 
 def find_latest_har() -> str:
     """Try to find the most recent Upwork HAR in common locations (Downloads, project)."""
+    from pathlib import Path
+
     candidates: List[Path] = []
     try:
         downloads = Path.home() / 'Downloads'
@@ -171,14 +324,31 @@ def find_latest_har() -> str:
             return str(p)
     return str(candidates_sorted[0]) if candidates_sorted else ''
 
-def import_jobs_from_har(har_path: str) -> List[Dict[str, Any]]:
+def import_jobs_from_har(har_path: str, use_cache: bool = True, workers: Optional[int] = None) -> List[Dict[str, Any]]:
     """Import jobs from a HAR file path. No mock fallback."""
+    from har_cache import HarCache
+
     try:
         if not har_path or not os.path.isfile(har_path):
             logging.warning(f"HAR path not found: {har_path}")
             return []
-        jobs = load_jobs_from_har(har_path)
+        cache = HarCache.from_env() if use_cache else None
+        if cache:
+            cached = cache.get(har_path, _extractor_version())
+            if cached is not None:
+                jobs = cached.get('jobs') or []
+                logging.info(f"Loaded {len(jobs)} cached jobs for HAR: {har_path}")
+                return jobs
+            # A re-exported HAR that only grew: parse just the new entries
+            jobs = _ingest_har_tail(har_path, cache, workers)
+            if jobs is not None:
+                return jobs
+        fingerprints: List[str] = []
+        jobs = _parse_har_jobs(har_path, fingerprints, workers)
         logging.info(f"Parsed {len(jobs)} jobs from HAR: {har_path}")
+        if cache:
+            cache.put(har_path, _extractor_version(), jobs, fingerprints)
+            _save_har_tail(har_path, cache, jobs, fingerprints)
         return jobs
     except Exception as e:
         logging.error(f"Error importing from HAR: {e}")
@@ -232,41 +402,35 @@ def get_mock_jobs():
         }
     ]
 
-def read_message():
-    """Read a message from Chrome using native messaging protocol"""
+def read_message(inp=None):
+    """Read a message from Chrome using native messaging protocol (`inp` defaults to stdin)"""
     try:
+        inp = inp or sys.stdin.buffer
         # Read the message length (first 4 bytes)
-        raw_length = sys.stdin.buffer.read(4)
+        raw_length = inp.read(4)
         if not raw_length or len(raw_length) != 4:
             logging.error("Could not read message length")
             return None
             
         # Unpack message length
         message_length = struct.unpack('I', raw_length)[0]
-        logging.debug(f"Reading message of length {message_length}")
         
-        # Read the message content
-        message = sys.stdin.buffer.read(message_length).decode('utf-8')
-        return json.loads(message)
+        # Read the message content (commands are small; the stdlib parser avoids
+        # loading json_backend's optional accelerators at start-up)
+        message = json.loads(inp.read(message_length).decode('utf-8'))
+        log_payload('recv', message, message_length)
+        return message
     except Exception as e:
         logging.error(f"Error reading message: {e}")
         logging.error(traceback.format_exc())
         return None
 
-def send_message(message):
-    """Send a message to Chrome using native messaging protocol"""
+def send_message(message, request_id=None, out=None):
+    """Send a message to Chrome (`out` defaults to stdout); replies over the frame budget go out as chunks (see framing)"""
     try:
-        # Encode message as JSON
-        encoded_message = json.dumps(message).encode('utf-8')
-        
-        # Send message length (4 bytes)
-        sys.stdout.buffer.write(struct.pack('I', len(encoded_message)))
-        
-        # Send the message
-        sys.stdout.buffer.write(encoded_message)
-        sys.stdout.buffer.flush()
-        
-        logging.debug(f"Sent message: {message}")
+        sizes: List[int] = []
+        frames = write_frames(out or sys.stdout.buffer, message, request_id, ensure_ascii=False, sizes=sizes)
+        log_payload('sent', message, sum(sizes), frames=frames)
         return True
     except Exception as e:
         logging.error(f"Error sending message: {e}")
@@ -276,9 +440,13 @@ def send_message(message):
 def process_message(message):
     """Process incoming message and return response"""
     try:
-        # Log the entire message for debugging
-        logging.info(f"Received full message: {json.dumps(message)}")
-        
+        # run_collector, read_har and bare collector options are answered by
+        # collector_enhanced, as when they open a session (see host_launcher)
+        from host_launcher import is_collector_request
+        if is_collector_request(message):
+            from collector_enhanced import handle_request
+            return handle_request(message)
+
         action = message.get('action', '')
         
         # Handle empty or missing action by inferring intent from payload
@@ -313,40 +481,18 @@ def process_message(message):
             }
             
         elif action in ['collect_jobs', 'run_collector', 'collect']:
-            # Prefer explicit HAR path; if missing, try env or best-effort discovery.
-            har_path = message.get('har_path') or os.environ.get('UPAI_HAR_PATH') or r"C:\\Users\\TT\\upwork2\\www.upwork.com.har"
-            url = message.get('url', '')
-
-            jobs: List[Dict[str, Any]] = []
-            tried_paths: List[str] = []
-
-            if har_path:
-                tried_paths.append(har_path)
-                logging.info(f"Importing jobs from HAR: {har_path}")
-                jobs = import_jobs_from_har(har_path)
-
-            if not jobs:
-                # Try to discover newest HAR automatically
-                auto_har = find_latest_har()
-                if auto_har:
-                    tried_paths.append(auto_har)
-                    logging.info(f"Trying latest discovered HAR: {auto_har}")
-                    jobs = import_jobs_from_har(auto_har)
-
-            if not jobs and url:
-                logging.info(f"Falling back to page collector for URL: {url}")
-                jobs = collect_jobs_from_page(url)
+            jobs, tried_paths = _collect_jobs(message)
 
             ok = len(jobs) > 0
             response = {
                 'ok': ok,
                 'success': ok,
                 'action': 'jobs_collected' if ok else 'no_jobs',
-                'jobs': jobs,
-                'count': len(jobs),
                 'tried_har_paths': tried_paths,
                 'timestamp': datetime.now().isoformat()
             }
+            # jobs/count are the first page; total and next_cursor let the extension page on
+            response.update(_page_response(jobs, message))
             if not ok:
                 response['error'] = (
                     'No jobs parsed. Capture a HAR on an Upwork jobs/search page (XHR/Fetch), '
@@ -354,6 +500,20 @@ def process_message(message):
                 )
             return response
             
+        elif action == 'sync':
+            # Delta of collect_jobs: {"action": "sync", "token": "<last token>"} or
+            # {"action": "sync", "known": [<job hashes>]}; see job_sync
+            jobs, tried_paths = _collect_jobs(message)
+            response = {
+                'ok': True,
+                'success': True,
+                'action': 'synced',
+                'tried_har_paths': tried_paths,
+                'timestamp': datetime.now().isoformat()
+            }
+            response.update(_sync_response(jobs, message))
+            return response
+
         elif action == 'import_har':
             har_path = message.get('har_path', '')
             if not har_path:
@@ -369,18 +529,43 @@ def process_message(message):
                     }
             
             logging.info(f"Importing HAR file: {har_path}")
-            jobs = import_jobs_from_har(har_path)
+            jobs = import_jobs_from_har(har_path, not message.get('refresh', False), message.get('workers'))
             ok = len(jobs) > 0
             
-            return {
+            response = {
                 'ok': ok,
                 'success': ok,
                 'action': 'har_imported' if ok else 'no_jobs',
-                'jobs': jobs,
-                'count': len(jobs),
                 'source': har_path,
                 'timestamp': datetime.now().isoformat()
             }
+            response.update(_page_response(jobs, message))
+            return response
+
+        elif action in ['next_page', 'jobs_page']:
+            # Continue a paged result: {"action": "next_page", "cursor": "...", "page_size": 100}
+            cursor = message.get('cursor') or ''
+            from result_pages import page_size_from
+            page = _result_store().page(cursor, page_size_from(message)) if cursor else None
+            if page is None:
+                return {
+                    'ok': False,
+                    'success': False,
+                    'error': 'Invalid or expired cursor. Run the collector again.',
+                    'timestamp': datetime.now().isoformat()
+                }
+            from seen_jobs import new_only_from
+            seen = _seen_jobs() if new_only_from(message) else None
+            if seen is not None:
+                seen.mark(page['jobs'])
+            response = {
+                'ok': True,
+                'success': True,
+                'action': 'jobs_page',
+                'timestamp': datetime.now().isoformat()
+            }
+            response.update(page)
+            return response
             
         elif action == 'analyze_job':
             job_data = message.get('job', {})
@@ -419,32 +604,122 @@ def process_message(message):
             'timestamp': datetime.now().isoformat()
         }
 
-def main():
-    """Main loop for native messaging host"""
-    logging.info("Native host started")
-    
+# Answered on the event loop; everything else goes to a worker thread. Even a
+# page read touches the disk (result_pages), so only ping is safe to run inline.
+INLINE_ACTIONS = frozenset({'ping'})
+
+
+def _host_workers() -> int:
+    try:
+        return max(1, int(os.environ.get('UPAI_HOST_WORKERS', '') or 2))
+    except ValueError:
+        return 2
+
+
+async def serve(read=read_message, write=send_message, handle=process_message,
+                workers: Optional[int] = None) -> None:
+    """Read messages continuously and answer each as soon as it is done.
+
+    Replies echo the client-supplied `id` and may arrive out of order, so a
+    `ping` is answered while a large HAR import is still running. Reads and
+    writes each run on their own thread; writes are serialized so the frames
+    of one reply are never interleaved with another's.
+    """
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+    from framing import compress_reply, negotiate_encoding
+
+    loop = asyncio.get_running_loop()
+    work = ThreadPoolExecutor(max_workers=workers or _host_workers(), thread_name_prefix='upai-work')
+    reader = ThreadPoolExecutor(max_workers=1, thread_name_prefix='upai-read')
+    writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='upai-write')
+    pending: set = set()
+
+    async def _answer(message) -> None:
+        request_id = message.get('id') if isinstance(message, dict) else None
+        action = message.get('action') if isinstance(message, dict) else None
+        try:
+            if action in INLINE_ACTIONS:
+                response = handle(message)
+            else:
+                response = await loop.run_in_executor(work, handle, message)
+        except Exception as e:
+            logging.error(f"Error handling message: {e}")
+            response = {'ok': False, 'success': False, 'error': str(e), 'timestamp': datetime.now().isoformat()}
+        if request_id is not None and isinstance(response, dict):
+            response['id'] = request_id
+        encoding = negotiate_encoding(message)
+        if encoding and isinstance(response, dict):
+            # Opt-in: large replies go out compressed (see framing.compress_reply)
+            response = await loop.run_in_executor(work, compress_reply, response, encoding)
+        if not await loop.run_in_executor(writer, write, response, request_id):
+            logging.error("Failed to send response")
+
     try:
         while True:
-            # Read message from Chrome
-            message = read_message()
-            
+            message = await loop.run_in_executor(reader, read)
             if message is None:
                 logging.warning("Received null message, exiting")
                 break
-                
-            logging.debug(f"Received message: {message}")
-            
-            # Process the message
-            response = process_message(message)
-            
-            # Send response back to Chrome
-            if not send_message(response):
-                logging.error("Failed to send response")
-                break
-                
-            # Small delay to prevent CPU spinning
-            time.sleep(0.01)
-            
+            task = asyncio.ensure_future(_answer(message))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        # stdin closed: finish what is in flight before exiting
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+    finally:
+        for pool in (work, reader, writer):
+            pool.shutdown(wait=False)
+
+
+# Answered before the asyncio loop and its imports are loaded (see main)
+STARTUP_ACTIONS = frozenset({'ping'})
+
+
+def main(first: Optional[Dict[str, Any]] = None, replied: bool = False):
+    """Main loop for native messaging host.
+
+    host_launcher passes the `first` message it already read, and `replied`
+    if it answered it (a ping) before this module was imported.
+    """
+    global _persist_results
+    setup_logging(os.environ.get('UPAI_LOG_DIR') or log_dir)
+    logging.info("Native host started")
+    
+    try:
+        if first is not None and replied:
+            log_payload('recv', first)
+            logging.info("Answered at start-up by host_launcher")
+            first = None
+            _persist_results = False
+        elif first is None:
+            first = read_message()
+            if first is None:
+                logging.warning("Received null message, exiting")
+                return
+        # sendNativeMessage spawns a host for a single message, and connectNative
+        # clients open with a ping, so a leading ping is answered straight away
+        if isinstance(first, dict) and first.get('action') in STARTUP_ACTIONS:
+            response = process_message(first)
+            if first.get('id') is not None:
+                response['id'] = first['id']
+            send_message(response, first.get('id'))
+            first = None
+            # Only connectNative clients open with a ping; they page on this port
+            _persist_results = False
+
+        def read():
+            nonlocal first
+            if first is not None:
+                message, first = first, None
+                return message
+            return read_message()
+
+        import asyncio
+        asyncio.run(serve(read=read))
+        if _results is not None:
+            # A one-shot host's next_page is answered by the next process
+            _results.flush()
     except KeyboardInterrupt:
         logging.info("Native host interrupted by user")
     except Exception as e:
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Request filtering for the Playwright collector.
+
+The collector only needs the API/GraphQL JSON and the DOM, so images,
+fonts, media and third-party trackers are aborted before they are fetched.
+`RequestFilter.decide` is a pure function of the request's resource type
+and URL; `handle` is the `context.route('**/*', ...)` handler built on it.
+
+A request is blocked when its type is in `block_types` or its host is (a
+subdomain of) one of `block_hosts`, unless the type is in `allow_types` or
+the host in `allow_hosts`. Upwork's own hosts are never blocked by host.
+
+Settings (env):
+    UPAI_BLOCK=0                       load everything
+    UPAI_BLOCK_TYPES=image,font,media  resource types to abort
+    UPAI_BLOCK_HOSTS=<a,b>             tracker hosts added to the defaults
+    UPAI_ALLOW_TYPES=<a,b>             never abort these types (debugging)
+    UPAI_ALLOW_HOSTS=<a,b>             never abort these hosts (debugging)
+"""
+from __future__ import annotations
+import os
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+DEFAULT_BLOCK_TYPES = frozenset({'image', 'font', 'media'})
+DEFAULT_BLOCK_HOSTS = frozenset({
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net', 'googleadservices.com',
+    'googlesyndication.com', 'facebook.net', 'facebook.com', 'connect.facebook.net',
+    'hotjar.com', 'segment.io', 'segment.com', 'optimizely.com', 'bat.bing.com',
+    'clarity.ms', 'linkedin.com', 'licdn.com', 'twitter.com', 'ads-twitter.com',
+    'tiktok.com', 'quantserve.com', 'scorecardresearch.com', 'newrelic.com', 'nr-data.net',
+    'fullstory.com', 'amplitude.com', 'mixpanel.com', 'qualtrics.com', 'onetrust.com',
+    'cookielaw.org', 'pendo.io', 'sentry.io', 'datadoghq.com', 'browser-intake-datadoghq.com',
+})
+# Never blocked by host, whatever the lists say
+PROTECTED_HOSTS = frozenset({'upwork.com', 'upwork.net', 'upworkstatic.com'})
+
+_FALSY = ('0', 'false', 'no', 'off')
+
+
+def _csv(value: Optional[str]) -> set:
+    return {v.strip().lower() for v in (value or '').split(',') if v.strip()}
+
+
+def _host_in(host: str, hosts: Iterable[str]) -> Optional[str]:
+    """The entry of `hosts` that `host` equals or is a subdomain of."""
+    for h in hosts:
+        if host == h or host.endswith('.' + h):
+            return h
+    return None
+
+
+class RequestFilter:
+    """Decides which requests to abort and counts what was blocked and loaded."""
+
+    def __init__(self, block_types: Iterable[str] = DEFAULT_BLOCK_TYPES,
+                 block_hosts: Iterable[str] = DEFAULT_BLOCK_HOSTS,
+                 allow_types: Iterable[str] = (), allow_hosts: Iterable[str] = ()):
+        self.block_types = {t.lower() for t in block_types}
+        self.block_hosts = {h.lower() for h in block_hosts}
+        self.allow_types = {t.lower() for t in allow_types}
+        self.allow_hosts = {h.lower() for h in allow_hosts}
+        self._lock = threading.Lock()
+        self.blocked_by_type: Counter = Counter()
+        self.blocked_by_host: Counter = Counter()
+        self.allowed = 0
+        self.bytes_received = 0
+
+    @classmethod
+    def from_env(cls, allow_types: Iterable[str] = (), allow_hosts: Iterable[str] = ()) -> Optional['RequestFilter']:
+        """Build the filter from UPAI_BLOCK* / UPAI_ALLOW* env vars; None when disabled."""
+        if os.environ.get('UPAI_BLOCK', '1').lower() in _FALSY:
+            return None
+        types = _csv(os.environ.get('UPAI_BLOCK_TYPES')) or DEFAULT_BLOCK_TYPES
+        return cls(types, DEFAULT_BLOCK_HOSTS | _csv(os.environ.get('UPAI_BLOCK_HOSTS')),
+                   _csv(os.environ.get('UPAI_ALLOW_TYPES')) | set(allow_types),
+                   _csv(os.environ.get('UPAI_ALLOW_HOSTS')) | set(allow_hosts))
+
+    def decide(self, resource_type: str, url: str) -> Optional[str]:
+        """Why the request should be aborted ('type:image', 'host:hotjar.com'), or None to load it."""
+        resource_type = (resource_type or '').lower()
+        host = (urlsplit(url).hostname or '').lower()
+        if resource_type in self.allow_types or _host_in(host, self.allow_hosts):
+            return None
+        if resource_type in self.block_types:
+            return f'type:{resource_type}'
+        if not _host_in(host, PROTECTED_HOSTS):
+            matched = _host_in(host, self.block_hosts)
+            if matched:
+                return f'host:{matched}'
+        return None
+
+    def handle(self, route: Any) -> None:
+        """Playwright route handler: abort or continue, and count the request."""
+        request = route.request
+        reason = self.decide(request.resource_type, request.url)
+        if reason is None:
+            with self._lock:
+                self.allowed += 1
+            route.continue_()
+            return
+        kind, _, name = reason.partition(':')
+        with self._lock:
+            self.blocked_by_type[request.resource_type] += 1
+            if kind == 'host':
+                self.blocked_by_host[name] += 1
+        route.abort('blockedbyclient')
+
+    def on_response(self, response: Any) -> None:
+        """Count bytes actually received (`context.on('response', ...)`), from Content-Length."""
+        try:
+            size = int(response.headers.get('content-length') or 0)
+        except (TypeError, ValueError):
+            size = 0
+        with self._lock:
+            self.bytes_received += size
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'requests_blocked': sum(self.blocked_by_type.values()),
+                'requests_allowed': self.allowed,
+                'blocked_by_type': dict(self.blocked_by_type),
+                'blocked_by_host': dict(self.blocked_by_host),
+                'bytes_received': self.bytes_received,
+            }
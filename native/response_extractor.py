@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+Extract jobs from API responses while a crawl is still running.
+
+The collector hands each captured JSON body to `ResponseExtractor.submit`,
+which only puts it on a bounded queue; a worker thread parses it, routes it
+through job_operations and de-duplicates the jobs as it goes. When the crawl
+ends, `close()` drains the queue and returns the jobs, so nothing has to be
+written to disk and read back. `drain()` waits for the queued bodies without
+stopping, so a crawler can check `job_responses` and `len(jobs)` mid-run;
+`YieldTracker` uses that to decide when more scrolling stops paying off.
+
+If the queue is full, `submit` waits for the worker, so at most `queue_size`
+bodies are held in memory however fast responses arrive.
+
+Keeping the raw bodies is optional. With `raw_dir` set they are appended to
+gzip-compressed JSON-lines batches,
+
+    api_responses/responses-0001.jsonl.gz    one {"url", "endpoint", "ops", "body"} per line
+
+and a new batch file is started every `batch_size` responses.
+
+Settings (env):
+    UPAI_EXTRACT_QUEUE=256       bodies buffered before submit() waits
+    UPAI_RAW_BATCH=200           responses per raw batch file
+"""
+from __future__ import annotations
+import os
+import json
+import queue
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from job_extractor import endpoint_key, request_operations
+from job_operations import route_jobs
+from json_locator import iter_json_values
+
+DEFAULT_QUEUE_SIZE = 256
+DEFAULT_BATCH_SIZE = 200
+_STOP = object()
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, '') or default)
+    except ValueError:
+        return default
+
+
+class ResponseExtractor:
+    """Background job extraction (and optional raw capture) for streamed API responses."""
+
+    def __init__(self, raw_dir: Optional[Path] = None, queue_size: Optional[int] = None,
+                 batch_size: Optional[int] = None):
+        self.raw_dir = Path(raw_dir) if raw_dir else None
+        self.batch_size = max(1, batch_size or _env_int('UPAI_RAW_BATCH', DEFAULT_BATCH_SIZE))
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, queue_size or _env_int('UPAI_EXTRACT_QUEUE',
+                                                                                       DEFAULT_QUEUE_SIZE)))
+        self.jobs: List[Dict[str, Any]] = []
+        self._seen: set = set()
+        self.submitted = 0
+        self.responses = 0
+        # Responses that yielded at least one job
+        self.job_responses = 0
+        self.errors = 0
+        self.batches: List[str] = []
+        self._batch = None
+        self._batch_count = 0
+        self._worker = threading.Thread(target=self._run, name='upai-extract', daemon=True)
+        self._worker.start()
+
+    def submit(self, text: str, url: str = '', post_data: Any = None) -> None:
+        """Queue one response body for extraction; waits while the queue is full."""
+        self._queue.put((text, url, post_data))
+        self.submitted += 1
+
+    def drain(self) -> None:
+        """Wait until every body submitted so far has been extracted."""
+        if self._worker.is_alive():
+            self._queue.join()
+
+    def close(self) -> List[Dict[str, Any]]:
+        """Finish every queued body, close the raw batch and return the de-duplicated jobs."""
+        if self._worker.is_alive():
+            self._queue.put(_STOP)
+            self._worker.join()
+        return self.jobs
+
+    def _run(self) -> None:
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _STOP:
+                    self._queue.task_done()
+                    break
+                try:
+                    self._extract(*item)
+                except Exception:
+                    self.errors += 1
+                finally:
+                    self._queue.task_done()
+        finally:
+            self._close_batch()
+
+    def _extract(self, text: str, url: str, post_data: Any) -> None:
+        self.responses += 1
+        ops = request_operations(url, post_data)
+        endpoint = endpoint_key(url, ops=ops)
+        if self.raw_dir is not None:
+            self._save_raw({'url': url, 'endpoint': endpoint, 'ops': ops, 'body': text})
+        found = False
+        for payload in iter_json_values(text):
+            for job in route_jobs(payload, ops, endpoint, url, dedup=False):
+                found = True
+                key = f"{job.get('url', '')}|{job.get('title', '')}"
+                if key not in self._seen and (job.get('title') or job.get('description')):
+                    self._seen.add(key)
+                    self.jobs.append(job)
+        if found:
+            self.job_responses += 1
+
+    def _save_raw(self, record: Dict[str, Any]) -> None:
+        import gzip
+
+        if self._batch is None:
+            self.raw_dir.mkdir(parents=True, exist_ok=True)
+            path = self.raw_dir / f'responses-{len(self.batches) + 1:04d}.jsonl.gz'
+            self._batch = gzip.open(path, 'wt', encoding='utf-8', compresslevel=6)
+            self.batches.append(str(path))
+        self._batch.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._batch_count += 1
+        if self._batch_count >= self.batch_size:
+            self._close_batch()
+
+    def _close_batch(self) -> None:
+        if self._batch is not None:
+            self._batch.close()
+            self._batch, self._batch_count = None, 0
+
+
+class YieldTracker:
+    """New job-bearing responses and new unique jobs per crawl step, and when to stop.
+
+    `record()` is called after each scroll. Scrolling should stop once
+    `target_jobs` unique jobs are in (0 = no target), or after `patience`
+    scrolls in a row that added no new job.
+    """
+
+    def __init__(self, extractor: ResponseExtractor, patience: int = 2, target_jobs: int = 0):
+        self.extractor = extractor
+        self.patience = max(1, patience)
+        self.target_jobs = max(0, target_jobs)
+        self.steps: List[Dict[str, Any]] = []
+        self._responses = extractor.job_responses
+        self._jobs = len(extractor.jobs)
+        self._stale = 0
+
+    def record(self, seconds: float = 0.0) -> Optional[str]:
+        """Log one step; returns 'target' or 'plateau' when scrolling should stop, else None."""
+        self.extractor.drain()
+        total = len(self.extractor.jobs)
+        step = {'responses': self.extractor.job_responses - self._responses, 'jobs': total - self._jobs,
+                'total_jobs': total, 'ms': round(seconds * 1000)}
+        self.steps.append(step)
+        self._responses, self._jobs = self.extractor.job_responses, total
+        if self.target_jobs and total >= self.target_jobs:
+            return 'target'
+        self._stale = self._stale + 1 if step['jobs'] == 0 else 0
+        if self._stale >= self.patience:
+            return 'plateau'
+        return None
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+Server-side result store and cursor paging for native messaging replies.
+
+A parse result (full job list) is stored once under a random result id and
+then served page by page:
+
+    -> {"action": "collect_jobs", "page_size": 100}
+    <- {"jobs": [...100...], "total": 2450, "next_cursor": "eyJy..."}
+    -> {"action": "next_page", "cursor": "eyJy...", "page_size": 100}
+    <- {"jobs": [...100...], "total": 2450, "next_cursor": "..."}   (null when done)
+
+Results are kept in memory (as compact JobRecords, see job_record) for the
+long-lived connectNative host. sendNativeMessage starts a fresh host process
+per message, so there they are also written to native/logs/results, on a
+background thread after the reply has gone out; `flush` waits for those
+writes before the host exits. The on-disk store is LRU-evicted like HarCache.
+"""
+from __future__ import annotations
+import os
+import json
+import time
+import base64
+import secrets
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import json_backend
+from har_cache import HarCache
+from job_record import JobRecord, as_dict, compact_jobs
+
+DEFAULT_PAGE_SIZE = 200
+MAX_PAGE_SIZE = 5000
+DEFAULT_RESULTS_DIR = Path(__file__).parent / 'logs' / 'results'
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+_MEMORY_RESULTS = 8
+
+
+def encode_cursor(result_id: str, offset: int, final: Optional[Dict[str, Any]] = None) -> str:
+    data: Dict[str, Any] = {'r': result_id, 'o': offset}
+    if final:
+        data['f'] = final
+    raw = json.dumps(data, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def _cursor_data(cursor: str) -> Tuple[str, int, Dict[str, Any]]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        data = json.loads(raw.decode('utf-8'))
+        result_id, offset, final = str(data['r']), int(data['o']), data.get('f') or {}
+    except Exception:
+        raise ValueError('invalid cursor') from None
+    if not result_id.isalnum() or offset < 0 or not isinstance(final, dict):
+        raise ValueError('invalid cursor')
+    return result_id, offset, final
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Return (result_id, offset); raises ValueError for a malformed cursor."""
+    result_id, offset, _ = _cursor_data(cursor)
+    return result_id, offset
+
+
+def page_size_from(message: Dict[str, Any]) -> int:
+    try:
+        size = int(message.get('page_size') or DEFAULT_PAGE_SIZE)
+    except (TypeError, ValueError):
+        size = DEFAULT_PAGE_SIZE
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+class ResultStore:
+    """Keeps full job lists so clients can page through them without re-parsing."""
+
+    def __init__(self, results_dir: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_BYTES,
+                 persist: bool = True):
+        self.results_dir = Path(results_dir or os.environ.get('UPAI_RESULTS_DIR') or DEFAULT_RESULTS_DIR)
+        self.max_bytes = max_bytes
+        # False for a connectNative session: cursors never outlive the process
+        self.persist = persist
+        self._memory: 'OrderedDict[str, List[JobRecord]]' = OrderedDict()
+        # The host answers requests on several threads (see native_host.serve)
+        self._lock = threading.Lock()
+        self._writer: Optional[ThreadPoolExecutor] = None
+
+    def put(self, jobs: List[Dict[str, Any]]) -> str:
+        result_id = secrets.token_hex(8)
+        self._remember(result_id, jobs)
+        if self.persist:
+            with self._lock:
+                if self._writer is None:
+                    self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='upai-results')
+                self._writer.submit(self._write, result_id, jobs)
+        return result_id
+
+    def _write(self, result_id: str, jobs: List[Dict[str, Any]]) -> None:
+        try:
+            body = json_backend.dumps(jobs)
+            self.results_dir.mkdir(parents=True, exist_ok=True)
+            path = self.results_dir / f'{result_id}.json'
+            tmp = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+            with open(tmp, 'wb') as f:
+                f.write(body)
+            os.replace(tmp, path)
+            HarCache(self.results_dir, self.max_bytes).evict()
+        except (OSError, TypeError, ValueError):
+            pass
+
+    def flush(self) -> None:
+        """Wait until every stored result is on disk."""
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.shutdown(wait=True)
+
+    def get(self, result_id: str) -> Optional[List[JobRecord]]:
+        with self._lock:
+            if result_id in self._memory:
+                self._memory.move_to_end(result_id)
+                return self._memory[result_id]
+        path = self.results_dir / f'{result_id}.json'
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                jobs = json_backend.loads(f.read())
+        except (OSError, ValueError):
+            return None
+        try:
+            now = time.time_ns()
+            os.utime(path, ns=(now, now))  # LRU: mark as recently used
+        except OSError:
+            pass
+        return self._remember(result_id, jobs)
+
+    def _remember(self, result_id: str, jobs: List[Dict[str, Any]]) -> List[JobRecord]:
+        records = compact_jobs(jobs)
+        with self._lock:
+            self._memory[result_id] = records
+            self._memory.move_to_end(result_id)
+            while len(self._memory) > _MEMORY_RESULTS:
+                self._memory.popitem(last=False)
+        return records
+
+    def first_page(self, jobs: List[Dict[str, Any]], page_size: int,
+                   final: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Page 0 of a fresh result; only stores the result if there is a next page.
+
+        `final` fields (the sync token) are added to the last page only, so a
+        client that stops early never gets them; later cursors carry them.
+        """
+        if len(jobs) <= page_size:
+            return self.page_of(jobs, '', 0, page_size, final)
+        return self.page_of(jobs, self.put(jobs), 0, page_size, final)
+
+    def page(self, cursor: str, page_size: int) -> Optional[Dict[str, Any]]:
+        """Page addressed by `cursor`, or None if the cursor is invalid or expired."""
+        try:
+            result_id, offset, final = _cursor_data(cursor)
+        except ValueError:
+            return None
+        jobs = self.get(result_id)
+        if jobs is None:
+            return None
+        return self.page_of(jobs, result_id, offset, page_size, final)
+
+    @staticmethod
+    def page_of(jobs: List[Any], result_id: str, offset: int, page_size: int,
+                final: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        chunk = [as_dict(j) for j in jobs[offset:offset + page_size]]
+        end = offset + len(chunk)
+        more = bool(result_id) and end < len(jobs)
+        page = {
+            'jobs': chunk,
+            'count': len(chunk),
+            'total': len(jobs),
+            'offset': offset,
+            'next_cursor': encode_cursor(result_id, end, final) if more else None,
+        }
+        if final and not more:
+            page.update(final)
+        return page
@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+"""
+Cross-session filter of jobs that were already sent to the extension.
+
+Each job is reduced to a canonical ID (the `~0123...` ciphertext in its URL,
+as UpworkWebScraper._extract_job_id reads it), hashed to 64 bits and added
+to a Bloom filter kept in a memory-mapped file. Memory per job is constant:
+
+    bits per job = -ln(p) / ln(2)^2       (about 9.6 bits at p = 1%)
+
+so a million remembered jobs cost about 1.2 MB at the default rate. A false
+positive means a new job is wrongly treated as seen, at rate p.
+
+When the filter holds `capacity` jobs it is rotated: the current file
+becomes the previous generation and a fresh one is started. Both are
+checked, so the most recent 1-2 x capacity jobs are always remembered.
+
+Settings (env):
+    UPAI_SEEN_JOBS=0             disable the filter
+    UPAI_SEEN_JOBS_PATH=<file>   default native/logs/seen_jobs.bloom
+    UPAI_SEEN_FP_RATE=0.01
+    UPAI_SEEN_CAPACITY=200000
+    UPAI_NEW_ONLY=1              make new_only the default for every request
+"""
+from __future__ import annotations
+import os
+import re
+import math
+import mmap
+import struct
+import hashlib
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+DEFAULT_SEEN_PATH = Path(__file__).parent / 'logs' / 'seen_jobs.bloom'
+DEFAULT_FP_RATE = 0.01
+DEFAULT_CAPACITY = 200_000
+
+_MAGIC = b'UPAISEEN'
+_HEADER = struct.Struct('<8sIIQQ')  # magic, format version, k, m (bits), count
+_FORMAT = 1
+_MASK64 = (1 << 64) - 1
+# Upwork job URL forms: /jobs/~01234567890abcdef, /job/_~01234567890abcdef
+_JOB_ID = re.compile(r'[~_]([0-9a-f]{16,})')
+
+_FALSY = ('0', 'false', 'no', 'off')
+
+
+def canonical_job_id(job: Dict[str, Any]) -> str:
+    """Stable identity of a job: URL ciphertext, else its id, else url|title."""
+    url = str(job.get('url') or '')
+    m = _JOB_ID.search(url)
+    if m:
+        return m.group(1)
+    jid = str(job.get('id') or '')
+    if jid:
+        m = _JOB_ID.search(jid)
+        return m.group(1) if m else f'id:{jid}'
+    return f"{url}|{job.get('title') or ''}"
+
+
+def job_hash(job: Dict[str, Any]) -> int:
+    """64-bit hash of canonical_job_id(job)."""
+    digest = hashlib.blake2b(canonical_job_id(job).encode('utf-8', 'ignore'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def bloom_params(capacity: int, fp_rate: float) -> tuple:
+    """(k hash functions, m bits) for `capacity` items at false-positive rate `fp_rate`."""
+    capacity = max(1, int(capacity))
+    fp_rate = min(max(float(fp_rate), 1e-9), 0.5)
+    m = int(math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+    m = (m + 7) // 8 * 8
+    k = max(1, int(round(m / capacity * math.log(2))))
+    return k, m
+
+
+class _BloomFile:
+    """One generation of the filter: a header plus an mmap'd bit array."""
+
+    def __init__(self, path: Path, k: int, m: int):
+        self.path = path
+        self.k, self.m = k, m
+        size = _HEADER.size + m // 8
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fresh = True
+        try:
+            with open(path, 'rb') as f:
+                magic, fmt, fk, fm, _ = _HEADER.unpack(f.read(_HEADER.size))
+            fresh = (magic, fmt, fk, fm) != (_MAGIC, _FORMAT, k, m) or path.stat().st_size != size
+        except (OSError, struct.error):
+            pass
+        if fresh:
+            # Missing, corrupt or built with other parameters: start empty
+            tmp = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+            with open(tmp, 'wb') as f:
+                f.write(_HEADER.pack(_MAGIC, _FORMAT, k, m, 0))
+                f.truncate(size)
+            os.replace(tmp, path)
+        self._f = open(path, 'r+b')
+        self._mm = mmap.mmap(self._f.fileno(), size)
+
+    @property
+    def count(self) -> int:
+        return _HEADER.unpack_from(self._mm, 0)[4]
+
+    def _bits(self, h: int) -> Iterable[int]:
+        # Kirsch-Mitzenmacher double hashing from one 64-bit hash
+        h2 = (h >> 32) | 1
+        for i in range(self.k):
+            yield ((h + i * h2) & _MASK64) % self.m
+
+    def __contains__(self, h: int) -> bool:
+        mm, base = self._mm, _HEADER.size
+        return all(mm[base + (b >> 3)] & (1 << (b & 7)) for b in self._bits(h))
+
+    def add(self, h: int) -> None:
+        mm, base = self._mm, _HEADER.size
+        for b in self._bits(h):
+            mm[base + (b >> 3)] |= 1 << (b & 7)
+        struct.pack_into('<Q', mm, _HEADER.size - 8, self.count + 1)
+
+    def flush(self) -> None:
+        self._mm.flush()
+
+    def close(self) -> None:
+        try:
+            self._mm.close()
+        finally:
+            self._f.close()
+
+
+class SeenJobs:
+    """Persistent, constant-memory set of job hashes (two-generation Bloom filter)."""
+
+    def __init__(self, path: Optional[Path] = None, capacity: int = DEFAULT_CAPACITY,
+                 fp_rate: float = DEFAULT_FP_RATE):
+        self.path = Path(path or DEFAULT_SEEN_PATH)
+        self.capacity = max(1, int(capacity))
+        self.k, self.m = bloom_params(self.capacity, fp_rate)
+        self._lock = threading.Lock()
+        self._current: Optional[_BloomFile] = None
+        self._previous: Optional[_BloomFile] = None
+
+    @classmethod
+    def from_env(cls) -> Optional['SeenJobs']:
+        """Build the filter from UPAI_SEEN_* env vars; None when disabled."""
+        if os.environ.get('UPAI_SEEN_JOBS', '1').lower() in _FALSY:
+            return None
+        path = os.environ.get('UPAI_SEEN_JOBS_PATH') or None
+        try:
+            fp_rate = float(os.environ.get('UPAI_SEEN_FP_RATE', '') or DEFAULT_FP_RATE)
+        except ValueError:
+            fp_rate = DEFAULT_FP_RATE
+        try:
+            capacity = int(os.environ.get('UPAI_SEEN_CAPACITY', '') or DEFAULT_CAPACITY)
+        except ValueError:
+            capacity = DEFAULT_CAPACITY
+        return cls(Path(path) if path else None, capacity, fp_rate)
+
+    @property
+    def _previous_path(self) -> Path:
+        return self.path.with_name(self.path.name + '.1')
+
+    def _open(self) -> _BloomFile:
+        if self._current is None:
+            self._current = _BloomFile(self.path, self.k, self.m)
+            if self._previous_path.exists():
+                self._previous = _BloomFile(self._previous_path, self.k, self.m)
+        return self._current
+
+    def _rotate(self) -> None:
+        for gen in (self._current, self._previous):
+            if gen is not None:
+                gen.close()
+        self._current = self._previous = None
+        os.replace(self.path, self._previous_path)
+        self._open()
+
+    def __contains__(self, job: Dict[str, Any]) -> bool:
+        with self._lock:
+            return self._seen(job_hash(job))
+
+    def _seen(self, h: int) -> bool:
+        cur = self._open()
+        return h in cur or (self._previous is not None and h in self._previous)
+
+    def _add(self, h: int) -> None:
+        cur = self._open()
+        if cur.count >= self.capacity:
+            self._rotate()
+            cur = self._open()
+        cur.add(h)
+
+    def filter_new(self, jobs: List[Dict[str, Any]], mark: bool = True) -> List[Dict[str, Any]]:
+        """Jobs not seen in earlier runs (or earlier in `jobs`); with `mark`, remember them."""
+        fresh: List[Dict[str, Any]] = []
+        with self._lock:
+            try:
+                batch = set()
+                for job in jobs:
+                    h = job_hash(job)
+                    if h in batch or self._seen(h):
+                        continue
+                    batch.add(h)
+                    fresh.append(job)
+                    if mark:
+                        self._add(h)
+                if mark and self._current is not None:
+                    self._current.flush()
+            except (OSError, ValueError):
+                # Unusable filter file: behave as if nothing had been seen
+                return list(jobs)
+        return fresh
+
+    def mark(self, jobs: List[Dict[str, Any]]) -> None:
+        """Remember `jobs` as sent, e.g. the page of a filter_new(mark=False) result actually delivered."""
+        with self._lock:
+            try:
+                for job in jobs:
+                    h = job_hash(job)
+                    if not self._seen(h):
+                        self._add(h)
+                if self._current is not None:
+                    self._current.flush()
+            except (OSError, ValueError):
+                pass
+
+    def close(self) -> None:
+        with self._lock:
+            for gen in (self._current, self._previous):
+                if gen is not None:
+                    gen.close()
+            self._current = self._previous = None
+
+
+def new_only_from(message: Dict[str, Any]) -> bool:
+    """Should this request drop jobs sent in earlier runs? (message, else UPAI_NEW_ONLY)"""
+    if 'new_only' in message:
+        return bool(message.get('new_only'))
+    return os.environ.get('UPAI_NEW_ONLY', '').lower() not in ('',) + _FALSY
+
+
+def filter_new_jobs(jobs: List[Dict[str, Any]], mark: bool = True) -> List[Dict[str, Any]]:
+    """One-shot filter_new with the env-configured filter (all jobs if it is disabled)."""
+    seen = SeenJobs.from_env()
+    if seen is None:
+        return jobs
+    try:
+        return seen.filter_new(jobs, mark=mark)
+    finally:
+        seen.close()
+
+
+def mark_seen_jobs(jobs: List[Dict[str, Any]]) -> None:
+    """One-shot mark with the env-configured filter; pairs with filter_new_jobs(mark=False)."""
+    seen = SeenJobs.from_env()
+    if seen is None:
+        return
+    try:
+        seen.mark(jobs)
+    finally:
+        seen.close()
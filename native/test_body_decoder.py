@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Tests for HAR response body decoding (compression sniffing, binary rejection)
+"""
+
+import base64
+import gzip
+import json
+import zlib
+
+from body_decoder import decode_body
+
+BODY = json.dumps({'title': 'Python scraper', 'description': 'Playwright job'}).encode('utf-8')
+
+
+def _entry(raw, content_encoding='', mime='application/json'):
+    headers = [{'name': 'Content-Encoding', 'value': content_encoding}] if content_encoding else []
+    return {'response': {'headers': headers,
+                         'content': {'mimeType': mime, 'encoding': 'base64',
+                                     'text': base64.b64encode(raw).decode('ascii')}}}
+
+
+def test_gzip_body_is_decompressed_with_or_without_header():
+    assert decode_body(_entry(gzip.compress(BODY), 'gzip')) == BODY.decode()
+    assert decode_body(_entry(gzip.compress(BODY))) == BODY.decode()
+
+
+def test_deflate_zlib_and_raw():
+    assert decode_body(_entry(zlib.compress(BODY), 'deflate')) == BODY.decode()
+    c = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    assert decode_body(_entry(c.compress(BODY) + c.flush(), 'deflate')) == BODY.decode()
+
+
+def test_header_on_already_decoded_body_is_ignored():
+    assert decode_body(_entry(BODY, 'gzip')) == BODY.decode()
+
+
+def test_binary_bodies_are_rejected():
+    assert decode_body(_entry(b'\x89PNG\r\n\x1a\n' + b'\x00' * 16)) == ''
+    assert decode_body(_entry(b'anything', mime='font/woff2')) == ''
+
+
+def test_plain_text_bodies_pass_through():
+    ent = {'response': {'content': {'mimeType': 'application/json', 'text': BODY.decode()}}}
+    assert decode_body(ent) == BODY.decode()
+
+
+if __name__ == "__main__":
+    test_gzip_body_is_decompressed_with_or_without_header()
+    test_deflate_zlib_and_raw()
+    test_header_on_already_decoded_body_is_ignored()
+    test_binary_bodies_are_rejected()
+    test_plain_text_bodies_pass_through()
+    print("✅ Body decoder tests passed")
@@ -91,10 +91,10 @@ def test_all_actions():
             print("   ❌ Job collection failed")
             print(f"   Response: {response}")
         
-        # Test 4: Run collector (alias)
-        print("\n4. Testing run_collector action...")
+        # Test 4: Collect (alias); run_collector starts the Playwright collector
+        print("\n4. Testing collect action...")
         response = send_and_receive(process, {
-            "action": "run_collector"
+            "action": "collect"
         })
         if response and response.get('success'):
             print(f"   ✅ Collector ran successfully")
@@ -159,4 +159,4 @@ if __name__ == "__main__":
         print("\n✅ All tests passed!")
     else:
         print("\n❌ Some tests failed!")
-        print("\nCheck the log file at: native/logs/native_host_*.log")
+        print("\nCheck the log file at: native/logs/native_host.log")
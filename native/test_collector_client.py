@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Tests for the collector daemon client
+"""
+
+import json
+import os
+import socketserver
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import collector_client
+from framing import read_frame, write_frames
+
+
+class _FakeDaemon(socketserver.StreamRequestHandler):
+    def handle(self):
+        message = json.loads(read_frame(self.rfile))
+        self.server.seen.append(message)
+        if message.get('token') != 'secret':
+            reply = {'ok': False, 'error': 'bad token'}
+        elif message['action'] == 'ping':
+            reply = {'ok': True, 'action': 'pong'}
+        else:
+            # Big enough to be chunked by write_frames
+            reply = {'ok': True, 'jobs': [{'title': 'x' * 1000}] * 1200, 'out_dir': '/tmp/out'}
+        write_frames(self.wfile, reply)
+
+
+class _SlowDaemon(socketserver.StreamRequestHandler):
+    def handle(self):
+        message = json.loads(read_frame(self.rfile))
+        if message['action'] != 'ping':
+            time.sleep(1.0)  # still collecting when the client gives up
+        write_frames(self.wfile, {'ok': True, 'action': 'pong'})
+
+
+def _with_env(env, fn):
+    saved = {k: os.environ.get(k) for k in env}
+    os.environ.update(env)
+    try:
+        return fn()
+    finally:
+        for k, v in saved.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+
+
+def test_collector_argv():
+    argv = collector_client.collector_argv({'mode': 'attach', 'list_scroll': 5, 'new_only': True,
+                                            'block': False}, '/tmp/out')
+    # attach without a CDP endpoint falls back to a fresh browser
+    assert argv[:2] == ['--mode', 'fresh'] and '--cdp' not in argv
+    assert argv[argv.index('--list-scroll') + 1] == '5' and argv[argv.index('--out') + 1] == '/tmp/out'
+    assert '--new-only' in argv and '--no-block' in argv and '--save-responses' not in argv
+    assert argv[argv.index('--headless') + 1] == 'false'
+    assert collector_client.collector_argv({'headless': True}, 'o')[argv.index('--headless') + 1] == 'true'
+    argv = collector_client.collector_argv({'mode': 'attach', 'cdp': 'http://localhost:9222'}, 'o')
+    assert argv[:2] == ['--mode', 'attach'] and argv[-2:] == ['--cdp', 'http://localhost:9222']
+
+
+def test_submit_collect_via_daemon():
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), _FakeDaemon)
+    server.seen = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            info_file = Path(tmp) / 'collector_daemon.json'
+            env = {'UPAI_DAEMON_FILE': str(info_file), 'UPAI_DAEMON_AUTOSTART': '0', 'UPAI_DAEMON': '1'}
+
+            # No daemon advertised and no autostart (the default): the caller spawns the script
+            assert _with_env(env, lambda: collector_client.submit_collect({}, tmp)) is None
+            assert _with_env(dict(env, UPAI_DAEMON_AUTOSTART=''), lambda: collector_client.submit_collect({}, tmp)) is None
+
+            info_file.write_text(json.dumps({'pid': 1, 'host': '127.0.0.1',
+                                             'port': server.server_address[1], 'token': 'secret'}))
+            reply = _with_env(env, lambda: collector_client.submit_collect({'details': 2}, tmp))
+            assert reply['ok'] and len(reply['jobs']) == 1200
+            ping, collect = server.seen[-2:]
+            assert ping['action'] == 'ping' and collect['action'] == 'collect'
+            assert collect['argv'][collect['argv'].index('--details') + 1] == '2'
+
+            # Disabled, or attaching to the user's Chrome: never use the daemon
+            assert _with_env(dict(env, UPAI_DAEMON='0'), lambda: collector_client.submit_collect({}, tmp)) is None
+            assert _with_env(env, lambda: collector_client.submit_collect(
+                {'mode': 'attach', 'cdp': 'http://localhost:9222'}, tmp)) is None
+
+            # A stale advertisement (wrong token) is not trusted
+            info_file.write_text(json.dumps({'port': server.server_address[1], 'token': 'old'}))
+            assert _with_env(env, lambda: collector_client.submit_collect({}, tmp)) is None
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_timeout_is_not_unreachable():
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), _SlowDaemon)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            info_file = Path(tmp) / 'collector_daemon.json'
+            info_file.write_text(json.dumps({'port': server.server_address[1], 'token': 'secret'}))
+            env = {'UPAI_DAEMON_FILE': str(info_file), 'UPAI_DAEMON_AUTOSTART': '0', 'UPAI_DAEMON': '1'}
+            # A busy daemon is an error for the caller, not a reason to spawn a second collector
+            reply = _with_env(env, lambda: collector_client.submit_collect({}, tmp, timeout=0.2))
+            assert reply == {'ok': False, 'error': 'daemon timed out'}
+    finally:
+        server.shutdown()
+        server.server_close()
+    # Nothing listening: None, so the caller spawns the script
+    assert collector_client.request({'action': 'ping'}, {'port': server.server_address[1], 'token': 'x'}, 0.5) is None
+
+
+if __name__ == '__main__':
+    test_collector_argv()
+    test_submit_collect_via_daemon()
+    test_timeout_is_not_unreachable()
+    print("✅ All collector client tests passed")
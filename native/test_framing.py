@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Tests for chunked native messaging frames
+"""
+
+import io
+import json
+import sys
+
+from framing import (CHROME_MAX_MESSAGE, ChunkAssembler, compress_reply, decode_reply, frame_payloads,
+                     negotiate_encoding, read_frame, write_frames)
+
+
+def _reply(n):
+    return {'ok': True, 'jobs': [{'title': f'Job {i} "quoted" ünïcode', 'description': 'x\\y ' * 200}
+                                 for i in range(n)]}
+
+
+def _read_all(buf):
+    """In-process reader: parse every frame from `buf` and reassemble replies."""
+    buf.seek(0)
+    assembler = ChunkAssembler()
+    frames, replies = [], []
+    while True:
+        body = read_frame(buf)
+        if body is None:
+            break
+        assert len(body) <= CHROME_MAX_MESSAGE
+        frame = json.loads(body.decode('utf-8'))
+        frames.append(frame)
+        done = assembler.feed(frame)
+        if done is not None:
+            replies.append(done)
+    return frames, replies
+
+
+def test_small_reply_is_a_single_plain_frame():
+    buf = io.BytesIO()
+    assert write_frames(buf, {'ok': True, 'action': 'pong'}, request_id=7) == 1
+    frames, replies = _read_all(buf)
+    assert frames == replies == [{'ok': True, 'action': 'pong'}]
+
+
+def test_large_reply_round_trips_through_chunks():
+    for ensure_ascii in (True, False):
+        buf = io.BytesIO()
+        msg = _reply(3000)
+        n = write_frames(buf, msg, request_id=42, ensure_ascii=ensure_ascii)
+        frames, replies = _read_all(buf)
+        assert n == len(frames) > 1
+        assert [f['chunk'] for f in frames] == list(range(n))
+        assert all(f['type'] == 'chunk' and f['id'] == 42 and f['total'] == n for f in frames)
+        assert replies == [msg]
+
+
+def test_escape_heavy_slices_stay_under_budget():
+    msg = {'data': '"\\' * 5000}
+    bodies = frame_payloads(msg, max_bytes=2048)
+    assert len(bodies) > 1 and all(len(b) <= 2048 for b in bodies)
+    assembler = ChunkAssembler()
+    out = [assembler.feed(json.loads(b)) for b in reversed(bodies)]  # out of order
+    assert out[-1] == msg and out[:-1] == [None] * (len(bodies) - 1)
+
+
+def test_native_host_send_message_chunks_large_replies():
+    import native_host
+
+    class _Out:
+        buffer = io.BytesIO()
+
+    saved, sys.stdout = sys.stdout, _Out()
+    try:
+        msg = _reply(3000)
+        assert native_host.send_message(msg, request_id='r1')
+    finally:
+        sys.stdout = saved
+    frames, replies = _read_all(_Out.buffer)
+    assert len(frames) > 1 and frames[0]['id'] == 'r1' and replies == [msg]
+
+
+def test_compressed_envelope_is_opt_in_and_round_trips():
+    msg = dict(_reply(3000), id=9, action='jobs_collected')
+    assert negotiate_encoding({'action': 'collect_jobs'}) is None
+    assert negotiate_encoding({'accept_encoding': ['br', 'deflate']}) == 'deflate'
+    assert negotiate_encoding({'accept_encoding': 'gzip, deflate'}) == 'gzip'
+    assert compress_reply(msg, None) is msg
+    small = {'ok': True, 'action': 'pong'}
+    assert compress_reply(small, 'gzip') is small
+    for encoding in ('gzip', 'deflate'):
+        env = compress_reply(msg, encoding)
+        assert env['type'] == 'encoded' and env['id'] == 9 and env['action'] == 'jobs_collected'
+        assert env['compressed_size'] < env['original_size'] // 5
+        # The envelope is framed like any other reply
+        buf = io.BytesIO()
+        write_frames(buf, env, request_id=9)
+        frames, replies = _read_all(buf)
+        assert len(frames) == 1 and decode_reply(replies[0]) == msg
+
+
+def test_non_ascii_is_sent_as_utf8():
+    import native_host
+
+    class _Out:
+        buffer = io.BytesIO()
+
+    saved, sys.stdout = sys.stdout, _Out()
+    try:
+        assert native_host.send_message({'title': 'ünïcode ' * 100})
+    finally:
+        sys.stdout = saved
+    body = _Out.buffer.getvalue()[4:]
+    assert 'ü'.encode('utf-8') in body and b'\\u00fc' not in body
+
+
+if __name__ == "__main__":
+    test_small_reply_is_a_single_plain_frame()
+    test_large_reply_round_trips_through_chunks()
+    test_escape_heavy_slices_stay_under_budget()
+    test_native_host_send_message_chunks_large_replies()
+    test_compressed_envelope_is_opt_in_and_round_trips()
+    test_non_ascii_is_sent_as_utf8()
+    print("✅ Framing tests passed")
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Tests for the on-disk parsed-HAR cache
+"""
+
+import json
+import tempfile
+from pathlib import Path
+
+from har_cache import HarCache
+
+
+def test_cache_hit_and_invalidation():
+    with tempfile.TemporaryDirectory() as tmp:
+        har = Path(tmp) / 'a.har'
+        har.write_text(json.dumps({'log': {'entries': []}}), encoding='utf-8')
+        cache = HarCache(Path(tmp) / 'cache')
+
+        assert cache.get(str(har), '1') is None
+        cache.put(str(har), '1', [{'title': 'T'}], ['abcd'])
+        hit = cache.get(str(har), '1')
+        assert hit['jobs'] == [{'title': 'T'}] and hit['entries'] == ['abcd']
+
+        # A different extractor version or a modified file misses
+        assert cache.get(str(har), '2') is None
+        har.write_text(json.dumps({'log': {'entries': [{}]}}), encoding='utf-8')
+        assert cache.get(str(har), '1') is None
+
+
+def test_lru_eviction_respects_size_cap():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = HarCache(Path(tmp) / 'cache', max_bytes=3000)
+        hars = []
+        for i in range(4):
+            har = Path(tmp) / f'{i}.har'
+            har.write_text('{}', encoding='utf-8')
+            hars.append(str(har))
+            cache.put(str(har), '1', [{'description': 'x' * 1000}])
+            # Keep the first file hot so it survives eviction
+            cache.get(hars[0], '1')
+        assert cache.get(hars[0], '1') is not None
+        assert cache.get(hars[1], '1') is None
+        total = sum(p.stat().st_size for p in (Path(tmp) / 'cache').glob('*.json'))
+        assert total <= 3000
+
+
+if __name__ == "__main__":
+    test_cache_hit_and_invalidation()
+    test_lru_eviction_respects_size_cap()
+    print("✅ HAR cache tests passed")
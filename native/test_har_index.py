@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Tests for the byte-offset HAR entry index
+"""
+
+import json
+import tempfile
+from pathlib import Path
+
+from har_cache import HarCache
+from har_index import INDEX_VERSION, build_index, is_job_candidate, iter_indexed_entries
+from har_stream import iter_har_entries, read_entry_at
+
+
+def _entry(url, mime, text):
+    return {'request': {'url': url, 'method': 'GET'},
+            'response': {'status': 200, 'content': {'mimeType': mime, 'text': text}}}
+
+
+ENTRIES = [
+    _entry('https://www.upwork.com/api/graphql/v1', 'application/json', '{"data": {"title": "Café"}}'),
+    _entry('https://cdn.upwork.com/app.js', 'application/javascript', 'var a = 1;' * 100),
+    _entry('https://www.upwork.com/logo.png', 'image/png', 'iVBORw0KGgo='),
+    _entry('https://www.google-analytics.com/g/collect', 'text/plain', '{}'),
+    _entry('https://www.upwork.com/ab/find-work/api/feeds', 'text/plain', ')]}\'\n{"jobs": []}'),
+]
+
+
+def _write_har(tmp):
+    path = Path(tmp) / 'capture.har'
+    path.write_text(json.dumps({'log': {'pages': [], 'entries': ENTRIES}}, ensure_ascii=False, indent=1),
+                    encoding='utf-8')
+    return str(path)
+
+
+def test_index_byte_ranges_round_trip():
+    with tempfile.TemporaryDirectory() as tmp:
+        har = _write_har(tmp)
+        index = build_index(har)
+        assert [r['url'] for r in index] == [e['request']['url'] for e in ENTRIES]
+        for rec, ent in zip(index, iter_har_entries(har)):
+            assert read_entry_at(har, rec['start'], rec['end']) == ent
+        assert [is_job_candidate(r) for r in index] == [True, False, False, False, True]
+
+
+def test_indexed_iteration_is_persisted_and_reused():
+    with tempfile.TemporaryDirectory() as tmp:
+        har = _write_har(tmp)
+        cache = HarCache(Path(tmp) / 'cache')
+        first = list(iter_indexed_entries(har, cache=cache))
+        assert cache.get(har, INDEX_VERSION, kind='index') is not None
+        second = list(iter_indexed_entries(har, cache=cache))
+        assert first == second == [ENTRIES[0], ENTRIES[4]]
+
+
+if __name__ == "__main__":
+    test_index_byte_ranges_round_trip()
+    test_indexed_iteration_is_persisted_and_reused()
+    print("✅ HAR index tests passed")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming HAR reader (no browser or Windows runner needed)
+"""
+
+import base64
+import json
+import os
+import tempfile
+
+from har_stream import iter_har_entries, iter_response_bodies, map_entries
+
+
+def _write_har(entries, **log_extra):
+    har = {'log': dict({'version': '1.2', 'pages': [{'id': 'page_1'}]}, **log_extra, entries=entries)}
+    fd, path = tempfile.mkstemp(suffix='.har')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(har, f, indent=2)
+    return path
+
+
+def test_streams_entries_in_order():
+    entries = [{'response': {'content': {'text': f'body-{i}'}}} for i in range(50)]
+    path = _write_har(entries, comment='after entries')
+    try:
+        got = [ent['response']['content']['text'] for ent in iter_har_entries(path)]
+        assert got == [f'body-{i}' for i in range(50)]
+        assert len(list(iter_har_entries(path, limit=10))) == 10
+    finally:
+        os.remove(path)
+
+
+def test_decodes_base64_bodies_and_skips_empty():
+    body = json.dumps({'title': 'T', 'description': 'D'})
+    entries = [
+        {'response': {'content': {'text': base64.b64encode(body.encode()).decode(), 'encoding': 'base64'}}},
+        {'response': {'content': {}}},
+        {'response': {'content': {'text': body}}},
+    ]
+    path = _write_har(entries)
+    try:
+        assert [text for _, text in iter_response_bodies(path)] == [body, body]
+    finally:
+        os.remove(path)
+
+
+def test_truncated_har_yields_complete_entries():
+    entries = [{'response': {'content': {'text': 'x' * 1000}}} for _ in range(20)]
+    path = _write_har(entries)
+    try:
+        with open(path, 'r+', encoding='utf-8') as f:
+            data = f.read()
+            f.seek(0)
+            f.truncate()
+            f.write(data[:len(data) // 2])
+        got = list(iter_response_bodies(path))
+        assert 0 < len(got) < 20
+    finally:
+        os.remove(path)
+
+
+def _body_of(ent):
+    return ent['response']['content']['text']
+
+
+def test_map_entries_pool_keeps_file_order():
+    entries = [{'response': {'content': {'text': f'body-{i}'}}} for i in range(100)]
+    path = _write_har(entries)
+    try:
+        serial = list(map_entries(path, _body_of, workers=1))
+        pooled = list(map_entries(path, _body_of, workers=3, min_parallel_bytes=0, batch_size=7))
+        assert pooled == serial == [f'body-{i}' for i in range(100)]
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    test_streams_entries_in_order()
+    test_decodes_base64_bodies_and_skips_empty()
+    test_truncated_har_yields_complete_entries()
+    test_map_entries_pool_keeps_file_order()
+    print("✅ HAR stream tests passed")
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental tail-ingestion of growing HAR files
+"""
+
+import json
+import tempfile
+from pathlib import Path
+
+from har_index import build_index
+from har_tail import can_resume, iter_appended_entries, state_from_index
+
+
+def _write_har(path, count):
+    entries = [{'request': {'url': f'https://www.upwork.com/api/graphql/v1?n={i}'},
+                'response': {'content': {'mimeType': 'application/json', 'text': f'{{"n": {i}}}'}}}
+               for i in range(count)]
+    path.write_text(json.dumps({'log': {'entries': entries}}, indent=1), encoding='utf-8')
+
+
+def test_only_appended_entries_are_read():
+    with tempfile.TemporaryDirectory() as tmp:
+        har = Path(tmp) / 'session.har'
+        _write_har(har, 5)
+        state = state_from_index(str(har), build_index(str(har)))
+        assert state['count'] == 5
+
+        _write_har(har, 8)
+        assert can_resume(str(har), state)
+        new = list(iter_appended_entries(str(har), state))
+        assert [e['request']['url'][-3:] for e in new] == ['n=5', 'n=6', 'n=7']
+        assert state['count'] == 8
+        assert list(iter_appended_entries(str(har), state)) == []
+
+
+def test_rewritten_har_is_not_resumed():
+    with tempfile.TemporaryDirectory() as tmp:
+        har = Path(tmp) / 'session.har'
+        _write_har(har, 5)
+        state = state_from_index(str(har), build_index(str(har)))
+        _write_har(har, 3)
+        assert not can_resume(str(har), state)
+
+
+if __name__ == "__main__":
+    test_only_appended_entries_are_read()
+    test_rewritten_har_is_not_resumed()
+    print("✅ HAR tail tests passed")
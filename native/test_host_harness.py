@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Tests for the cross-platform host protocol harness
+"""
+
+import tempfile
+from pathlib import Path
+
+from host_harness import latency_stats, make_har, percentile, start_host
+
+
+def test_percentile():
+    values = [i / 1000 for i in range(1, 101)]
+    assert percentile(values, 50) == 0.05
+    assert percentile(values, 99) == 0.099
+    assert percentile([], 50) == 0.0
+
+
+def test_thread_host_round_trips():
+    with tempfile.TemporaryDirectory() as tmp:
+        har = make_har(Path(tmp) / 'jobs.har', 120, per_entry=50)
+        with start_host(Path(tmp) / 'state', mode='thread', accept_encoding=['gzip']) as client:
+            reply, seconds = client.request({'action': 'collect_jobs', 'har_path': har, 'page_size': 50})
+            assert reply['ok'] and reply['total'] == 120 and len(reply['jobs']) == 50
+            assert seconds > 0
+            cursor = reply['next_cursor']
+            stats = latency_stats(client.run([{'action': 'ping'}] * 20 + [{'action': 'next_page', 'cursor': cursor}] * 5,
+                                             window=4))
+            assert stats['n'] == 25 and stats['failed'] == 0
+            assert 0 < stats['p50_ms'] <= stats['p99_ms'] and stats['msg_s'] > 0
+            # State stays in the harness directory
+            assert (Path(tmp) / 'state' / 'results').is_dir()
+
+
+def test_process_host_ping():
+    with tempfile.TemporaryDirectory() as tmp:
+        with start_host(tmp, mode='process', script='host_launcher.py') as client:
+            reply, _ = client.request({'action': 'ping'})
+            assert reply['action'] == 'pong' and reply['id'] == 1
+            reply, _ = client.request({'action': 'next_page', 'cursor': 'nope'})
+            assert reply['ok'] is False
+
+
+if __name__ == '__main__':
+    test_percentile()
+    test_thread_host_round_trips()
+    test_process_host_ping()
+    print("✅ All host harness tests passed")
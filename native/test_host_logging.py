@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for the native host logging pipeline
+"""
+
+import os
+import logging
+import tempfile
+import threading
+from pathlib import Path
+
+from host_logging import DroppingQueueHandler, log_payload, setup_logging, summarize
+
+
+def _logger(name):
+    log = logging.getLogger(f'upai_test.{name}')
+    log.propagate = False
+    log.handlers.clear()
+    return log
+
+
+def test_summary_has_sizes_not_contents():
+    reply = {'ok': True, 'action': 'jobs_collected', 'id': 3,
+             'jobs': [{'title': 'T', 'description': 'secret text ' * 100}] * 250, 'timestamp': 'now'}
+    line = summarize(reply, 418211, frames=1)
+    assert "action='jobs_collected'" in line and 'id=3' in line and 'jobs[250]' in line
+    assert 'bytes=418211' in line and 'frames=1' in line and 'keys=[timestamp]' in line
+    assert 'secret' not in line
+
+
+def test_records_rotate_through_the_listener():
+    with tempfile.TemporaryDirectory() as d:
+        log = _logger('rotate')
+        listener = setup_logging(Path(d), 'host', level='INFO', max_bytes=2000, backups=2, logger=log)
+        for i in range(200):
+            log.info('line %d %s', i, 'x' * 40)
+        log.debug('hidden')
+        listener.stop()
+        for h in log.handlers:
+            h.close()
+        files = sorted(os.listdir(d))
+        assert files == ['host.log', 'host.log.1', 'host.log.2']
+        text = Path(d, 'host.log').read_text(encoding='utf-8')
+        assert 'line 199' in text and 'hidden' not in text
+        assert all(os.path.getsize(Path(d, f)) <= 2000 for f in files)
+
+
+def test_full_queue_drops_instead_of_blocking():
+    import queue
+    q = queue.Queue(maxsize=2)
+    handler = DroppingQueueHandler(q)
+    log = _logger('drop')
+    log.addHandler(handler)
+    log.setLevel(logging.INFO)
+    done = threading.Event()
+
+    def flood():
+        for i in range(100):
+            log.info('msg %d', i)
+        done.set()
+
+    threading.Thread(target=flood, daemon=True).start()
+    assert done.wait(2) and q.qsize() == 2 and handler.dropped == 98
+    q.get_nowait()
+    log.info('after')
+    assert handler.dropped == 0
+    assert [q.get_nowait().getMessage() for _ in range(2)] == ['msg 1', '[98 log records dropped] after']
+
+
+def test_debug_capture_is_sampled():
+    records = []
+
+    class _Collect(logging.Handler):
+        def emit(self, record):
+            records.append(record)
+
+    log = _logger('sample')
+    log.addHandler(_Collect())
+    log.setLevel(logging.DEBUG)
+    saved = os.environ.get('UPAI_LOG_SAMPLE')
+    try:
+        os.environ['UPAI_LOG_SAMPLE'] = '0'
+        log_payload('sent', {'action': 'pong'}, 10, logger=log)
+        assert [r.levelno for r in records] == [logging.INFO]
+        os.environ['UPAI_LOG_SAMPLE'] = '1'
+        os.environ['UPAI_LOG_SAMPLE_MAX_KB'] = '1'
+        log_payload('sent', {'data': 'y' * 5000}, logger=log)
+        capture = records[-1].getMessage()
+        assert records[-1].levelno == logging.DEBUG and 'chars truncated' in capture and len(capture) < 1200
+    finally:
+        os.environ.pop('UPAI_LOG_SAMPLE_MAX_KB', None)
+        if saved is None:
+            os.environ.pop('UPAI_LOG_SAMPLE', None)
+        else:
+            os.environ['UPAI_LOG_SAMPLE'] = saved
+
+
+if __name__ == "__main__":
+    test_summary_has_sizes_not_contents()
+    test_records_rotate_through_the_listener()
+    test_full_queue_drops_instead_of_blocking()
+    test_debug_capture_is_sampled()
+    print("✅ Host logging tests passed")
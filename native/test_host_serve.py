@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Tests for the concurrent native host loop
+"""
+
+import asyncio
+import json
+import os
+import queue
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import native_host
+from framing import decode_reply
+
+
+def _run(messages, handle):
+    """Feed `messages` to native_host.serve and return the replies in send order."""
+    inbox: queue.Queue = queue.Queue()
+    for m in messages:
+        inbox.put(m)
+    inbox.put(None)
+    sent = []
+    lock = threading.Lock()
+
+    def write(response, request_id=None):
+        with lock:
+            sent.append(response)
+        return True
+
+    asyncio.run(native_host.serve(read=inbox.get, write=write, handle=handle, workers=2))
+    return sent
+
+
+def test_ping_is_answered_while_import_runs():
+    release = threading.Event()
+
+    def handle(message):
+        if message['action'] == 'import_har':
+            release.wait(5)
+            return {'ok': True, 'action': 'har_imported'}
+        release.set()
+        return native_host.process_message(message)
+
+    sent = _run([{'action': 'import_har', 'id': 1}, {'action': 'ping', 'id': 2}], handle)
+    # The ping reply overtakes the import and both carry their request id
+    assert [(r['id'], r['action']) for r in sent] == [(2, 'pong'), (1, 'har_imported')]
+
+
+def test_many_messages_no_per_message_floor():
+    start = time.perf_counter()
+    sent = _run([{'action': 'ping', 'id': i} for i in range(200)], native_host.process_message)
+    assert sorted(r['id'] for r in sent) == list(range(200))
+    # The old loop slept 10 ms per message (>= 2 s here)
+    assert time.perf_counter() - start < 1.5
+
+
+def test_handler_errors_become_error_replies():
+    def handle(message):
+        raise RuntimeError('boom')
+
+    [reply] = _run([{'action': 'collect_jobs', 'id': 'x'}], handle)
+    assert reply['ok'] is False and reply['id'] == 'x' and 'boom' in reply['error']
+
+
+def test_large_replies_are_compressed_when_accepted():
+    def handle(message):
+        return {'ok': True, 'action': 'jobs_collected', 'jobs': [{'description': 'text ' * 100}] * 500}
+
+    sent = _run([{'action': 'collect_jobs', 'id': 1},
+                 {'action': 'collect_jobs', 'id': 2, 'accept_encoding': ['gzip']}], handle)
+    plain, packed = sorted(sent, key=lambda r: r['id'])
+    assert 'jobs' in plain and 'type' not in plain
+    assert packed['type'] == 'encoded' and packed['compressed_size'] < packed['original_size']
+    assert decode_reply(packed) == dict(handle(None), id=2)
+
+
+def test_import_leaves_heavy_modules_unloaded():
+    code = ("import sys, native_host; "
+            "print([m for m in ('asyncio', 'har_stream', 'json_backend', 'result_pages', 'gzip') if m in sys.modules])")
+    out = subprocess.run([sys.executable, '-c', code], cwd=str(Path(__file__).parent),
+                         capture_output=True, text=True, check=True).stdout
+    assert out.strip() == '[]'
+
+
+def _run_launcher(messages, logs):
+    frames = b''
+    for message in messages:
+        body = json.dumps(message).encode('utf-8')
+        frames += struct.pack('I', len(body)) + body
+    out = subprocess.run([sys.executable, 'host_launcher.py'], cwd=str(Path(__file__).parent),
+                         env=dict(os.environ, UPAI_LOG_DIR=logs), input=frames,
+                         capture_output=True, timeout=60).stdout
+    replies = []
+    while out:
+        (length,) = struct.unpack('I', out[:4])
+        replies.append(json.loads(out[4:4 + length]))
+        out = out[4 + length:]
+    return replies
+
+
+def test_launcher_answers_ping_then_hands_over():
+    with tempfile.TemporaryDirectory() as logs:
+        replies = _run_launcher([{'action': 'ping', 'id': 1}, {'action': 'next_page', 'cursor': 'bad', 'id': 2}], logs)
+        assert (Path(logs) / 'native_host.log').exists()
+    assert [(r['id'], r['ok']) for r in replies] == [(1, True), (2, False)]
+    assert replies[0]['action'] == 'pong' and 'T' in replies[0]['timestamp']
+
+
+def test_launcher_routes_collector_requests():
+    # The service worker's "Run Collector" goes to collector_enhanced, not native_host
+    with tempfile.TemporaryDirectory() as logs:
+        replies = _run_launcher([{'action': 'test'}], logs)
+        assert not (Path(logs) / 'native_host.log').exists()
+    assert len(replies) == 1 and replies[0]['ok'] and replies[0]['jobs']
+    assert 'mock' in replies[0]['note'].lower()
+
+    # ...and so do collector requests later on a port that opened with a ping
+    with tempfile.TemporaryDirectory() as logs:
+        replies = _run_launcher([{'action': 'ping', 'id': 1}, {'action': 'test', 'id': 2}], logs)
+    assert [r['id'] for r in replies] == [1, 2]
+    assert replies[1]['ok'] and 'mock' in replies[1]['note'].lower()
+
+
+if __name__ == "__main__":
+    test_ping_is_answered_while_import_runs()
+    test_many_messages_no_per_message_floor()
+    test_handler_errors_become_error_replies()
+    test_large_replies_are_compressed_when_accepted()
+    test_import_leaves_heavy_modules_unloaded()
+    test_launcher_answers_ping_then_hands_over()
+    test_launcher_routes_collector_requests()
+    print("✅ Host loop tests passed")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests for the path-learning job extractor
+"""
+
+import tempfile
+from pathlib import Path
+
+from job_extractor import PathTemplates, endpoint_key, extract_jobs, walk_jobs
+
+
+def _job(i):
+    return {'title': f'Job {i}', 'description': f'Desc {i}', 'url': f'https://x/{i}'}
+
+
+def _search(n):
+    return {'data': {'search': {'edges': [{'node': _job(i)} for i in range(n)]}}}
+
+
+def test_walk_order_and_paths():
+    obj = {'a': [_job(1), {'b': _job(2)}], 'c': _job(3)}
+    jobs, paths = walk_jobs(obj)
+    assert [j['title'] for j in jobs] == ['Job 1', 'Job 2', 'Job 3']
+    assert paths == [('a', '*'), ('a', '*', 'b'), ('c',)]
+
+
+def test_deep_payload_does_not_recurse():
+    obj = _job(0)
+    for _ in range(5000):
+        obj = {'n': obj}
+    jobs, paths = walk_jobs(obj)
+    assert len(jobs) == 1 and len(paths[0]) == 5000
+
+
+def test_templates_learned_persisted_and_reused():
+    with tempfile.TemporaryDirectory() as d:
+        store = Path(d) / 'paths.json'
+        t = PathTemplates(store)
+        assert len(extract_jobs(_search(3), 'gql:search', t)) == 3
+        assert t.get('gql:search') == [('data', 'search', 'edges', '*', 'node')]
+        # A fresh process sees the learned template
+        t2 = PathTemplates(store)
+        assert t2.get('gql:search') == [('data', 'search', 'edges', '*', 'node')]
+        assert [j['title'] for j in extract_jobs(_search(2), 'gql:search', t2)] == ['Job 0', 'Job 1']
+        # Template miss (different shape) falls back to a full walk and learns it
+        other = {'results': [_job(9)]}
+        assert [j['title'] for j in extract_jobs(other, 'gql:search', t2)] == ['Job 9']
+        assert ('results', '*') in t2.get('gql:search')
+
+
+def test_periodic_walk_finds_new_job_lists():
+    with tempfile.TemporaryDirectory() as d:
+        store = Path(d) / 'paths.json'
+        t = PathTemplates(store, verify_every=3)
+        extract_jobs(_search(2), 'gql:search', t)  # learns the path
+        extract_jobs(_search(2), 'gql:search', t)  # first template hit: checked by a walk
+        before = t.version()
+        # A second result list appears next to the learned one
+        both = dict(_search(2), featured=[_job(7)])
+        counts = [len(extract_jobs(both, 'gql:search', t)) for _ in range(4)]
+        # Hits 2-3 trust the templates, hit 4 walks and learns the new list
+        assert counts == [2, 2, 3, 3]
+        assert ('featured', '*') in t.get('gql:search') and t.version() != before
+
+
+def test_endpoint_key():
+    assert endpoint_key('https://www.upwork.com/api/graphql/v1', {'text': '{"operationName": "userJobSearch"}'}) == 'gql:userJobSearch'
+    assert endpoint_key('https://www.upwork.com/api/graphql/v1?alias=gql-query-jobdetails') == 'gql:gql-query-jobdetails'
+    assert endpoint_key('https://www.upwork.com/ab/find-work/api/feeds?x=1') == 'www.upwork.com/ab/find-work/api/feeds'
+
+
+if __name__ == "__main__":
+    test_walk_order_and_paths()
+    test_deep_payload_does_not_recurse()
+    test_templates_learned_persisted_and_reused()
+    test_periodic_walk_finds_new_job_lists()
+    test_endpoint_key()
+    print("✅ Job extractor tests passed")
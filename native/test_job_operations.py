@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Tests for the operation-routed job extractors
+"""
+
+from job_extractor import request_operations
+from job_operations import find_extractor, route_jobs
+
+
+def _search_hit(i):
+    return {
+        'id': f'{i}',
+        'title': f'Job {i}',
+        'description': f'Desc {i}',
+        'ontologySkills': [{'prefLabel': 'Python'}, {'prefLabel': 'Scrapy'}],
+        'upworkHistoryData': {'client': {'country': 'Germany', 'totalFeedback': 4.9,
+                                         'totalSpent': {'amount': '1200.0'},
+                                         'paymentVerificationStatus': 'VERIFIED'}},
+        'jobTile': {'job': {'ciphertext': f'~01ab{i}', 'totalApplicants': 7,
+                            'fixedPriceAmount': {'amount': '0.0'},
+                            'hourlyBudgetMin': 30, 'hourlyBudgetMax': 50,
+                            'publishTime': '2025-09-07T03:00:00Z'}},
+    }
+
+
+def _search(n):
+    return {'data': {'search': {'universalSearchNuxt': {'userJobSearchV1': {
+        'results': [_search_hit(i) for i in range(n)]}}}}}
+
+
+def test_request_operations():
+    assert request_operations('https://www.upwork.com/api/graphql/v1',
+                              {'text': '{"operationName": "userJobSearch"}'}) == ['userJobSearch']
+    batch = '[{"operationName": "a"}, {"operationName": "b"}]'
+    assert request_operations('https://www.upwork.com/api/graphql/v1', batch) == ['a', 'b']
+    assert request_operations('https://www.upwork.com/api/graphql/v1?alias=gql-query-jobdetails') == ['gql-query-jobdetails']
+    assert request_operations('https://www.upwork.com/ab/find-work/api/feeds/search') == []
+
+
+def test_job_search_full_records():
+    jobs = route_jobs(_search(2), ['userJobSearch'], 'gql:userJobSearch')
+    assert [j['title'] for j in jobs] == ['Job 0', 'Job 1']
+    j = jobs[0]
+    assert j['id'] == '0'
+    assert j['url'] == 'https://www.upwork.com/jobs/~01ab0'
+    assert j['budget'] == '$30-50/hr'
+    assert j['skills'] == ['Python', 'Scrapy']
+    assert j['applicants'] == 7
+    assert j['client'] == {'country': 'Germany', 'rating': 4.9, 'total_spent': '1200', 'payment_verified': True}
+
+
+def test_job_details_and_name_normalisation():
+    doc = {'data': {'jobAuthDetails': {'opening': {
+        'job': {'info': {'id': '42', 'title': 'Scraper', 'ciphertext': '~0142'},
+                'description': 'Build it', 'budget': {'amount': 500},
+                'clientActivity': {'totalApplicants': 3}},
+        'buyer': {'info': {'location': {'country': 'US'}}}}}}}
+    assert find_extractor('JobDetails') is find_extractor('gql-query-jobdetails')
+    [j] = route_jobs(doc, ['gql-query-jobdetails'])
+    assert (j['id'], j['title'], j['budget'], j['applicants']) == ('42', 'Scraper', '$500', 3)
+    assert j['client']['country'] == 'US'
+
+
+def test_url_path_feed_and_batched_routing():
+    feed = {'results': [{'uid': '9', 'title': 'Feed job', 'description': 'd', 'amount': {'amount': 100}}]}
+    [j] = route_jobs(feed, [], 'www.upwork.com/ab/find-work/api/feeds/best-matches',
+                     'https://www.upwork.com/ab/find-work/api/feeds/best-matches')
+    assert (j['id'], j['budget']) == ('9', '$100')
+    batched = [{'data': {'other': 1}}, _search(1)]
+    jobs = route_jobs(batched, ['viewer', 'userJobSearch'])
+    assert [j['title'] for j in jobs] == ['Job 0'] and jobs[0]['client']
+
+
+def test_unknown_operation_falls_back_to_generic_walker():
+    obj = {'data': {'x': [{'title': 'T', 'description': 'D'}]}}
+    assert route_jobs(obj, ['somethingElse']) == [{'title': 'T', 'description': 'D', 'skills': [], 'budget': '', 'url': ''}]
+    # Known operation, unexpected shape: generic walker still finds it
+    assert [j['title'] for j in route_jobs(obj, ['userJobSearch'])] == ['T']
+
+
+if __name__ == "__main__":
+    test_request_operations()
+    test_job_search_full_records()
+    test_job_details_and_name_normalisation()
+    test_url_path_feed_and_batched_routing()
+    test_unknown_operation_falls_back_to_generic_walker()
+    print("✅ Job operation tests passed")
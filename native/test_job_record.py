@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Tests for the compact job record
+"""
+
+import json
+import tracemalloc
+
+from job_record import SKILLS, JobRecord, compact_jobs, intern_skills
+
+
+def _job(i):
+    return {'title': f'Job {i}', 'description': f'Desc {i}', 'skills': ['Python', 'Scrapy'],
+            'budget': '$500', 'url': f'https://www.upwork.com/jobs/~01{i:016x}'}
+
+
+def test_round_trip_wire_format():
+    plain = _job(1)
+    assert JobRecord.from_dict(plain).to_dict() == plain
+    routed = dict(_job(2), id='2', client={'country': 'US'}, applicants='', posted='2025-09-07', extra_field=1)
+    assert JobRecord.from_dict(routed).to_dict() == routed
+    # Skills that are not plain names are kept as they are
+    raw = dict(_job(3), skills=[{'name': 'Python'}])
+    assert JobRecord.from_dict(raw).to_dict() == raw
+    # Keys sent as null stay on the wire; absent keys stay absent
+    nulls = dict(_job(4), budget=None, client=None, skills=None, note=None)
+    assert JobRecord.from_dict(nulls).to_dict() == nulls
+    assert 'client' not in JobRecord.from_dict(_job(5)).to_dict()
+
+
+def test_skills_are_interned_to_small_ids():
+    a, b = JobRecord.from_dict(_job(1)), JobRecord.from_dict(_job(2))
+    assert a.skills == b.skills and all(isinstance(i, int) and i < len(SKILLS) for i in a.skills)
+    x, y = intern_skills([''.join(['Pyt', 'hon'])]), intern_skills([''.join(['Py', 'thon'])])
+    assert x[0] is y[0]
+
+
+def test_records_use_less_memory_than_dicts():
+    blob = json.dumps([_job(i) for i in range(2000)])
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    dicts = json.loads(blob)
+    dict_bytes = tracemalloc.get_traced_memory()[0] - base
+    del dicts
+    base = tracemalloc.get_traced_memory()[0]
+    records = compact_jobs(json.loads(blob))
+    rec_bytes = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    assert len(records) == 2000 and rec_bytes < 0.8 * dict_bytes
+
+
+if __name__ == "__main__":
+    test_round_trip_wire_format()
+    test_skills_are_interned_to_small_ids()
+    test_records_use_less_memory_than_dicts()
+    print("✅ Job record tests passed")
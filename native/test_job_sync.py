@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests for delta sync of jobs
+"""
+
+import tempfile
+import threading
+from pathlib import Path
+
+from job_sync import SyncLedger, add_content_hashes, content_hash
+
+
+def _jobs(start, n, desc='d'):
+    jobs = [{'title': f'Job {i}', 'description': desc, 'url': f'https://www.upwork.com/jobs/~01{i:016x}'}
+            for i in range(start, start + n)]
+    add_content_hashes(jobs)
+    return jobs
+
+
+def test_content_hash_ignores_key_order_and_itself():
+    a = {'title': 'T', 'budget': '$5'}
+    b = {'budget': '$5', 'title': 'T', 'hash': 'stale'}
+    assert content_hash(a) == content_hash(b) != content_hash({'title': 'T', 'budget': '$6'})
+
+
+def test_token_sync_returns_only_added_and_changed():
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / 'ledger.json'
+        first = SyncLedger(path).sync(_jobs(0, 5))
+        assert first['full'] and len(first['jobs']) == 5 and first['added'] == 5
+        # A new host process picks up the same ledger
+        again = SyncLedger(path).sync(_jobs(0, 5), token=first['token'])
+        assert again['jobs'] == [] and again['unchanged'] == 5 and not again['full']
+        jobs = _jobs(0, 6)
+        jobs[2] = _jobs(2, 1, desc='edited')[0]
+        delta = SyncLedger(path).sync(jobs, token=again['token'])
+        assert [j['title'] for j in delta['jobs']] == ['Job 2', 'Job 5']
+        assert (delta['added'], delta['changed'], delta['unchanged']) == (1, 1, 4)
+        assert delta['token'] != again['token']
+
+
+def test_known_hashes_and_reset_ledger():
+    with tempfile.TemporaryDirectory() as d:
+        ledger = SyncLedger(Path(d) / 'ledger.json')
+        held = _jobs(0, 3)
+        delta = ledger.sync(_jobs(0, 4), known=[j['hash'] for j in held])
+        assert [j['title'] for j in delta['jobs']] == ['Job 3'] and delta['added'] == 1
+        # A token from another (or deleted) ledger falls back to a full sync
+        fresh = SyncLedger(Path(d) / 'other.json')
+        delta = fresh.sync(_jobs(0, 4), token=ledger.token)
+        assert delta['full'] and len(delta['jobs']) == 4
+
+
+def test_concurrent_hosts_never_lose_changes():
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / 'ledger.json'
+        SyncLedger(path).sync(_jobs(0, 3))
+        # Two host processes open the ledger at the same time
+        a, b = SyncLedger(path), SyncLedger(path)
+        ta = a.sync(_jobs(0, 5))['token']
+        tb = b.sync(_jobs(0, 3) + _jobs(5, 1))['token']
+        assert int(tb.split('.')[1]) > int(ta.split('.')[1])
+        # A client holding a's token still gets b's job
+        delta = SyncLedger(path).sync(_jobs(0, 6), token=ta)
+        assert not delta['full'] and [j['title'] for j in delta['jobs']] == ['Job 5']
+
+        # Many at once: every job gets its own sequence number
+        path = Path(d) / 'busy.json'
+        threads = [threading.Thread(target=lambda i=i: SyncLedger(path).sync(_jobs(i * 10, 10))) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        ledger = SyncLedger(path)
+        assert len(ledger.jobs) == 40 and ledger.seq == 40
+
+
+def test_native_host_sync_action():
+    import native_host
+    from result_pages import ResultStore
+
+    # Both stores under a temp dir; the defaults live in native/logs
+    with tempfile.TemporaryDirectory() as d:
+        saved = native_host._ledger, native_host._results
+        native_host._ledger = SyncLedger(Path(d) / 'ledger.json')
+        native_host._results = ResultStore(Path(d) / 'results')
+        try:
+            jobs = _jobs(0, 3)
+            first = native_host._sync_response(jobs, {'page_size': 2})
+            assert first['total'] == 3 and len(first['jobs']) == 2 and first['next_cursor']
+            # No token until the last page has been read
+            assert first['token'] is None
+            last = native_host.process_message({'action': 'next_page', 'cursor': first['next_cursor'], 'page_size': 2})
+            assert len(last['jobs']) == 1 and last['next_cursor'] is None and last['token']
+            second = native_host._sync_response(jobs, {'token': last['token']})
+            assert second['jobs'] == [] and second['unchanged'] == 3 and second['token']
+        finally:
+            native_host._results.flush()
+            native_host._ledger, native_host._results = saved
+
+
+if __name__ == "__main__":
+    test_content_hash_ignores_key_order_and_itself()
+    test_token_sync_returns_only_added_and_changed()
+    test_known_hashes_and_reset_ledger()
+    test_concurrent_hosts_never_lose_changes()
+    test_native_host_sync_action()
+    print("✅ Job sync tests passed")
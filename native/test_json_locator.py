@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Tests for the multi-document JSON locator
+"""
+
+from json_locator import iter_json_values, may_contain_json
+
+
+def test_xssi_prefixes():
+    assert list(iter_json_values(")]}',\n{\"a\": 1}")) == [{'a': 1}]
+    assert list(iter_json_values(")]}'\n[1, 2]")) == [[1, 2]]
+    assert list(iter_json_values('while(1);{"a": 1}')) == [{'a': 1}]
+
+
+def test_ndjson_and_concatenated_batches():
+    body = '{"data": {"a": 1}}\n{"data": {"b": 2}}\n'
+    assert list(iter_json_values(body)) == [{'data': {'a': 1}}, {'data': {'b': 2}}]
+    assert list(iter_json_values('{"a": 1}{"b": 2}')) == [{'a': 1}, {'b': 2}]
+
+
+def test_multipart_graphql_response():
+    body = ('--graphql\r\ncontent-type: application/json\r\n\r\n{"data": {"x": 1}}\r\n'
+            '--graphql\r\ncontent-type: application/json\r\n\r\n{"incremental": []}\r\n--graphql--')
+    assert list(iter_json_values(body)) == [{'data': {'x': 1}}, {'incremental': []}]
+
+
+def test_state_blobs_in_html():
+    html = ('<html><head><script>var cfg = {a: 1};</script>'
+            '<script id="__NEXT_DATA__" type="application/json">{"props": {"jobs": []}}</script>'
+            '<script>window.__INITIAL_STATE__ = {"search": {"total": 3}};</script></head></html>')
+    assert list(iter_json_values(html)) == [{'props': {'jobs': []}}, {'search': {'total': 3}}]
+
+
+def test_prefilter():
+    assert may_contain_json('application/json', '')
+    assert may_contain_json('text/plain', ")]}'\n{}")
+    assert not may_contain_json('text/javascript', 'function f() { return 1; }')
+
+
+if __name__ == "__main__":
+    test_xssi_prefixes()
+    test_ndjson_and_concatenated_batches()
+    test_multipart_graphql_response()
+    test_state_blobs_in_html()
+    test_prefilter()
+    print("✅ JSON locator tests passed")
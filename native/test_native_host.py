@@ -76,4 +76,4 @@ if __name__ == "__main__":
         print("\n✅ Native host is working correctly!")
     else:
         print("\n❌ Native host test failed!")
-        print("\nCheck the log file at: native/logs/native_host_*.log")
+        print("\nCheck the log file at: native/logs/native_host.log")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Tests for the collector's request filter
+"""
+
+import os
+
+from request_filter import RequestFilter
+
+
+class _Request:
+    def __init__(self, resource_type, url):
+        self.resource_type = resource_type
+        self.url = url
+
+
+class _Route:
+    def __init__(self, resource_type, url):
+        self.request = _Request(resource_type, url)
+        self.outcome = None
+
+    def continue_(self):
+        self.outcome = 'continue'
+
+    def abort(self, error_code=None):
+        self.outcome = error_code
+
+
+def test_decide():
+    f = RequestFilter()
+    assert f.decide('image', 'https://www.upwork.com/logo.png') == 'type:image'
+    assert f.decide('script', 'https://www.googletagmanager.com/gtm.js') == 'host:googletagmanager.com'
+    assert f.decide('xhr', 'https://static.hotjar.com/c/hotjar.js') == 'host:hotjar.com'
+    # API calls, documents and first-party scripts load
+    assert f.decide('fetch', 'https://www.upwork.com/api/graphql/v1?alias=userJobSearch') is None
+    assert f.decide('document', 'https://www.upwork.com/nx/find-work/') is None
+    assert f.decide('script', 'https://assets.upwork.com/app.js') is None
+    # Upwork hosts are never blocked by host, even if listed
+    assert RequestFilter(block_hosts=['upwork.com']).decide('script', 'https://www.upwork.com/a.js') is None
+    # Allowlists win
+    debug = RequestFilter(allow_types=['image'], allow_hosts=['hotjar.com'])
+    assert debug.decide('image', 'https://www.upwork.com/logo.png') is None
+    assert debug.decide('script', 'https://static.hotjar.com/c/hotjar.js') is None
+
+
+def test_handle_counts():
+    f = RequestFilter()
+    routes = [_Route('image', 'https://cdn.upwork.com/a.png'), _Route('image', 'https://cdn.upwork.com/b.png'),
+              _Route('script', 'https://www.google-analytics.com/analytics.js'),
+              _Route('fetch', 'https://www.upwork.com/api/graphql/v1')]
+    for r in routes:
+        f.handle(r)
+    assert [r.outcome for r in routes] == ['blockedbyclient', 'blockedbyclient', 'blockedbyclient', 'continue']
+    s = f.summary()
+    assert s['requests_blocked'] == 3 and s['requests_allowed'] == 1
+    assert s['blocked_by_type'] == {'image': 2, 'script': 1}
+    assert s['blocked_by_host'] == {'google-analytics.com': 1}
+
+
+def test_from_env():
+    saved = {k: os.environ.get(k) for k in ('UPAI_BLOCK', 'UPAI_BLOCK_TYPES', 'UPAI_ALLOW_HOSTS')}
+    try:
+        os.environ['UPAI_BLOCK'] = '0'
+        assert RequestFilter.from_env() is None
+        os.environ['UPAI_BLOCK'] = '1'
+        os.environ['UPAI_BLOCK_TYPES'] = 'stylesheet'
+        os.environ['UPAI_ALLOW_HOSTS'] = 'hotjar.com'
+        f = RequestFilter.from_env(allow_types=['media'])
+        assert f.block_types == {'stylesheet'} and 'hotjar.com' in f.allow_hosts and f.allow_types == {'media'}
+        assert f.decide('image', 'https://www.upwork.com/logo.png') is None
+    finally:
+        for k, v in saved.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+
+
+if __name__ == '__main__':
+    test_decide()
+    test_handle_counts()
+    test_from_env()
+    print("✅ All request filter tests passed")
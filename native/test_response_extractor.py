@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tests for streaming job extraction from captured API responses
+"""
+
+import gzip
+import json
+import tempfile
+from pathlib import Path
+
+from response_extractor import ResponseExtractor, YieldTracker
+
+SEARCH_URL = 'https://www.upwork.com/api/graphql/v1?alias=userJobSearch'
+SEARCH_POST = '{"operationName": "userJobSearch"}'
+
+
+def _search(n):
+    hits = [{'id': f'{i}', 'title': f'Job {i}', 'description': f'Desc {i}',
+             'jobTile': {'job': {'ciphertext': f'~01ab{i}'}}} for i in range(n)]
+    return {'data': {'search': {'universalSearchNuxt': {'userJobSearchV1': {'results': hits}}}}}
+
+
+def test_jobs_ready_on_close_and_deduplicated():
+    ex = ResponseExtractor(queue_size=1)
+    for _ in range(3):
+        ex.submit(json.dumps(_search(4)), SEARCH_URL, SEARCH_POST)
+    ex.submit('not json at all', 'https://www.upwork.com/api/other')
+    jobs = ex.close()
+    assert [j['title'] for j in jobs] == ['Job 0', 'Job 1', 'Job 2', 'Job 3']
+    assert ex.responses == 4 and ex.batches == []
+    assert ex.close() is jobs
+
+
+def test_raw_bodies_in_compressed_batches():
+    with tempfile.TemporaryDirectory() as tmp:
+        raw = Path(tmp) / 'api_responses'
+        ex = ResponseExtractor(raw_dir=raw, batch_size=2)
+        for i in range(5):
+            ex.submit(json.dumps(_search(i + 1)), SEARCH_URL, SEARCH_POST)
+        assert len(ex.close()) == 5
+        assert [Path(p).name for p in ex.batches] == [
+            'responses-0001.jsonl.gz', 'responses-0002.jsonl.gz', 'responses-0003.jsonl.gz']
+        records = []
+        for p in ex.batches:
+            with gzip.open(p, 'rt', encoding='utf-8') as f:
+                records.extend(json.loads(line) for line in f)
+        assert len(records) == 5
+        assert records[0]['ops'] == ['userJobSearch'] and records[0]['url'] == SEARCH_URL
+        assert json.loads(records[4]['body']) == _search(5)
+
+
+def test_yield_tracker_stops_on_plateau_or_target():
+    ex = ResponseExtractor()
+    tracker = YieldTracker(ex, patience=2)
+    ex.submit(json.dumps(_search(3)), SEARCH_URL, SEARCH_POST)
+    assert tracker.record() is None
+    ex.submit(json.dumps(_search(3)), SEARCH_URL, SEARCH_POST)  # nothing new
+    assert tracker.record() is None
+    assert tracker.record() == 'plateau'
+    assert [(s['responses'], s['jobs'], s['total_jobs']) for s in tracker.steps] == [(1, 3, 3), (1, 0, 3), (0, 0, 3)]
+
+    tracker = YieldTracker(ex, target_jobs=5)
+    ex.submit(json.dumps(_search(6)), SEARCH_URL, SEARCH_POST)
+    assert tracker.record() == 'target'
+    ex.close()
+
+
+if __name__ == '__main__':
+    test_jobs_ready_on_close_and_deduplicated()
+    test_raw_bodies_in_compressed_batches()
+    test_yield_tracker_stops_on_plateau_or_target()
+    print("✅ All response extractor tests passed")
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tests for cursor-paged job results
+"""
+
+import tempfile
+from pathlib import Path
+
+from result_pages import ResultStore, decode_cursor, encode_cursor
+
+
+def _jobs(n):
+    return [{'title': f'Job {i}', 'url': f'https://www.upwork.com/jobs/~0{i}'} for i in range(n)]
+
+
+def test_pages_cover_every_job_once():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ResultStore(tmp)
+        jobs = _jobs(250)
+        page = store.first_page(jobs, 100)
+        seen = list(page['jobs'])
+        while page['next_cursor']:
+            page = store.page(page['next_cursor'], 100)
+            seen.extend(page['jobs'])
+        assert seen == jobs and page['total'] == 250
+
+
+def test_cursor_survives_a_new_process():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ResultStore(tmp)
+        first = store.first_page(_jobs(30), 10)
+        # Written after the reply; the host flushes before it exits
+        store.flush()
+        # A fresh store (new host process) reads the result back from disk
+        page = ResultStore(tmp).page(first['next_cursor'], 10)
+        assert [j['title'] for j in page['jobs']] == [f'Job {i}' for i in range(10, 20)]
+
+
+def test_connect_native_results_stay_in_memory():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ResultStore(Path(tmp) / 'results', persist=False)
+        first = store.first_page(_jobs(30), 10)
+        store.flush()
+        assert not (Path(tmp) / 'results').exists()
+        assert [j['title'] for j in store.page(first['next_cursor'], 10)['jobs']] == [f'Job {i}' for i in range(10, 20)]
+
+
+def test_small_results_need_no_cursor_and_bad_cursors_fail():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ResultStore(tmp)
+        assert store.first_page(_jobs(5), 10)['next_cursor'] is None
+        assert store.page('not-a-cursor', 10) is None
+        assert store.page(encode_cursor('deadbeef', 0), 10) is None
+        assert decode_cursor(encode_cursor('abc123', 42)) == ('abc123', 42)
+
+
+def test_final_fields_only_on_the_last_page():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ResultStore(tmp)
+        page = store.first_page(_jobs(25), 10, {'token': 'abc.7'})
+        tokens = [page.get('token')]
+        while page['next_cursor']:
+            page = store.page(page['next_cursor'], 10)
+            tokens.append(page.get('token'))
+        assert tokens == [None, None, 'abc.7']
+        assert store.first_page(_jobs(3), 10, {'token': 'abc.8'})['token'] == 'abc.8'
+
+
+if __name__ == "__main__":
+    test_pages_cover_every_job_once()
+    test_cursor_survives_a_new_process()
+    test_connect_native_results_stay_in_memory()
+    test_small_results_need_no_cursor_and_bad_cursors_fail()
+    test_final_fields_only_on_the_last_page()
+    print("✅ Result paging tests passed")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests for the cross-session seen-job filter
+"""
+
+import tempfile
+from pathlib import Path
+
+from seen_jobs import SeenJobs, bloom_params, canonical_job_id
+
+
+def _jobs(start, n):
+    return [{'title': f'Job {i}', 'url': f'https://www.upwork.com/jobs/~01{i:016x}'} for i in range(start, start + n)]
+
+
+def test_canonical_job_id():
+    assert canonical_job_id({'url': 'https://www.upwork.com/jobs/Scraper_~0123456789abcdef01/'}) == '0123456789abcdef01'
+    assert canonical_job_id({'url': 'https://www.upwork.com/job/_~0123456789abcdef01?src=x'}) == '0123456789abcdef01'
+    # Same job with and without a slug resolves to one ID
+    a = canonical_job_id({'url': 'https://www.upwork.com/jobs/~0123456789abcdef01', 'title': 'A'})
+    b = canonical_job_id({'url': 'https://www.upwork.com/jobs/Python-dev_~0123456789abcdef01', 'title': 'B'})
+    assert a == b
+    assert canonical_job_id({'id': '42', 'title': 'T'}) == 'id:42'
+    assert canonical_job_id({'title': 'T'}) == '|T'
+
+
+def test_only_new_jobs_across_sessions():
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / 'seen.bloom'
+        first = SeenJobs(path, capacity=1000)
+        assert len(first.filter_new(_jobs(0, 10))) == 10
+        first.close()
+        # A new process only gets the jobs it has not delivered before
+        second = SeenJobs(path, capacity=1000)
+        assert [j['title'] for j in second.filter_new(_jobs(5, 10))] == [f'Job {i}' for i in range(10, 15)]
+        assert second.filter_new(_jobs(0, 15)) == []
+        second.close()
+
+
+def test_false_positive_rate_and_constant_size():
+    k, m = bloom_params(2000, 0.01)
+    assert 9 * 2000 < m < 10 * 2000 and k == 7
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / 'seen.bloom'
+        seen = SeenJobs(path, capacity=2000, fp_rate=0.01)
+        seen.filter_new(_jobs(0, 2000))
+        false_pos = sum(1 for j in _jobs(10_000, 5000) if j in seen)
+        assert false_pos < 5000 * 0.03
+        seen.close()
+        assert path.stat().st_size == 32 + m // 8
+
+
+def test_rotation_keeps_recent_generation():
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / 'seen.bloom'
+        seen = SeenJobs(path, capacity=50)
+        seen.filter_new(_jobs(0, 50))
+        seen.filter_new(_jobs(50, 10))  # rotates
+        assert path.with_name('seen.bloom.1').exists()
+        assert seen.filter_new(_jobs(0, 60)) == []
+        seen.close()
+
+
+def test_only_delivered_jobs_are_marked():
+    import native_host
+    from result_pages import ResultStore
+
+    with tempfile.TemporaryDirectory() as d:
+        seen = SeenJobs(Path(d) / 'seen.bloom', capacity=1000)
+        assert len(seen.filter_new(_jobs(0, 10), mark=False)) == 10
+        seen.mark(_jobs(0, 4))
+        assert [j['title'] for j in seen.filter_new(_jobs(0, 10), mark=False)] == [f'Job {i}' for i in range(4, 10)]
+
+        # The host marks a page when it is sent, not when the result is built
+        saved = native_host._seen, native_host._results
+        native_host._seen = seen
+        native_host._results = ResultStore(Path(d) / 'results')
+        try:
+            first = native_host._page_response(_jobs(0, 10), {'new_only': True, 'page_size': 3})
+            assert [j['title'] for j in first['jobs']] == ['Job 4', 'Job 5', 'Job 6'] and first['skipped_seen'] == 4
+            assert len(seen.filter_new(_jobs(0, 10), mark=False)) == 3
+            page = native_host.process_message({'action': 'next_page', 'cursor': first['next_cursor'],
+                                                'new_only': True, 'page_size': 3})
+            assert [j['title'] for j in page['jobs']] == ['Job 7', 'Job 8', 'Job 9']
+            assert seen.filter_new(_jobs(0, 10), mark=False) == []
+        finally:
+            native_host._results.flush()
+            native_host._seen, native_host._results = saved
+            seen.close()
+
+
+if __name__ == "__main__":
+    test_canonical_job_id()
+    test_only_new_jobs_across_sessions()
+    test_false_positive_rate_and_constant_size()
+    test_rotation_keeps_recent_generation()
+    test_only_delivered_jobs_are_marked()
+    print("✅ Seen-job filter tests passed")
@@ -0,0 +1,13 @@
+"""
+Put native/ on sys.path so the scripts can import the helpers shared with
+the native hosts (job_record, seen_jobs, collector_client, ...):
+
+    import _native_path  # before any native/ import
+"""
+import sys
+from pathlib import Path
+
+NATIVE_DIR = Path(__file__).resolve().parents[1] / 'native'
+
+if str(NATIVE_DIR) not in sys.path:
+    sys.path.insert(0, str(NATIVE_DIR))
@@ -1,7 +1,6 @@
 import argparse
 import json
 import os
-import re
 import sys
 import time
 from datetime import datetime
@@ -10,19 +9,19 @@ from urllib.parse import urlparse
 
 from playwright.sync_api import sync_playwright
 
+import _native_path  # native/ on sys.path
+from request_filter import RequestFilter
+from response_extractor import ResponseExtractor, YieldTracker
+from seen_jobs import filter_new_jobs, mark_seen_jobs
+
 # ------------- Helpers -------------
 
 def ts():
     return datetime.now().strftime('%Y%m%d-%H%M%S')
 
 
-def safe_name(s: str) -> str:
-    s = re.sub(r'[^a-zA-Z0-9_.-]+', '_', s)
-    return s[:200]
-
-
 def write_text(path: Path, content: str):
-    path.parent.mkdir(parents=True, exist_ok=True)
+    # Directories are created once in run_collect
     path.write_text(content, encoding='utf-8')
 
 
@@ -30,128 +29,196 @@ def json_dumps(obj):
     return json.dumps(obj, ensure_ascii=False, indent=2)
 
 
-def extract_jobs_from_json_obj(obj):
-    jobs = []
-    def walk(n):
-        if n is None:
-            return
-        if isinstance(n, list):
-            for x in n:
-                walk(x)
+def wait_for_jobs(page, extractor, timeout_ms=5000, poll_ms=50):
+    """Wait until a new job-bearing response has been extracted; False on timeout."""
+    extractor.drain()
+    before, seen = extractor.job_responses, extractor.submitted
+    deadline = time.perf_counter() + timeout_ms / 1000
+    while time.perf_counter() < deadline:
+        # Short waits keep Playwright's event loop (and on_response) running
+        page.wait_for_timeout(poll_ms)
+        if extractor.submitted != seen:
+            seen = extractor.submitted
+            extractor.drain()
+            if extractor.job_responses > before:
+                return True
+    return False
+
+
+def settle(page, extractor, quiet_ms=500, max_ms=3000, poll_ms=50):
+    """Wait until no API response has been captured for `quiet_ms` (at most `max_ms`)."""
+    start = last_change = time.perf_counter()
+    seen = extractor.submitted
+    while (time.perf_counter() - last_change) * 1000 < quiet_ms and (time.perf_counter() - start) * 1000 < max_ms:
+        page.wait_for_timeout(poll_ms)
+        if extractor.submitted != seen:
+            seen, last_change = extractor.submitted, time.perf_counter()
+    extractor.drain()
+
+
+def adaptive_scroll(page, extractor, max_scrolls=3, patience=2, target_jobs=0, timeout_ms=5000):
+    """Scroll until yield plateaus, `target_jobs` is reached or `max_scrolls` are done.
+
+    Each scroll moves on as soon as the job response it triggered has been
+    extracted. Returns {'scrolls', 'stop', 'steps'} for the run summary.
+    """
+    tracker = YieldTracker(extractor, patience=patience, target_jobs=target_jobs)
+    stop = 'max_scrolls'
+    for i in range(max_scrolls):
+        start = time.perf_counter()
+        # Scroll aggressively to trigger lazy loading
+        page.mouse.wheel(0, 3000)
+        wait_for_jobs(page, extractor, timeout_ms)
+        reason = tracker.record(time.perf_counter() - start)
+        step = tracker.steps[-1]
+        print(f"[*] Scroll {i + 1}/{max_scrolls}: +{step['responses']} job responses, "
+              f"+{step['jobs']} jobs ({step['total_jobs']} total, {step['ms']} ms)")
+        if reason:
+            stop = reason
+            break
+    return {'scrolls': len(tracker.steps), 'stop': stop, 'steps': tracker.steps}
+
+
+# A job detail page is ready once its title or description has rendered
+DETAIL_READY_SELECTOR = 'h1, [data-test="Description"], [data-test="job-description-text"]'
+
+
+def fetch_job_details(context, links, pages_dir, concurrency=4, ready_selector=DETAIL_READY_SELECTOR,
+                      timeout_ms=15000, screenshots=True):
+    """Save the HTML (and screenshot) of each job detail page using a pool of reused pages.
+
+    Up to `concurrency` navigations are in flight at once: each pool page is
+    sent to its next link as soon as the previous one has been captured, and
+    the browser loads them in parallel while we wait on the oldest. A page is
+    captured when `ready_selector` is visible (or after `timeout_ms`).
+    Returns one timing record per link, in link order.
+    """
+    pool = [context.new_page() for _ in range(max(1, min(int(concurrency), len(links))))]
+    todo = list(enumerate(links, start=1))
+    in_flight = []  # (page, idx, url, start), oldest first
+    timings = []
+
+    def start_next(pg):
+        while todo:
+            idx, url = todo.pop(0)
+            start = time.perf_counter()
+            try:
+                # Returns once the navigation commits; the page keeps loading in the background
+                pg.goto(url, wait_until='commit', timeout=timeout_ms)
+            except Exception as e:
+                print(f'[!] Job detail error ({url}): {e}')
+                timings.append({'index': idx, 'url': url, 'ms': round((time.perf_counter() - start) * 1000),
+                                'ready': False, 'error': str(e)})
+                continue
+            in_flight.append((pg, idx, url, start))
             return
-        if isinstance(n, dict):
-            title = n.get('title') or n.get('jobTitle')
-            desc = n.get('description') or n.get('snippet') or n.get('jobDescription')
-            if title and desc:
-                jobs.append({
-                    'title': str(title),
-                    'description': str(desc),
-                    'skills': n.get('skills') or n.get('requiredSkills') or [],
-                    'budget': n.get('budget') or n.get('pay') or n.get('price') or '',
-                    'url': n.get('url') or n.get('jobUrl') or n.get('link') or ''
-                })
-            for v in n.values():
-                walk(v)
-    walk(obj)
-    return jobs
+
+    for pg in pool:
+        start_next(pg)
+    while in_flight:
+        pg, idx, url, start = in_flight.pop(0)
+        record = {'index': idx, 'url': url, 'ready': True}
+        try:
+            try:
+                pg.wait_for_selector(ready_selector, state='visible', timeout=timeout_ms)
+            except Exception:
+                record['ready'] = False
+            record['ms'] = round((time.perf_counter() - start) * 1000)
+            write_text(pages_dir / f'job_detail_{idx}.html', pg.content())
+            if screenshots:
+                pg.screenshot(path=str(pages_dir / f'job_detail_{idx}.png'), full_page=True)
+        except Exception as e:
+            print(f'[!] Job detail error ({url}): {e}')
+            record.update(ready=False, error=str(e), ms=round((time.perf_counter() - start) * 1000))
+        timings.append(record)
+        print(f"[+] Detail {idx}/{len(links)}: {record['ms']} ms{'' if record['ready'] else ' (not ready)'}")
+        start_next(pg)
+
+    for pg in pool:
+        try:
+            pg.close()
+        except Exception:
+            pass
+    return sorted(timings, key=lambda t: t['index'])
 
 
 # ------------- Main collector -------------
 
-def run_collect(args):
-    out_dir = Path(args.out or f'scripts/data/session-{ts()}').resolve()
-    out_dir.mkdir(parents=True, exist_ok=True)
+FIND_WORK_URL = 'https://www.upwork.com/nx/find-work/'
 
-    har_path = out_dir / 'session.har'
+
+def crawl(context, args, out_dir, start_url=None, pause=False):
+    """Collect jobs and list/detail snapshots with an open browser context.
+
+    Opens `start_url` first if given (and waits for Enter with `pause`),
+    scrolls, visits detail pages and writes jobs-extracted.json. The
+    context is left open, with this run's route and listeners removed, so a
+    long-lived caller (scripts/collector_daemon.py) can reuse it.
+    Returns (jobs, summary).
+    """
     api_dir = out_dir / 'api_responses'
     pages_dir = out_dir / 'pages'
+    pages_dir.mkdir(parents=True, exist_ok=True)
 
-    all_json_paths = []
+    # Jobs are extracted on a worker thread as responses arrive; raw bodies
+    # are only kept with --save-responses (gzip JSON-lines batches)
+    extractor = ResponseExtractor(raw_dir=api_dir if args.save_responses else None)
+    # Images, fonts, media and trackers are aborted (see native/request_filter.py)
+    req_filter = None if args.no_block else RequestFilter.from_env(args.allow_type or (), args.allow_host or ())
 
-    with sync_playwright() as p:
-        browser = None
-        context = None
+    # Response capture (for attach mode and general JSON harvesting)
+    def on_response(resp):
+        try:
+            url = resp.url
+            ctype = (resp.headers.get('content-type') or '').lower()
+            
+            # Focus on Upwork-specific API endpoints
+            is_relevant = any([
+                'graphql' in url.lower(),
+                '/api/' in url,
+                '/search/' in url,
+                '/jobs/' in url,
+                'talent-search' in url,
+                'job-details' in url,
+                'ab/find-work' in url
+            ])
+            
+            if 'json' in ctype and is_relevant:
+                text = resp.text()
+                if text and len(text) > 100:  # Skip tiny responses
+                    extractor.submit(text, url, resp.request.post_data)
+                    print(f'[+] Captured: {urlparse(url).path[:50]}...')
+        except Exception:
+            pass
 
-        if args.mode == 'attach':
-            if not args.cdp:
-                print('ERROR: --cdp ws/http endpoint is required for attach mode. Example: http://localhost:9222')
-                sys.exit(1)
-            browser = p.chromium.connect_over_cdp(args.cdp)
-            # Create a separate context for navigation if needed
-            context = browser.contexts[0] if browser.contexts else browser.new_context()
-            print('[*] Connected to existing Chrome via CDP')
-        else:
-            browser = p.chromium.launch(headless=args.headless == 'true')
-            context = browser.new_context(
-                record_har_path=str(har_path),
-                record_har_omit_content=False,
-                ignore_https_errors=True,
-            )
-            page = context.new_page()
-            page.goto('https://www.upwork.com/nx/find-work/', wait_until='domcontentloaded')
+    if req_filter is not None:
+        context.route('**/*', req_filter.handle)
+        context.on('response', req_filter.on_response)
+    context.on('response', on_response)
+    scroll_stats = None
+    detail_timings = []
+    try:
+        page = context.pages[0] if context.pages else context.new_page()
+        if start_url:
+            page.goto(start_url, wait_until='domcontentloaded')
             print('[*] Opened Find Work. Please log in if required.')
-            if not args.no_pause:
+            if pause:
                 input('    Press Enter after you are logged in and the feed is visible...')
 
-        page = context.pages[0] if context.pages else context.new_page()
-
-        # Response capture (for attach mode and general JSON harvesting)
-        def on_response(resp):
-            try:
-                url = resp.url
-                ctype = (resp.headers.get('content-type') or '').lower()
-                
-                # Focus on Upwork-specific API endpoints
-                is_relevant = any([
-                    'graphql' in url.lower(),
-                    '/api/' in url,
-                    '/search/' in url,
-                    '/jobs/' in url,
-                    'talent-search' in url,
-                    'job-details' in url,
-                    'ab/find-work' in url
-                ])
-                
-                if 'json' in ctype and is_relevant:
-                    text = resp.text()
-                    if text and len(text) > 100:  # Skip tiny responses
-                        parsed = urlparse(url)
-                        fname = safe_name(f"api_{ts()}_{parsed.path.replace('/', '_')}")
-                        fpath = api_dir / f'{fname}.json'
-                        write_text(fpath, text)
-                        all_json_paths.append(str(fpath))
-                        print(f'[+] Captured: {parsed.path[:50]}...')
-            except Exception:
-                pass
-        context.on('response', on_response)
-
-        # --- Scroll Find Work with Smart Waiting ---
+        # --- Scroll Find Work until new jobs stop coming ---
         try:
             print('[*] Waiting for job tiles to load...')
             # Wait for job tiles to appear (the main job cards on the page)
             page.wait_for_selector('[data-test="job-tile"], [data-qa="job-tile"], article', 
                                    state='visible', timeout=20000)
             print('[*] Job tiles found. Starting to scroll...')
-            
-            # Initial wait for network to settle
-            page.wait_for_load_state('networkidle', timeout=10000)
-            
-            for i in range(int(args.list_scroll)):
-                print(f'[*] Scrolling... ({i + 1}/{args.list_scroll})')
-                # Scroll more aggressively to trigger lazy loading
-                page.mouse.wheel(0, 3000)
-                # Wait for network activity to complete after each scroll
-                try:
-                    page.wait_for_load_state('networkidle', timeout=5000)
-                except:
-                    pass  # Don't fail if network doesn't settle, just continue
-                # Additional wait for content to render
-                page.wait_for_timeout(1500)
-            
-            print('[*] Final wait for all data to load...')
-            # Final network idle wait to ensure all API calls are complete
-            page.wait_for_load_state('networkidle', timeout=10000)
-            
+            # The first page of results usually arrives with the tiles
+            settle(page, extractor)
+            scroll_stats = adaptive_scroll(page, extractor, max_scrolls=int(args.list_scroll),
+                                           patience=args.scroll_patience, target_jobs=args.target_jobs,
+                                           timeout_ms=args.scroll_timeout)
+            print(f"[*] Stopped scrolling ({scroll_stats['stop']}); waiting for late responses...")
+            settle(page, extractor)
         except Exception as e:
             print(f'[!] Scroll or wait error: {e}. Continuing anyway...')
 
@@ -179,65 +246,106 @@ def run_collect(args):
         except Exception:
             pass
 
-        # Visit a few job detail pages
-        for idx, url in enumerate(links, start=1):
-            try:
-                p2 = context.new_page()
-                p2.goto(url, wait_until='domcontentloaded')
-                p2.wait_for_timeout(1200)
-                write_text(pages_dir / f'job_detail_{idx}.html', p2.content())
-                p2.screenshot(path=str(pages_dir / f'job_detail_{idx}.png'), full_page=True)
-                p2.close()
-            except Exception as e:
-                print('[!] Job detail error:', e)
-
-        # Close & flush HAR
-        if args.mode != 'attach':
-            context.close()
-            browser.close()
-
-    # Build jobs-extracted.json from captured JSON files
-    jobs = []
-    for f in all_json_paths:
-        try:
-            data = json.loads(Path(f).read_text(encoding='utf-8'))
-            jobs.extend(extract_jobs_from_json_obj(data))
-        except Exception:
-            pass
-
-    # Deduplicate
-    seen = set()
-    dedup = []
-    for j in jobs:
-        key = f"{j.get('url','')}|{j.get('title','')}"
-        if key not in seen and (j.get('title') or j.get('description')):
-            seen.add(key)
-            dedup.append(j)
-
-    write_text(out_dir / 'jobs-extracted.json', json_dumps(dedup[:200]))
+        # Visit the job detail pages, several at a time
+        if links:
+            started = time.perf_counter()
+            detail_timings = fetch_job_details(context, links, pages_dir, concurrency=args.detail_concurrency,
+                                               ready_selector=args.detail_ready, timeout_ms=args.detail_timeout,
+                                               screenshots=not args.no_detail_screenshots)
+            print(f'[*] {len(links)} detail pages in {time.perf_counter() - started:.1f}s '
+                  f'(concurrency {args.detail_concurrency})')
+    finally:
+        # Leave the context (the user's browser in attach mode) as we found it
+        context.remove_listener('response', on_response)
+        if req_filter is not None:
+            context.remove_listener('response', req_filter.on_response)
+            context.unroute('**/*', req_filter.handle)
+
+    # Already extracted and de-duplicated while the crawl ran
+    dedup = extractor.close()
+    if args.new_only:
+        # Drop jobs already delivered by an earlier run (persistent, see native/seen_jobs.py)
+        dedup = filter_new_jobs(dedup, mark=False)
+    dedup = dedup[:200]
+    if args.new_only:
+        # Only the jobs written out count as delivered
+        mark_seen_jobs(dedup)
+
+    write_text(out_dir / 'jobs-extracted.json', json_dumps(dedup))
 
     summary = {
         'out_dir': str(out_dir),
-        'har': str(har_path) if har_path.exists() else None,
-        'api_responses_dir': str(api_dir),
+        'api_responses_dir': str(api_dir) if extractor.batches else None,
         'pages_dir': str(pages_dir),
-        'jobs_extracted_count': len(dedup[:200]),
-        'json_files_captured': len(all_json_paths)
+        'jobs_extracted_count': len(dedup),
+        'json_files_captured': extractor.responses,
+        'raw_batches': len(extractor.batches),
+        'scroll': scroll_stats,
+        'detail_pages': detail_timings,
+        'request_filter': req_filter.summary() if req_filter is not None else None
     }
+    return dedup, summary
+
+
+def run_collect(args):
+    out_dir = Path(args.out or f'scripts/data/session-{ts()}').resolve()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    har_path = out_dir / 'session.har'
+
+    with sync_playwright() as p:
+        if args.mode == 'attach':
+            if not args.cdp:
+                print('ERROR: --cdp ws/http endpoint is required for attach mode. Example: http://localhost:9222')
+                sys.exit(1)
+            browser = p.chromium.connect_over_cdp(args.cdp)
+            # Create a separate context for navigation if needed
+            context = browser.contexts[0] if browser.contexts else browser.new_context()
+            print('[*] Connected to existing Chrome via CDP')
+            _, summary = crawl(context, args, out_dir)
+        else:
+            browser = p.chromium.launch(headless=args.headless == 'true')
+            context = browser.new_context(
+                record_har_path=str(har_path),
+                record_har_omit_content=False,
+                ignore_https_errors=True,
+            )
+            _, summary = crawl(context, args, out_dir, start_url=FIND_WORK_URL, pause=not args.no_pause)
+            # Close & flush HAR
+            context.close()
+            browser.close()
+
+    summary = {'out_dir': summary.pop('out_dir'), 'har': str(har_path) if har_path.exists() else None, **summary}
     write_text(out_dir / 'summary.json', json_dumps(summary))
     print('\n[OK] Done. Summary:', summary)
 
 
-if __name__ == '__main__':
+def build_parser():
     parser = argparse.ArgumentParser(description='Collect Upwork data (HAR, JSON API, list & details) for AI ranking/calibration.')
     parser.add_argument('--mode', choices=['fresh', 'attach'], default='fresh', help='fresh launches Chromium & records HAR, attach connects via CDP')
     parser.add_argument('--cdp', help='CDP endpoint for attach mode, e.g., http://localhost:9222')
     parser.add_argument('--out', help='Output directory (default: scripts/data/session-<ts>)')
-    parser.add_argument('--list-scroll', default='3', help='Number of scroll steps on Find Work')
+    parser.add_argument('--list-scroll', default='3', help='Max scroll steps on Find Work')
+    parser.add_argument('--target-jobs', type=int, default=0, help='Stop scrolling once this many jobs are in (0 = no target)')
+    parser.add_argument('--scroll-patience', type=int, default=2,
+                        help='Stop after this many scrolls in a row without new jobs')
+    parser.add_argument('--scroll-timeout', type=int, default=5000, help='Max ms to wait for the jobs a scroll triggers')
     parser.add_argument('--details', default='5', help='How many job detail pages to open')
+    parser.add_argument('--detail-concurrency', type=int, default=4, help='Job detail pages loaded at once')
+    parser.add_argument('--detail-ready', default=DETAIL_READY_SELECTOR,
+                        help='CSS selector that marks a detail page as loaded')
+    parser.add_argument('--detail-timeout', type=int, default=15000, help='Max ms to wait for a detail page')
+    parser.add_argument('--no-detail-screenshots', action='store_true', help='Save detail page HTML only')
+    parser.add_argument('--no-block', action='store_true', help='Load images, fonts, media and trackers too')
+    parser.add_argument('--allow-type', action='append', help='Resource type never to block (repeatable)')
+    parser.add_argument('--allow-host', action='append', help='Host never to block (repeatable)')
     parser.add_argument('--headless', choices=['true','false'], default='false')
     parser.add_argument('--no-pause', action='store_true', help='Do not pause for manual login in fresh mode')
+    parser.add_argument('--new-only', action='store_true', help='Only output jobs not collected by an earlier run')
+    parser.add_argument('--save-responses', action='store_true',
+                        help='Keep raw API bodies as gzip JSON-lines batches in api_responses/')
+    return parser
 
-    args = parser.parse_args()
-    run_collect(args)
+
+if __name__ == '__main__':
+    run_collect(build_parser().parse_args())
 
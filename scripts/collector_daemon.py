@@ -0,0 +1,224 @@
+"""
+Long-lived collector daemon: one warm Chromium shared by every collect run.
+
+Usage:
+    python scripts/collector_daemon.py [--port 0] [--idle 1800] [--headless true|false] [--login]
+
+The native hosts submit collect jobs here (native/collector_client.py)
+instead of starting collect_upwork_data.py each time, so the interpreter,
+Playwright and the browser start once. The logged-in state (cookies, local
+storage) is saved after every run and restored on the next start; run once
+with --login to sign in by hand (always in a visible window).
+
+The browser starts headless unless --headless false is given. Each job's
+own --headless argument wins: on a mismatch the browser is relaunched in
+the requested mode, keeping the saved login.
+
+Jobs run one at a time on the main thread (Playwright's sync API is not
+thread-safe); a small TCP server on 127.0.0.1 queues them. The daemon
+advertises {pid, host, port, token} in native/logs/collector_daemon.json
+(UPAI_DAEMON_FILE) and exits after --idle seconds without a job.
+
+Settings (env):
+    UPAI_DAEMON_FILE=<file>        default native/logs/collector_daemon.json
+    UPAI_DAEMON_STATE=<file>       browser storage state, default native/logs/collector_storage_state.json
+"""
+import argparse
+import json
+import os
+import queue
+import secrets
+import socketserver
+import sys
+import threading
+import time
+import traceback
+from pathlib import Path
+
+from playwright.sync_api import sync_playwright
+
+import _native_path  # native/ on sys.path
+from collect_upwork_data import FIND_WORK_URL, build_parser, crawl
+from collector_client import daemon_file
+from framing import read_frame, write_frames
+
+NATIVE_LOGS = Path(__file__).resolve().parents[1] / 'native' / 'logs'
+DEFAULT_STATE_FILE = NATIVE_LOGS / 'collector_storage_state.json'
+
+_STOP = object()
+
+
+def state_file():
+    return Path(os.environ.get('UPAI_DAEMON_STATE') or DEFAULT_STATE_FILE)
+
+
+def write_json_atomic(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    tmp.write_text(json.dumps(data), encoding='utf-8')
+    os.replace(tmp, path)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """One framed request per connection; collect jobs wait for the browser thread."""
+
+    def handle(self):
+        body = read_frame(self.rfile)
+        if body is None:
+            return
+        try:
+            message = json.loads(body.decode('utf-8'))
+        except ValueError:
+            return
+        if not secrets.compare_digest(str(message.get('token', '')), self.server.token):
+            reply = {'ok': False, 'error': 'bad token'}
+        elif message.get('action') == 'ping':
+            reply = {'ok': True, 'action': 'pong', 'pid': os.getpid(), 'queued': self.server.jobs.qsize()}
+        elif message.get('action') == 'shutdown':
+            self.server.jobs.put(_STOP)
+            reply = {'ok': True, 'action': 'stopping'}
+        elif message.get('action') == 'collect':
+            done = queue.Queue(maxsize=1)
+            self.server.jobs.put((message.get('argv') or [], done))
+            reply = done.get()
+        else:
+            reply = {'ok': False, 'error': f"Unknown action: {message.get('action')}"}
+        write_frames(self.wfile, reply, ensure_ascii=False)
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class BrowserSession:
+    """A launched Chromium and one context, restarted if the window was closed."""
+
+    def __init__(self, playwright, headless):
+        self.playwright = playwright
+        self.headless = headless
+        self.browser = None
+        self.context = None
+
+    def ensure(self, headless=None):
+        if headless is not None and headless != self.headless:
+            print(f"[*] Relaunching the browser {'headless' if headless else 'with a window'}")
+            self.close()
+            self.headless = headless
+            self.browser = self.context = None
+        if self.browser is None or not self.browser.is_connected():
+            self.browser = self.playwright.chromium.launch(headless=self.headless)
+            self.context = None
+        if self.context is None:
+            path = state_file()
+            self.context = self.browser.new_context(
+                storage_state=str(path) if path.exists() else None,
+                ignore_https_errors=True,
+            )
+        return self.context
+
+    def save_state(self):
+        if self.context is not None:
+            try:
+                state_file().parent.mkdir(parents=True, exist_ok=True)
+                self.context.storage_state(path=str(state_file()))
+            except Exception as e:
+                print(f'[!] Could not save storage state: {e}')
+
+    def reset(self):
+        """Drop the context after a failed run; the next job starts a clean one."""
+        try:
+            if self.context is not None:
+                self.context.close()
+        except Exception:
+            pass
+        self.context = None
+
+    def close(self):
+        self.save_state()
+        try:
+            if self.browser is not None:
+                self.browser.close()
+        except Exception:
+            pass
+
+
+def run_job(session, argv):
+    args = build_parser().parse_args(argv)
+    out_dir = Path(args.out or f'scripts/data/session-{time.strftime("%Y%m%d-%H%M%S")}').resolve()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    context = session.ensure(headless=args.headless == 'true')
+    # Close pages left over from the previous run; crawl opens what it needs
+    for page in context.pages[1:]:
+        page.close()
+    started = time.perf_counter()
+    jobs, summary = crawl(context, args, out_dir, start_url=FIND_WORK_URL)
+    summary['daemon_run_seconds'] = round(time.perf_counter() - started, 2)
+    (out_dir / 'summary.json').write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding='utf-8')
+    session.save_state()
+    return {'ok': True, 'jobs': jobs, 'out_dir': str(out_dir), 'summary': summary}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Keep a warm browser for collect jobs from the native hosts.')
+    parser.add_argument('--port', type=int, default=0, help='TCP port on 127.0.0.1 (0 = any free port)')
+    parser.add_argument('--idle', type=float, default=1800, help='Exit after this many seconds without a job')
+    parser.add_argument('--headless', choices=['true', 'false'], default='true')
+    parser.add_argument('--login', action='store_true', help='Open Find Work and wait for Enter to save the login')
+    args = parser.parse_args()
+
+    server = _Server(('127.0.0.1', args.port), _Handler)
+    server.token = secrets.token_hex(16)
+    server.jobs = queue.Queue()
+    info_path = daemon_file()
+    threading.Thread(target=server.serve_forever, name='daemon-socket', daemon=True).start()
+    write_json_atomic(info_path, {'pid': os.getpid(), 'host': '127.0.0.1',
+                                  'port': server.server_address[1], 'token': server.token})
+    print(f'[*] Collector daemon listening on 127.0.0.1:{server.server_address[1]} (pid {os.getpid()})')
+
+    try:
+        with sync_playwright() as p:
+            # Signing in needs a window
+            session = BrowserSession(p, headless=args.headless == 'true' and not args.login)
+            session.ensure()
+            if args.login:
+                session.context.new_page().goto(FIND_WORK_URL, wait_until='domcontentloaded')
+                input('    Press Enter after you are logged in and the feed is visible...')
+                session.save_state()
+            while True:
+                try:
+                    item = server.jobs.get(timeout=args.idle)
+                except queue.Empty:
+                    print('[*] Idle timeout, exiting')
+                    break
+                if item is _STOP:
+                    break
+                argv, done = item
+                try:
+                    reply = run_job(session, argv)
+                except Exception as e:
+                    traceback.print_exc()
+                    session.reset()
+                    reply = {'ok': False, 'error': f'Collector failed: {e}'}
+                done.put(reply)
+            session.close()
+    finally:
+        server.shutdown()
+        # Only remove the advertisement if it is still ours
+        try:
+            if json.loads(info_path.read_text(encoding='utf-8')).get('pid') == os.getpid():
+                info_path.unlink()
+        except (OSError, ValueError):
+            pass
+        # Jobs that arrived while shutting down get an answer instead of hanging
+        while True:
+            try:
+                item = server.jobs.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                item[1].put({'ok': False, 'error': 'Collector daemon stopped'})
+
+
+if __name__ == '__main__':
+    sys.exit(main())
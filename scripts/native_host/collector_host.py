@@ -13,6 +13,11 @@ ROOT = Path(__file__).resolve().parents[2]  # project root
 PYTHON = sys.executable  # current python
 COLLECT_SCRIPT = ROOT / 'scripts' / 'collect_upwork_data.py'
 
+# scripts/_native_path puts native/ on sys.path
+sys.path.insert(0, str(ROOT / 'scripts'))
+import _native_path
+from collector_client import submit_collect
+
 
 def send_message(msg):
     encoded = json.dumps(msg).encode('utf-8')
@@ -32,7 +37,11 @@ def get_message():
 
 def run_collector(options):
     out_dir = options.get('out') or str(ROOT / 'scripts' / 'data' / 'session-native')
-    args = [PYTHON, str(COLLECT_SCRIPT), '--mode', options.get('mode', 'attach'), '--list-scroll', str(options.get('list_scroll', 3)), '--details', str(options.get('details', 5)), '--out', out_dir, '--headless', 'false', '--no-pause']
+    # Reuse the warm browser of a running collector daemon when there is one
+    reply = submit_collect(dict(options, mode=options.get('mode', 'attach')), out_dir)
+    if reply is not None:
+        return reply
+    args = [PYTHON, str(COLLECT_SCRIPT), '--mode', options.get('mode', 'attach'), '--list-scroll', str(options.get('list_scroll', 3)), '--details', str(options.get('details', 5)), '--out', out_dir, '--headless', 'true' if options.get('headless') else 'false', '--no-pause']
     try:
         subprocess.run(args, check=True)
     except subprocess.CalledProcessError as e:
@@ -12,6 +12,9 @@ from typing import List, Dict, Optional
 import logging
 from datetime import datetime
 
+import _native_path  # native/ on sys.path
+from job_record import intern_skills
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
@@ -175,7 +178,7 @@ class UpworkGraphQLScraper:
                     job['budget']['amount'] = (job['budget']['min'] + job['budget']['max']) / 2
             
             # Beceriler
-            job['skills'] = [skill.get('name', '') for skill in node.get('skills', [])]
+            job['skills'] = intern_skills(skill.get('name', '') for skill in node.get('skills', []))
             
             # İş detayları
             job['duration'] = node.get('duration', '')
@@ -289,7 +292,7 @@ class UpworkDirectAPIScraper:
                 'title': data.get('title', ''),
                 'description': data.get('description', ''),
                 'url': data.get('url', ''),
-                'skills': data.get('skills', []),
+                'skills': intern_skills(data.get('skills', [])),
                 'budget': {
                     'amount': data.get('amount', {}).get('amount', 0),
                     'currency': data.get('amount', {}).get('currencyCode', 'USD')
@@ -322,7 +325,7 @@ def prepare_for_extension(jobs: List[Dict]) -> List[Dict]:
             'title': job.get('title', ''),
             'description': job.get('description', ''),
             'url': job.get('url', ''),
-            'skills': job.get('skills', []),
+            'skills': intern_skills(job.get('skills', [])),
             'budget': str(job.get('budget', {}).get('amount', 0)) if job.get('budget') else '0',
             'currency': job.get('budget', {}).get('currency', 'USD'),
             'duration': job.get('duration', ''),
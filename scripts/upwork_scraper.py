@@ -16,6 +16,9 @@ from datetime import datetime
 from typing import List, Dict, Optional
 import logging
 
+import _native_path  # native/ on sys.path
+from job_record import intern_skills
+
 # Logging ayarları
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -79,7 +82,7 @@ class UpworkRSSScraper:
             # Becerileri çıkar
             skills = []
             if hasattr(entry, 'tags'):
-                skills = [tag.term for tag in entry.tags]
+                skills = intern_skills(tag.term for tag in entry.tags)
             
             # Bütçe bilgisini çıkar
             budget = self._extract_budget(description)
@@ -269,7 +272,7 @@ class UpworkWebScraper:
             skill_elems = card.find_all('span', {'data-test': 'skill'}) or card.find_all('a', class_=re.compile('skill'))
             for skill_elem in skill_elems:
                 skills.append(skill_elem.get_text(strip=True))
-            job['skills'] = skills
+            job['skills'] = intern_skills(skills)
             
             # Zaman
             time_elem = card.find('span', {'data-test': 'posted-time'}) or card.find('time')
@@ -664,23 +664,89 @@ async function handleGetCollectedJobs(sendResponse) {
   }
 }
 
+// Reply encodings we can decode; large replies then arrive compressed (native/framing.py)
+const NATIVE_ACCEPT_ENCODING = typeof DecompressionStream !== 'undefined' ? ['gzip', 'deflate'] : [];
+
+// Inflate a { type: 'encoded', encoding, data } envelope; other replies pass through
+async function decodeNativeReply(reply) {
+  if (!reply || reply.type !== 'encoded') return reply;
+  const bytes = Uint8Array.from(atob(reply.data), (c) => c.charCodeAt(0));
+  const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream(reply.encoding));
+  return JSON.parse(await new Response(stream).text());
+}
+
+// Send one request to the native host over a port and resolve with its reply.
+// Replies over Chrome's 1 MB limit arrive as chunk frames (native/framing.py),
+// which sendNativeMessage cannot deliver, so they are reassembled here.
+function nativeRequest(message) {
+  return new Promise((resolve, reject) => {
+    const port = chrome.runtime.connectNative('com.upwork.ai.collector');
+    const parts = [];
+    let received = 0;
+    let done = false;
+    const finish = (fn, value) => {
+      if (done) return;
+      done = true;
+      fn(value);
+      try { port.disconnect(); } catch (e) { /* already closed */ }
+    };
+    const deliver = (reply) => {
+      decodeNativeReply(reply).then((value) => finish(resolve, value), (e) => finish(reject, e));
+    };
+    port.onMessage.addListener((frame) => {
+      if (!frame || frame.type !== 'chunk') {
+        deliver(frame);
+        return;
+      }
+      if (parts[frame.chunk] === undefined) {
+        parts[frame.chunk] = frame.data || '';
+        received++;
+      }
+      if (received === frame.total) {
+        try {
+          deliver(JSON.parse(parts.join('')));
+        } catch (e) {
+          finish(reject, e);
+        }
+      }
+    });
+    port.onDisconnect.addListener(() => {
+      const err = chrome.runtime.lastError;
+      finish(reject, new Error(err ? err.message : 'Native host disconnected before replying'));
+    });
+    port.postMessage(NATIVE_ACCEPT_ENCODING.length ? { ...message, accept_encoding: NATIVE_ACCEPT_ENCODING } : message);
+  });
+}
+
 // Native Messaging: trigger local Python collector and receive jobs
 async function handleRunCollectorNative(request, sendResponse) {
   try {
     const options = request.options || { mode: 'attach', list_scroll: 3, details: 5 };
-    chrome.runtime.sendNativeMessage('com.upwork.ai.collector', options, (response) => {
-      if (chrome.runtime.lastError) {
-        console.error('Native host error:', chrome.runtime.lastError.message);
-        sendResponse({ success: false, error: chrome.runtime.lastError.message });
-        return;
+    let response;
+    try {
+      response = await nativeRequest(options);
+      // Large results come one page at a time (native/result_pages.py); each
+      // request starts a new host, which reads the stored result back by cursor
+      const jobs = [...(response?.jobs || [])];
+      let page = response;
+      while (page?.ok && page.next_cursor) {
+        page = await nativeRequest({ action: 'next_page', cursor: page.next_cursor, new_only: options.new_only });
+        jobs.push(...(page?.jobs || []));
       }
-      // response expected: { ok: true, jobs: [...] }
-      if (response?.ok) {
-        sendResponse({ success: true, jobs: response.jobs || [], outDir: response.out_dir });
-      } else {
-        sendResponse({ success: false, error: response?.error || 'Unknown native host error' });
+      if (page !== response) {
+        response = page?.ok ? { ...response, jobs } : page;
       }
-    });
+    } catch (error) {
+      console.error('Native host error:', error.message);
+      sendResponse({ success: false, error: error.message });
+      return;
+    }
+    // response expected: { ok: true, jobs: [...] }
+    if (response?.ok) {
+      sendResponse({ success: true, jobs: response.jobs || [], outDir: response.out_dir });
+    } else {
+      sendResponse({ success: false, error: response?.error || 'Unknown native host error' });
+    }
   } catch (error) {
     console.error('handleRunCollectorNative error:', error);
     sendResponse({ success: false, error: error.message });
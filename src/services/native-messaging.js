@@ -3,6 +3,9 @@
  * Handles communication with the Python native host
  */
 
+// Reply encodings we can decode; advertised on every request (see native/framing.py)
+const ACCEPT_ENCODING = typeof DecompressionStream !== 'undefined' ? ['gzip', 'deflate'] : [];
+
 class NativeMessagingService {
   constructor() {
     this.hostName = 'com.upwork.ai.collector';
@@ -11,6 +14,8 @@ class NativeMessagingService {
     this.messageQueue = [];
     this.responseHandlers = new Map();
     this.messageId = 0;
+    // Partially received chunked replies, keyed by stream id (see native/framing.py)
+    this.chunkStreams = new Map();
   }
 
   /**
@@ -64,6 +69,9 @@ class NativeMessagingService {
     return new Promise((resolve, reject) => {
       const id = ++this.messageId;
       message.id = id;
+      if (ACCEPT_ENCODING.length) {
+        message.accept_encoding = ACCEPT_ENCODING;
+      }
 
       // Store the response handler
       this.responseHandlers.set(id, { resolve, reject });
@@ -102,6 +110,24 @@ class NativeMessagingService {
    * Handle incoming message from native host
    */
   handleMessage(message) {
+    message = this.assembleChunk(message);
+    if (!message) {
+      return; // waiting for more chunks
+    }
+    if (message.type === 'encoded') {
+      console.log(`Decoding ${message.encoding} reply: ${message.compressed_size} -> ${message.original_size} bytes`);
+      this.decodeEnvelope(message)
+        .then((reply) => this.handleMessage(reply))
+        .catch((error) => {
+          console.error('Failed to decode native host reply:', error);
+          const handler = this.responseHandlers.get(message.id);
+          if (handler) {
+            this.responseHandlers.delete(message.id);
+            handler.reject(error);
+          }
+        });
+      return;
+    }
     console.log('Received message from native host:', message);
     
     const id = message.id;
@@ -115,6 +141,49 @@ class NativeMessagingService {
     }
   }
 
+  /**
+   * Rebuild replies the host split into chunk frames to stay under Chrome's
+   * 1 MB limit. Plain messages are returned as-is; returns null until every
+   * chunk of a stream has arrived.
+   */
+  assembleChunk(message) {
+    if (!message || message.type !== 'chunk' || !message.stream) {
+      return message;
+    }
+    let stream = this.chunkStreams.get(message.stream);
+    if (!stream) {
+      stream = { parts: new Array(message.total), received: 0 };
+      this.chunkStreams.set(message.stream, stream);
+    }
+    if (stream.parts[message.chunk] === undefined) {
+      stream.parts[message.chunk] = message.data || '';
+      stream.received++;
+    }
+    if (stream.received < message.total) {
+      return null;
+    }
+    this.chunkStreams.delete(message.stream);
+    const full = JSON.parse(stream.parts.join(''));
+    if (full && full.id === undefined && message.id !== undefined && message.id !== null) {
+      full.id = message.id;
+    }
+    return full;
+  }
+
+  /**
+   * Inflate a compressed reply envelope ({ type: 'encoded', encoding, data })
+   * back into the original reply.
+   */
+  async decodeEnvelope(envelope) {
+    const bytes = Uint8Array.from(atob(envelope.data), (c) => c.charCodeAt(0));
+    const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream(envelope.encoding));
+    const reply = JSON.parse(await new Response(stream).text());
+    if (reply && reply.id === undefined && envelope.id !== undefined && envelope.id !== null) {
+      reply.id = envelope.id;
+    }
+    return reply;
+  }
+
   /**
    * Broadcast message to content scripts and popup
    */
@@ -154,17 +223,38 @@ class NativeMessagingService {
     }
   }
 
+  /**
+   * Follow `next_cursor` until every page of a paged reply has arrived
+   * (native/result_pages.py). `extra` is sent with each next_page request,
+   * e.g. { new_only: true } so the host marks each page as delivered.
+   * Resolves with the first reply, its jobs extended by the later pages.
+   */
+  async readAllPages(response, extra = {}) {
+    const jobs = [...(response.jobs || [])];
+    let page = response;
+    while (page.next_cursor) {
+      page = await this.sendMessage({ action: 'next_page', cursor: page.next_cursor, ...extra });
+      if (!page.success) {
+        throw new Error(page.error || 'Failed to read the next page of results');
+      }
+      jobs.push(...(page.jobs || []));
+    }
+    // Fields the host holds back for the last page (the sync token) come from it
+    return { ...response, jobs, count: jobs.length, next_cursor: null, token: page.token ?? response.token };
+  }
+
   /**
    * Collect jobs from current page
    */
   async collectJobs(url) {
     try {
-      const response = await this.sendMessage({
+      let response = await this.sendMessage({
         action: 'collect_jobs',
         url: url
       });
       
       if (response.success && response.jobs) {
+        response = await this.readAllPages(response);
         console.log(`Collected ${response.jobs.length} jobs from native host`);
         return response.jobs;
       }
@@ -176,6 +266,33 @@ class NativeMessagingService {
     }
   }
 
+  /**
+   * Fetch only jobs added or changed since the last sync (see native/job_sync.py).
+   * Pass the token from the previous reply, or the `hash` values of the jobs
+   * already stored as `known`. Resolves with { jobs, token, full } or null.
+   * The host sends the new token with the last page only, so every page is
+   * read before it is returned.
+   */
+  async syncJobs({ token, known, url } = {}) {
+    try {
+      const message = { action: 'sync', url };
+      if (known) message.known = known;
+      else if (token) message.token = token;
+      let response = await this.sendMessage(message);
+
+      if (response.success) {
+        response = await this.readAllPages(response);
+        console.log(`Sync: +${response.added} new, ${response.changed} changed, ${response.unchanged} unchanged`);
+        return { jobs: response.jobs, token: response.token, full: response.full };
+      }
+
+      return null;
+    } catch (error) {
+      console.error('Failed to sync jobs:', error);
+      return null;
+    }
+  }
+
   /**
    * Analyze a job
    */